@@ -15,6 +15,7 @@ from devito.symbolics import *  # noqa
 from devito.tools import *  # noqa
 
 from devito.compiler import compiler_registry, GNUCompiler
+from devito.operator import compile_all, get_operator_registry, load_operator  # noqa
 from devito.backends import backends_registry, init_backend
 
 
@@ -49,6 +50,28 @@ def _cast_and_update_compiler(val):
 configuration.add('openmp', 0, [0, 1], callback=_cast_and_update_compiler)
 configuration.add('debug_compiler', 0, [0, 1], lambda i: bool(i))
 
+# Persistent JIT cache: location and maximum size in bytes (None means unbounded)
+configuration.add('jit_cache_dir', None)
+configuration.add('jit_cache_size', None)
+
+# Persistent cache of lowered Operators, allowing to skip the DSE and the DLE
+configuration.add('operator_cache', 0, [0, 1], lambda i: bool(i))
+
+# In-memory registry of lowered Operators: maximum number of entries (0 disables it)
+configuration.add('operator_registry', 0, callback=lambda i: int(i))
+
+# Background JIT compilation: whether Operators should be compiled asynchronously
+# as soon as they are built, and the number of compilation workers
+configuration.add('jit_async', 0, [0, 1], lambda i: bool(i))
+configuration.add('jit_workers', None)
+
+# Whether the elemental functions of an Operator should be compiled as separate,
+# individually cached translation units
+configuration.add('jit_split', 0, [0, 1], lambda i: bool(i))
+
+# File to which the build profile of each Operator is appended, as a JSON line
+configuration.add('build_profile', None)
+
 # ... then the backend configuration. The order is important since the
 # backend might depend on the compiler configuration.
 configuration.add('backend', 'core', list(backends_registry),
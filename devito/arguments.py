@@ -1,4 +1,9 @@
 import abc
+import ctypes
+import threading
+from contextlib import contextmanager
+from functools import partial
+from numbers import Number
 
 import numpy as np
 from cached_property import cached_property
@@ -6,6 +11,7 @@ from collections import namedtuple
 
 from devito.exceptions import InvalidArgument
 from devito.logger import debug
+from devito.tools import numpy_to_ctypes
 
 """ This module provides a set of classes that help in processing runtime arguments for
     kernels generated by devito. There are two class hierarchies here:
@@ -32,10 +38,35 @@ class Argument(object):
     is_TensorArgument = False
     is_PtrArgument = False
 
+    _state = threading.local()
+    """The values derived while processing the arguments of an invocation.
+    These are call-local, rather than attached to the Argument objects, as the
+    latter are shared by all Operators using the same symbolic objects (e.g.,
+    the Dimensions of a Grid), possibly from different threads."""
+
     def __init__(self, name, provider, default_value=None):
         self.name = name
         self.provider = provider
-        self._value = self.default_value = default_value
+        self.default_value = default_value
+
+    @classmethod
+    def _scope(cls):
+        scope = getattr(cls._state, 'scope', None)
+        if scope is None:
+            # Outside of argument processing, use a default (thread-local) scope
+            try:
+                scope = cls._state.default
+            except AttributeError:
+                scope = cls._state.default = ArgumentScope()
+        return scope
+
+    @property
+    def _value(self):
+        return self._scope().values.get(self, self.default_value)
+
+    @_value.setter
+    def _value(self, value):
+        self._scope().values[self] = value
 
     @property
     def value(self):
@@ -54,7 +85,7 @@ class Argument(object):
         return self.provider.dtype
 
     def reset(self):
-        self._value = self.default_value
+        self._scope().values.pop(self, None)
 
     @abc.abstractproperty
     def verify(self, kwargs):
@@ -77,7 +108,17 @@ class ScalarArgument(Argument):
     def __init__(self, name, provider, reducer=lambda old, new: new, default_value=None):
         super(ScalarArgument, self).__init__(name, provider, default_value)
         self.reducer = reducer
-        self._frozen = False
+
+    @property
+    def _frozen(self):
+        return self in self._scope().frozen
+
+    @_frozen.setter
+    def _frozen(self, value):
+        if value:
+            self._scope().frozen.add(self)
+        else:
+            self._scope().frozen.discard(self)
 
     def reset(self):
         super(ScalarArgument, self).reset()
@@ -145,10 +186,27 @@ class TensorArgument(Argument):
                                 zip(self.provider.indices, value.shape))
         if verify:
             self._value = value
+            # The stride of the rows of the data, which may be padded
+            for i in self.provider.rtargs[1:]:
+                i.verify(self.value.shape[-1])
 
         return self._value is not None and verify
 
 
+class StrideArgument(ScalarArgument):
+    """ Class representing the stride, in elements, of the rows of the data of a
+        tensor argument; that is, the size of its innermost dimension, padding
+        included.
+    """
+
+    def __init__(self, name, provider):
+        super(StrideArgument, self).__init__(name, provider)
+
+    @property
+    def dtype(self):
+        return np.int32
+
+
 class PtrArgument(Argument):
 
     """ Class representing arbitrary arguments that a kernel might expect.
@@ -166,6 +224,36 @@ class PtrArgument(Argument):
         return True
 
 
+class ArgumentScope(object):
+
+    """ The state of the runtime arguments while they are processed for an
+        invocation, that is the values derived so far, and the arguments whose
+        value was provided by the user (hence "frozen").
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.frozen = set()
+
+
+@contextmanager
+def argument_scope():
+    """ Process runtime arguments in a fresh :class:`ArgumentScope`, discarded
+        on exit. As scopes are thread-local, multiple threads may concurrently
+        process the arguments of Operators sharing symbolic objects. Nested
+        scopes share the state of the outermost one.
+    """
+    scope = getattr(Argument._state, 'scope', None)
+    if scope is not None:
+        yield scope
+        return
+    Argument._state.scope = ArgumentScope()
+    try:
+        yield Argument._state.scope
+    finally:
+        Argument._state.scope = None
+
+
 class ArgumentProvider(object):
 
     """ Abstract base class for any object that, post code-generation, might resolve
@@ -274,8 +362,15 @@ class TensorFunctionArgProvider(ArgumentProvider):
 
     @cached_property
     def rtargs(self):
+        if getattr(self, '_padding', None):
+            return (TensorArgument(self.name, self),
+                    StrideArgument(self.stride_name, self))
         return (TensorArgument(self.name, self),)
 
+    @property
+    def stride_name(self):
+        return "%s_stride" % self.name
+
 
 class ScalarArgProvider(ArgumentProvider):
 
@@ -309,6 +404,100 @@ class ObjectArgProvider(ArgumentProvider):
         return (PtrArgument(self.name, self),)
 
 
+class ArgumentPlan(object):
+
+    """ A precomputed, ordered sequence of the runtime arguments of a JIT-compiled
+        kernel, derived once through the full argument processing of an Operator.
+        The plan may be reused as long as the apply-time arguments have the same
+        :meth:`signature`; this only requires swapping the data pointers of the
+        tensor arguments and the values of the user-provided Constants, with no
+        further verification nor type check.
+        :param parameters: The runtime arguments of the kernel, in order.
+        :param arguments: A mapper from the runtime argument names to the
+                          derived values.
+        :param lib: The shared object the kernel was loaded from.
+        :param name: The name of the kernel.
+    """
+
+    def __init__(self, parameters, arguments, lib, name):
+        self.arguments = arguments
+        self.lib = lib
+
+        # A separate function pointer, as /argtypes/ would add a (slow) type
+        # check and conversion of each argument upon each call
+        self.cfunction = lib[name]
+
+        self.slots = []
+        for i in parameters:
+            value = arguments[i.name]
+            if i.is_TensorArgument:
+                self.slots.append(partial(tensor_slot, i.name, i.provider))
+            elif i.is_ScalarArgument:
+                ctype = numpy_to_ctypes(i.dtype)
+                if getattr(i.provider, 'is_Constant', False):
+                    self.slots.append(partial(scalar_slot, i.name, ctype, ctype(value)))
+                else:
+                    self.slots.append(partial(fixed_slot, ctype(value)))
+            else:
+                self.slots.append(partial(pointer_slot, i.name, value))
+
+    def __call__(self, kwargs):
+        return self.cfunction(*self.bind(kwargs))
+
+    def bind(self, kwargs):
+        """ Return the runtime arguments for the apply-time arguments ``kwargs``,
+            in the order expected by the kernel.
+        """
+        return [i(kwargs) for i in self.slots]
+
+    @classmethod
+    def signature(cls, kwargs, swappable):
+        """ Return a hashable signature of the apply-time arguments ``kwargs``, or
+            None if a plan cannot be used for them. Data objects are represented
+            by their shape and type, as are the scalars in ``swappable`` (the
+            names of the Constants); any other value is represented by itself.
+        """
+        if kwargs.get('autotune'):
+            return None
+        signature = []
+        for k, v in sorted(kwargs.items()):
+            if getattr(v, 'is_SymbolicFunction', False):
+                v = v._data_buffer
+            if isinstance(v, np.ndarray):
+                if not v.flags.c_contiguous:
+                    return None
+                signature.append((k, v.shape, v.dtype))
+            elif k in swappable and isinstance(v, Number):
+                signature.append((k, Number))
+            elif isinstance(v, (Number, tuple, str)):
+                signature.append((k, v))
+            else:
+                return None
+        return tuple(signature)
+
+
+def tensor_slot(name, default, kwargs):
+    value = kwargs.get(name, default)
+    if getattr(value, 'is_SymbolicFunction', False):
+        value = value._data_buffer
+    return ctypes.c_void_p(value.ctypes.data)
+
+
+def scalar_slot(name, ctype, default, kwargs):
+    try:
+        return ctype(kwargs[name])
+    except KeyError:
+        return default
+
+
+def pointer_slot(name, default, kwargs):
+    return kwargs.get(name, default)
+
+
+def fixed_slot(value, kwargs):
+    return value
+
+
 def log_args(arguments):
     arg_str = []
     for k, v in arguments.items():
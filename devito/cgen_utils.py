@@ -4,6 +4,7 @@ import cgen as c
 from mpmath.libmp import prec_to_dps, to_str
 from sympy import Eq, Function
 from sympy.printing.ccode import C99CodePrinter
+from sympy.printing.precedence import PRECEDENCE
 
 
 class Allocator(object):
@@ -140,9 +141,25 @@ class CodePrinter(C99CodePrinter):
 
         return rv + 'F'
 
+    def _print_Max(self, expr):
+        return self._print_minmax('fmax', expr.args)
+
+    def _print_Min(self, expr):
+        return self._print_minmax('fmin', expr.args)
+
+    def _print_minmax(self, func, args):
+        if len(args) == 1:
+            return self._print(args[0])
+        return '%s(%s, %s)' % (func, self._print(args[0]),
+                               self._print_minmax(func, args[1:]))
+
     def _print_FrozenExpr(self, expr):
         return self._print(expr.args[0])
 
+    def _print_IntDiv(self, expr):
+        return '%s / %s' % (self.parenthesize(expr.lhs, PRECEDENCE['Mul']),
+                            self.parenthesize(expr.rhs, PRECEDENCE['Mul']))
+
     def _print_FunctionFromPointer(self, expr):
         indices = [self._print(i) for i in expr.params]
         return "%s->%s(%s)" % (expr.pointer, expr.function, ', '.join(indices))
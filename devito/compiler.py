@@ -1,21 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import partial
 from hashlib import sha1
-from os import environ, path
-from tempfile import mkdtemp
+from os import environ, getpid, makedirs, path
+from tempfile import gettempdir, mkdtemp
 from time import time
 from sys import platform
+import _ctypes
+import errno
+import os
+import shutil
+import stat
 import subprocess
+import threading
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
 
 import numpy.ctypeslib as npct
+import psutil
 from codepy.jit import extension_file_from_string
 from codepy.toolchain import GCCToolchain
 
 from devito.exceptions import CompilationError
-from devito.logger import log
+from devito.logger import log, warning
 from devito.parameters import configuration
 from devito.tools import change_directory
 
-__all__ = ['jit_compile', 'load', 'make', 'GNUCompiler']
+__all__ = ['jit_compile', 'jit_compile_units', 'jit_compile_pgo', 'load', 'unload',
+           'make', 'get_jit_cache', 'get_jit_executor', 'GNUCompiler']
 
 
 class Compiler(GCCToolchain):
@@ -41,6 +56,9 @@ class Compiler(GCCToolchain):
         * :data:`self.src_ext`
         * :data:`self.lib_ext`
         * :data:`self.undefines`
+
+    The flag variants attempted when auto-tuning the compiler flags of an
+    :class:`Operator` are given by :data:`self.tuning_flags`.
     """
 
     cpp_mapper = {'gcc': 'g++', 'clang': 'clang++', 'icc': 'icpc',
@@ -64,6 +82,31 @@ class Compiler(GCCToolchain):
     def __str__(self):
         return self.__class__.__name__
 
+    @property
+    def tuning_flags(self):
+        """The variants of additional flags attempted when auto-tuning the
+        compiler flags. The empty variant stands for the default flags."""
+        return [()]
+
+    def pgo_flags(self, directory):
+        """
+        Return the additional flags to build, respectively, instrumented code
+        and code optimized through the profile data found in ``directory``,
+        or None if profile-guided optimization is not supported.
+        """
+        return None
+
+    def variant(self, flags):
+        """Return a copy of this toolchain with the additional ``flags``."""
+        # Not `copy(self)`, as `pytools.Record.__setstate__` expects a set of `fields`
+        obj = self.__class__.__new__(self.__class__)
+        obj.__dict__.update(self.__dict__)
+        for i in ['cflags', 'ldflags', 'include_dirs', 'libraries',
+                  'library_dirs', 'defines', 'undefines']:
+            setattr(obj, i, list(getattr(self, i)))
+        obj.cflags.extend(flags)
+        return obj
+
     def __repr__(self):
         return "DevitoJITCompiler[%s]" % self.__class__.__name__
 
@@ -83,6 +126,16 @@ class GNUCompiler(Compiler):
         if configuration['openmp']:
             self.ldflags += ['-fopenmp']
 
+    @property
+    def tuning_flags(self):
+        return [(), ('-funroll-loops',), ('-ffast-math',), ('-fno-trapping-math',),
+                ('-funroll-loops', '-ffast-math'), ('-fvect-cost-model=unlimited',),
+                ('-mprefer-vector-width=512',)]
+
+    def pgo_flags(self, directory):
+        return (('-fprofile-generate=%s' % directory,),
+                ('-fprofile-use=%s' % directory, '-fprofile-correction'))
+
 
 class GNUCompilerNoAVX(GNUCompiler):
     """Set of compiler flags for GCC but with AVX suppressed. This is
@@ -96,6 +149,11 @@ class GNUCompilerNoAVX(GNUCompiler):
         self.cflags = ['-O3', '-g', '-march=native', '-mno-avx', '-fPIC', '-Wall',
                        '-std=c99', '-Wno-unused-result', '-Wno-unused-variable']
 
+    @property
+    def tuning_flags(self):
+        return [(), ('-funroll-loops',), ('-ffast-math',), ('-fno-trapping-math',),
+                ('-funroll-loops', '-ffast-math')]
+
 
 class ClangCompiler(Compiler):
     """Set of standard compiler flags for the clang toolchain
@@ -113,6 +171,11 @@ class ClangCompiler(Compiler):
         self.ldflags = ['-shared']
         self.lib_ext = 'dylib'
 
+    @property
+    def tuning_flags(self):
+        return [(), ('-funroll-loops',), ('-ffast-math',),
+                ('-funroll-loops', '-ffast-math')]
+
 
 class IntelCompiler(Compiler):
     """Set of standard compiler flags for the Intel toolchain
@@ -130,6 +193,15 @@ class IntelCompiler(Compiler):
         if configuration['openmp']:
             self.ldflags += ['-qopenmp']
 
+    @property
+    def tuning_flags(self):
+        return [(), ('-unroll-aggressive',), ('-fp-model', 'fast=2'),
+                ('-qopt-zmm-usage=high',), ('-unroll-aggressive', '-fp-model', 'fast=2')]
+
+    def pgo_flags(self, directory):
+        return (('-prof-gen', '-prof-dir=%s' % directory),
+                ('-prof-use', '-prof-dir=%s' % directory))
+
 
 class IntelMICCompiler(Compiler):
     """Set of standard compiler flags for the IntelMIC toolchain
@@ -188,6 +260,17 @@ class CustomCompiler(Compiler):
         if configuration['openmp']:
             self.ldflags += environ.get('OMP_LDFLAGS', '-fopenmp').split(' ')
 
+    @property
+    def tuning_flags(self):
+        # Assume a GCC-compatible compiler; unsupported flags are simply skipped
+        return [(), ('-funroll-loops',), ('-ffast-math',), ('-fno-trapping-math',),
+                ('-funroll-loops', '-ffast-math')]
+
+    def pgo_flags(self, directory):
+        # Assume a GCC-compatible compiler
+        return (('-fprofile-generate=%s' % directory,),
+                ('-fprofile-use=%s' % directory, '-fprofile-correction'))
+
 
 def get_tmp_dir():
     """Function to get a temp directory.
@@ -203,6 +286,260 @@ def get_tmp_dir():
     return _devito_compiler_tmpdir
 
 
+def get_jit_dir():
+    """Function to get the directory hosting the persistent JIT cache.
+
+    :return: Path to the directory specified through ``configuration['jit_cache_dir']``
+             or, if unset, to a user-specific directory in the system tmp space.
+    """
+    jit_dir = configuration['jit_cache_dir']
+    if jit_dir is None:
+        try:
+            uid = os.getuid()
+        except AttributeError:
+            # Windows
+            uid = environ.get('USERNAME', 'unknown')
+        jit_dir = path.join(gettempdir(), "devito-jitcache-uid%s" % uid)
+    return path.abspath(path.expanduser(jit_dir))
+
+
+class JITCache(object):
+
+    """
+    A persistent, on-disk cache of JIT-compiled shared objects, shared by all
+    Python processes using the same cache directory.
+
+    An entry is keyed by the hash of the C source code and of the toolchain
+    it is compiled with (compiler class, executables, flags and version).
+    Entries are published through atomic renames, while writers of the same
+    entry are serialized through file locks, so multiple processes may safely
+    populate the cache concurrently. Entries locked (e.g., being built, or
+    being linked into a shared object) are never evicted.
+
+    :param directory: The directory hosting the cache.
+    :param capacity: (Optional) maximum size of the cache, in bytes. When exceeded,
+                     the least recently used entries are evicted. Defaults to
+                     ``None``, that is an unbounded cache.
+    """
+
+    def __init__(self, directory, capacity=None):
+        self.capacity = capacity
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # The statistics are updated by concurrent (JIT worker) threads
+        self._stats_lock = threading.Lock()
+
+        try:
+            makedirs(directory, mode=0o700)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        # Shared objects are loaded, and Operators unpickled, from the cache,
+        # so a directory others may have planted files in must not be used
+        if not is_private(directory):
+            warning("JIT cache directory `%s` is not private to the current user; "
+                    "using a temporary directory instead" % directory)
+            directory = mkdtemp(prefix="devito-jitcache-")
+        self.directory = directory
+
+    def __repr__(self):
+        return "JITCache[%s]" % self.directory
+
+    def key(self, ccode, compiler, *extra):
+        """Return the key identifying the shared object produced by compiling
+        ``ccode`` with ``compiler``. Any ``extra`` qualifier of the compilation
+        process is also taken into account."""
+        toolchain = [str(compiler), compiler.cc, compiler.ld, compiler.cflags,
+                     compiler.ldflags, compiler.include_dirs, compiler.libraries,
+                     compiler.library_dirs, compiler.defines, compiler.undefines,
+                     compiler_version(compiler.cc)]
+        return sha1((str(ccode) + str(toolchain) + str(extra)).encode()).hexdigest()
+
+    def lookup(self, lib_file):
+        """Return True if ``lib_file`` is available in the cache, False otherwise.
+        A successful lookup marks the entry as the most recently used one."""
+        try:
+            os.utime(lib_file, None)
+        except OSError:
+            return False
+        return True
+
+    def count(self, stat):
+        """Increment the statistic ``stat`` (e.g., ``'hits'``) by one."""
+        with self._stats_lock:
+            setattr(self, stat, getattr(self, stat) + 1)
+
+    def read(self, key, suffix):
+        """Return the content of the file ``<key>.<suffix>``, or None if it is
+        not available in the cache. A successful read marks the entry as the
+        most recently used one."""
+        filename = path.join(self.directory, "%s.%s" % (key, suffix))
+        try:
+            with open(filename, 'rb') as f:
+                data = f.read()
+            os.utime(filename, None)
+        except (IOError, OSError):
+            return None
+        return data
+
+    def write(self, key, suffix, data):
+        """Atomically publish ``data`` as the file ``<key>.<suffix>``."""
+        filename = path.join(self.directory, "%s.%s" % (key, suffix))
+        tmp_file = "%s.%d.tmp" % (filename, getpid())
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.rename(tmp_file, filename)
+        self.evict()
+
+    @contextmanager
+    def lock(self, key, shared=False, blocking=True):
+        """
+        Acquire an inter-process lock on the entry ``key``, exclusive unless
+        ``shared``. Yield True once acquired; if not ``blocking``, yield False,
+        without waiting, if the lock is held by someone else.
+        """
+        with open(path.join(self.directory, "%s.lock" % key), 'w') as f:
+            # Without fcntl (Windows), writers of the same entry aren't
+            # serialized, but entries are still published atomically
+            acquired = True
+            if fcntl is not None:
+                flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+                try:
+                    fcntl.flock(f, flags if blocking else flags | fcntl.LOCK_NB)
+                except (IOError, OSError) as e:
+                    if blocking or e.errno not in (errno.EAGAIN, errno.EACCES):
+                        raise
+                    acquired = False
+            try:
+                yield acquired
+            finally:
+                if acquired and fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @property
+    def entries(self):
+        """Map each cache entry to its files, sorted from the least to the
+        most recently used entry. Lock files, and files being written, are
+        not part of the entries."""
+        entries = {}
+        for i in os.listdir(self.directory):
+            if i.endswith('.lock') or i.endswith('.tmp'):
+                continue
+            key = i.split('.')[0]
+            entries.setdefault(key, []).append(path.join(self.directory, i))
+
+        def last_used(key):
+            try:
+                return max(path.getmtime(i) for i in entries[key])
+            except OSError:
+                # Concurrently evicted
+                return 0
+        return [(k, entries[k]) for k in sorted(entries, key=last_used)]
+
+    @property
+    def size(self):
+        """The size of the cache, in bytes."""
+        return sum(filesize(i) for _, files in self.entries for i in files)
+
+    def evict(self):
+        """Evict the least recently used entries until the cache size falls
+        below ``self.capacity``. Locked entries are skipped."""
+        if self.capacity is None:
+            return
+        entries = self.entries
+        size = sum(filesize(i) for _, files in entries for i in files)
+        for key, files in entries[:-1]:
+            # Note: the most recently used entry is never evicted
+            if size <= self.capacity:
+                break
+            with self.lock(key, blocking=False) as acquired:
+                if not acquired:
+                    continue
+                for i in files:
+                    size -= filesize(i)
+                    try:
+                        os.remove(i)
+                    except OSError:
+                        pass
+            self.count('evictions')
+
+    @property
+    def stats(self):
+        """Return the statistics of this cache: the shared objects found in
+        the cache (hits), the files compiled (misses), and the entries evicted."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'size': self.size}
+
+
+_jit_caches = {}
+
+
+def get_jit_cache():
+    """Return the :class:`JITCache` for the current configuration."""
+    directory = get_jit_dir()
+    cache = _jit_caches.get(directory)
+    if cache is None:
+        cache = _jit_caches.setdefault(directory, JITCache(directory))
+    cache.capacity = configuration['jit_cache_size']
+    return cache
+
+
+_jit_executor = []
+
+
+def get_jit_executor():
+    """
+    Return the pool of threads used for background JIT compilation. The
+    number of workers is given by ``configuration['jit_workers']`` (by default,
+    the number of physical cores) upon the first call.
+
+    As the actual compilation takes place in a separate process, the
+    workers run concurrently with each other and with the main thread.
+    """
+    if not _jit_executor:
+        _jit_executor.append(ThreadPoolExecutor(max_workers=jit_workers()))
+    return _jit_executor[0]
+
+
+def jit_workers():
+    """Return the maximum number of concurrent JIT compilations."""
+    return configuration['jit_workers'] or psutil.cpu_count(logical=False) or 1
+
+
+def compiler_version(cc, _versions={}):
+    """Return the version string of the compiler executable ``cc``."""
+    if cc not in _versions:
+        try:
+            version = subprocess.check_output([cc, '--version'], stderr=subprocess.STDOUT)
+            _versions[cc] = version.decode('utf-8').strip()
+        except (OSError, subprocess.CalledProcessError):
+            _versions[cc] = None
+    return _versions[cc]
+
+
+def is_private(directory):
+    """Return True if ``directory`` is a directory (not a symbolic link) owned
+    by the current user and not writable by anyone else, False otherwise."""
+    try:
+        uid = os.getuid()
+    except AttributeError:
+        # Windows, where ownership is not checked
+        return True
+    info = os.lstat(directory)
+    return (stat.S_ISDIR(info.st_mode) and info.st_uid == uid and
+            not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def filesize(filename):
+    try:
+        return path.getsize(filename)
+    except OSError:
+        # Concurrently evicted
+        return 0
+
+
 def load(basename, compiler):
     """Load a compiled library
 
@@ -223,35 +560,201 @@ def load(basename, compiler):
     return npct.load_library(basename, '.')
 
 
+def unload(lib):
+    """Unload a library loaded through :func:`load`. Instrumented code, for
+    example, flushes the collected profile data upon unloading."""
+    _ctypes.dlclose(lib._handle)
+
+
 def jit_compile(ccode, compiler):
     """JIT compile the given ccode.
 
+    The persistent :class:`JITCache` is looked up first, so that the actual
+    compilation only takes place if no other (past or concurrent) process has
+    already compiled the same ccode with an equivalent toolchain.
+
     :param ccode: String of C source code.
     :param compiler: The toolchain used for compilation.
 
     :return: The name of the compilation unit.
     """
-    hash_key = sha1(str(ccode).encode()).hexdigest()
-    basename = path.join(get_tmp_dir(), hash_key)
+    cache = get_jit_cache()
+    hash_key = cache.key(ccode, compiler)
+    basename = path.join(cache.directory, hash_key)
 
     src_file = "%s.%s" % (basename, compiler.src_ext)
-    if platform == "linux" or platform == "linux2":
-        lib_file = "%s.so" % basename
-    elif platform == "darwin":
-        lib_file = "%s.dylib" % basename
-    elif platform == "win32" or platform == "win64":
-        lib_file = "%s.dll" % basename
+    lib_file = "%s.%s" % (basename, lib_ext())
+
+    def build(tmp_file):
+        extension_file_from_string(toolchain=compiler, ext_file=tmp_file,
+                                   source_string=ccode, source_name=src_file,
+                                   debug=configuration['debug_compiler'])
+    _jit_build(cache, hash_key, lib_file, build, compiler, src_file)
+
+    cache.evict()
+
+    return basename
+
+
+def jit_compile_units(units, compiler):
+    """JIT compile the given sequence of translation units, and link them
+    into a single shared object.
+
+    Each unit is compiled, concurrently with the others, into an object file
+    stored in the persistent :class:`JITCache`. Thus, units that have already
+    been compiled (e.g., because only some of the other units have changed)
+    are reused rather than recompiled.
+
+    :param units: Sequence of strings of C source code.
+    :param compiler: The toolchain used for compilation.
+
+    :return: The name of the compilation unit.
+    """
+    cache = get_jit_cache()
+    debug = configuration['debug_compiler']
+
+    def compile_unit(ccode):
+        hash_key = cache.key(ccode, compiler)
+        basename = path.join(cache.directory, hash_key)
+        src_file = "%s.%s" % (basename, compiler.src_ext)
+        obj_file = "%s.o" % basename
+
+        def build(tmp_file):
+            with open(src_file, 'w') as f:
+                f.write(ccode)
+            compiler.build_object(tmp_file, [src_file], debug=debug)
+
+        # The object file is pinned, through a shared lock, until linked, so
+        # that it can't be evicted in the meantime
+        while True:
+            _jit_build(cache, hash_key, obj_file, build, compiler, src_file,
+                       library=False)
+            pin = cache.lock(hash_key, shared=True)
+            pin.__enter__()
+            if cache.lookup(obj_file):
+                return obj_file, pin
+            # Evicted before being pinned
+            pin.__exit__(None, None, None)
+
+    with ThreadPoolExecutor(max_workers=min(len(units), jit_workers())) as executor:
+        compiled = list(executor.map(compile_unit, units))
+    obj_files = [i for i, _ in compiled]
+
+    hash_key = cache.key(str(obj_files), compiler)
+    basename = path.join(cache.directory, hash_key)
+    lib_file = "%s.%s" % (basename, lib_ext())
+
+    def build(tmp_file):
+        compiler.link_extension(tmp_file, obj_files, debug=debug)
+    try:
+        _jit_build(cache, hash_key, lib_file, build, compiler, lib_file)
+    finally:
+        for _, pin in compiled:
+            pin.__exit__(None, None, None)
 
-    tic = time()
-    extension_file_from_string(toolchain=compiler, ext_file=lib_file,
-                               source_string=ccode, source_name=src_file,
-                               debug=configuration['debug_compiler'])
-    toc = time()
-    log("%s: compiled %s [%.2f s]" % (compiler, src_file, toc-tic))
+    cache.evict()
 
     return basename
 
 
+def jit_compile_pgo(ccode, compiler, train):
+    """JIT compile the given ccode through profile-guided optimization.
+
+    The ccode is first compiled into instrumented code, which is handed over
+    to ``train`` to collect profile data, and then recompiled exploiting the
+    profile data. The optimized shared object is stored in the persistent
+    :class:`JITCache`, so the training only takes place if no other process
+    has already compiled the same ccode through profile-guided optimization.
+
+    :param ccode: String of C source code.
+    :param compiler: The toolchain used for compilation. Must support
+                     profile-guided optimization (see :meth:`Compiler.pgo_flags`).
+    :param train: A callable taking the name of the instrumented compilation
+                  unit, expected to :func:`load`, run and :func:`unload` it.
+
+    :return: The name of the compilation unit.
+    """
+    cache = get_jit_cache()
+    hash_key = cache.key(ccode, compiler, 'pgo')
+    basename = path.join(cache.directory, hash_key)
+    lib_file = "%s.%s" % (basename, lib_ext())
+    debug = configuration['debug_compiler']
+
+    def build(tmp_file):
+        # The instrumented and the optimized code must be built from the same
+        # files, so that the profile data can be matched
+        workdir = mkdtemp(dir=get_tmp_dir())
+        try:
+            src_file = path.join(workdir, "kernel.%s" % compiler.src_ext)
+            with open(src_file, 'w') as f:
+                f.write(ccode)
+            generate, use = compiler.pgo_flags(workdir)
+            target = path.join(workdir, "kernel")
+
+            instrumented = compiler.variant(generate)
+            instrumented.build_extension("%s.%s" % (target, lib_ext()), [src_file],
+                                         debug=debug)
+            train(target)
+
+            optimized = compiler.variant(use)
+            optimized.build_extension("%s.%s" % (target, lib_ext()), [src_file],
+                                      debug=debug)
+            shutil.move("%s.%s" % (target, lib_ext()), tmp_file)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    _jit_build(cache, hash_key, lib_file, build, compiler,
+               "%s (profile-guided)" % lib_file)
+
+    cache.evict()
+
+    return basename
+
+
+def _jit_build(cache, hash_key, target, build, compiler, name, library=True):
+    """
+    Produce the file ``target``, identified by ``hash_key`` in ``cache``, by
+    calling ``build`` on a process-private file, which is then published
+    atomically. Nothing is done if ``target`` is already in the cache; this
+    counts as a cache hit if ``target`` is a shared object (``library``),
+    rather than e.g. an object file to be linked into one.
+    """
+    if cache.lookup(target):
+        log("%s: cache hit %s" % (compiler, name))
+        if library:
+            cache.count('hits')
+        return
+
+    with cache.lock(hash_key):
+        # Some other process might have built the same target in the meantime
+        if cache.lookup(target):
+            log("%s: cache hit %s" % (compiler, name))
+            if library:
+                cache.count('hits')
+            return
+
+        tmp_file = "%s.%d.tmp" % (target, getpid())
+        tic = time()
+        try:
+            build(tmp_file)
+            os.rename(tmp_file, target)
+        finally:
+            if path.exists(tmp_file):
+                os.remove(tmp_file)
+        toc = time()
+        log("%s: compiled %s [%.2f s]" % (compiler, name, toc-tic))
+        cache.count('misses')
+
+
+def lib_ext():
+    """Return the platform-specific extension of shared objects."""
+    if platform == "darwin":
+        return "dylib"
+    elif platform == "win32" or platform == "win64":
+        return "dll"
+    else:
+        return "so"
+
+
 def make(loc, args):
     """
     Invoke ``make`` command from within ``loc`` with arguments ``args``.
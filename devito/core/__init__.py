@@ -8,9 +8,13 @@ from devito.parameters import Parameters, add_sub_configuration
 
 core_configuration = Parameters('core')
 core_configuration.add('autotuning', 'basic', ['none', 'basic', 'aggressive'])
+core_configuration.add('flagtuning', 0, [0, 1], lambda i: bool(i))
+core_configuration.add('pgo', 0, [0, 1], lambda i: bool(i))
 
 env_vars_mapper = {
     'DEVITO_AUTOTUNING': 'autotuning',
+    'DEVITO_FLAGTUNING': 'flagtuning',
+    'DEVITO_PGO': 'pgo',
 }
 
 add_sub_configuration(core_configuration, env_vars_mapper)
@@ -4,13 +4,17 @@ from collections import OrderedDict
 from itertools import combinations
 from functools import reduce
 from operator import mul
+import json
 import resource
 
+import cpuinfo
+
+from devito.compiler import get_jit_cache, jit_compile_pgo, load, unload
 from devito.ir.iet import Iteration, FindNodes, FindSymbols
-from devito.logger import info, info_at
+from devito.logger import info, info_at, warning
 from devito.parameters import configuration
 
-__all__ = ['autotune']
+__all__ = ['autotune', 'autotune_flags', 'pgo_compile']
 
 
 def autotune(operator, arguments, tunable):
@@ -19,38 +23,14 @@ def autotune(operator, arguments, tunable):
     operator arguments to perform empirical autotuning. Some of the operator
     arguments are marked as tunable.
     """
-    at_arguments = arguments.copy()
-
-    # User-provided output data must not be altered
-    output = [i.name for i in operator.output]
-    for k, v in arguments.items():
-        if k in output:
-            at_arguments[k] = v.copy()
+    squeezed = squeeze(operator, arguments)
+    if squeezed is None:
+        return arguments
+    at_arguments, timesteps = squeezed
 
     iterations = FindNodes(Iteration).visit(operator.body)
     dim_mapper = {i.dim.name: i.dim for i in iterations}
 
-    # Shrink the iteration space of sequential dimensions so that auto-tuner
-    # runs take a negligible amount of time
-    sequentials = [i for i in iterations if i.is_Sequential]
-    if len(sequentials) == 0:
-        timesteps = 1
-    elif len(sequentials) == 1:
-        sequential = sequentials[0]
-        start = sequential.dim.rtargs.start.default_value
-        timesteps = sequential.extent(start=start, finish=options['at_squeezer'])
-        if timesteps < 0:
-            timesteps = options['at_squeezer'] - timesteps + 1
-            info_at("Adjusted auto-tuning timestep to %d" % timesteps)
-        at_arguments[sequential.dim.symbolic_start.name] = start
-        at_arguments[sequential.dim.symbolic_end.name] = timesteps
-        if sequential.dim.is_Stepping:
-            at_arguments[sequential.dim.parent.symbolic_start.name] = start
-            at_arguments[sequential.dim.parent.symbolic_end.name] = timesteps
-    else:
-        info_at("Couldn't understand loop structure, giving up auto-tuning")
-        return arguments
-
     # Attempted block sizes ...
     mapper = OrderedDict([(i.argument.symbolic_size.name, i) for i in tunable])
     # ... Defaults (basic mode)
@@ -137,6 +117,180 @@ def autotune(operator, arguments, tunable):
     return tuned
 
 
+def autotune_flags(operator, arguments):
+    """
+    Determine empirically the fastest among a set of variants of the compiler
+    flags used to JIT-compile ``operator``, as given by the toolchain's
+    :attr:`Compiler.tuning_flags`. Each variant is run once to warm up, and
+    then timed as the fastest of ``options['at_flags_repeats']`` runs.
+
+    Unless the fastest variant is within ``options['at_flags_noise']`` (relative)
+    of the runner-up, that is within noise, the choice is stored in the
+    persistent JIT cache, keyed by the generated code, the toolchain and the
+    CPU model, so that subsequent tuning requests are resolved without running
+    ``operator``.
+
+    Upon return, ``operator`` uses the toolchain with the fastest flags.
+    """
+    cache = get_jit_cache()
+    compiler = operator._compiler
+    key = cache.key(str(operator.ccode) + str(cpu_model()), compiler)
+
+    # Has the best variant already been determined?
+    data = cache.read(key, 'flags')
+    if data is not None:
+        flags = tuple(json.loads(data.decode()))
+        info("Auto-tuned compiler flags (from cache): %s" % ' '.join(flags))
+        set_compiler(operator, compiler.variant(flags))
+        return
+
+    squeezed = squeeze(operator, arguments)
+    if squeezed is None:
+        return
+    at_arguments, timesteps = squeezed
+
+    timings = OrderedDict()
+    for flags in compiler.tuning_flags:
+        set_compiler(operator, compiler.variant(flags))
+        try:
+            # Warm-up run, e.g. to fault in the freshly loaded shared object
+            operator.cfunction(*list(at_arguments.values()))
+        except Exception as e:
+            # E.g., flags not supported by the installed compiler
+            info_at("Couldn't use compiler flags <%s> [%s]" % (' '.join(flags), e))
+            continue
+        elapsed = []
+        for _ in range(options['at_flags_repeats']):
+            at_arguments[operator.profiler.varname] = operator.profiler.setup()
+            operator.cfunction(*list(at_arguments.values()))
+            elapsed.append(sum(operator.profiler.timings.values()))
+        elapsed = min(elapsed)
+        timings[flags] = elapsed
+        info_at("Compiler flags <%s> took %f (s) in %d time steps" %
+                (' '.join(flags), elapsed, timesteps))
+
+    try:
+        best = min(timings, key=timings.get)
+    except ValueError:
+        info("Compiler flags auto-tuning request, but couldn't run any variant")
+        set_compiler(operator, compiler)
+        return
+    set_compiler(operator, compiler.variant(best))
+
+    others = [v for k, v in timings.items() if k != best]
+    if others and min(others) - timings[best] < options['at_flags_noise']*timings[best]:
+        info("Auto-tuned compiler flags: %s (within noise, not cached)" %
+             ' '.join(best))
+        return
+    info("Auto-tuned compiler flags: %s" % ' '.join(best))
+    cache.write(key, 'flags', json.dumps(best).encode())
+
+
+def pgo_compile(operator, arguments):
+    """
+    Recompile ``operator`` through profile-guided optimization. The profile
+    data are collected running the instrumented code over the same, shrunk
+    iteration space used for auto-tuning.
+
+    Upon return, ``operator`` uses the optimized JIT-compiled code.
+    """
+    compiler = operator._compiler
+    if compiler.pgo_flags('') is None:
+        warning("Profile-guided optimization not supported by %s" % compiler)
+        return
+
+    squeezed = squeeze(operator, arguments)
+    if squeezed is None:
+        return
+    at_arguments, timesteps = squeezed
+
+    def train(basename):
+        at_arguments[operator.profiler.varname] = operator.profiler.setup()
+        lib = load(basename, compiler)
+        try:
+            cfunction = getattr(lib, operator.name)
+            cfunction.argtypes = operator._argtypes
+            cfunction(*list(at_arguments.values()))
+        finally:
+            # Flush the profile data
+            unload(lib)
+        elapsed = sum(operator.profiler.timings.values())
+        info_at("Instrumented code took %f (s) in %d time steps" % (elapsed, timesteps))
+
+    try:
+        basename = jit_compile_pgo(str(operator.ccode), compiler, train)
+    except Exception as e:
+        warning("Profile-guided optimization failed [%s]" % e)
+        return
+
+    set_compiler(operator, compiler)
+    operator._lib = load(basename, compiler)
+    operator._lib.name = basename
+
+
+def squeeze(operator, arguments):
+    """
+    Return a copy of ``arguments``, with its own profiling timers, in which the
+    iteration space of the sequential dimension, if any, is shrunk to
+    ``options['at_squeezer']`` timesteps, so that auto-tuning runs take a
+    negligible amount of time, as well as the number of timesteps. Return None
+    if the loop structure of ``operator`` doesn't allow auto-tuning.
+    """
+    at_arguments = arguments.copy()
+
+    # Nor must the timers of the caller's invocation be accumulated into
+    at_arguments[operator.profiler.varname] = operator.profiler.setup()
+
+    # User-provided output data must not be altered
+    output = [i.name for i in operator.output]
+    for k, v in arguments.items():
+        if k in output:
+            at_arguments[k] = v.copy()
+
+    iterations = FindNodes(Iteration).visit(operator.body)
+
+    sequentials = [i for i in iterations if i.is_Sequential]
+    if len(sequentials) == 0:
+        timesteps = 1
+    elif len(sequentials) == 1:
+        sequential = sequentials[0]
+        start = sequential.dim.rtargs.start.default_value
+        timesteps = sequential.extent(start=start, finish=options['at_squeezer'])
+        if timesteps < 0:
+            timesteps = options['at_squeezer'] - timesteps + 1
+            info_at("Adjusted auto-tuning timestep to %d" % timesteps)
+        at_arguments[sequential.dim.symbolic_start.name] = start
+        at_arguments[sequential.dim.symbolic_end.name] = timesteps
+        if sequential.dim.is_Stepping:
+            at_arguments[sequential.dim.parent.symbolic_start.name] = start
+            at_arguments[sequential.dim.parent.symbolic_end.name] = timesteps
+    else:
+        info_at("Couldn't understand loop structure, giving up auto-tuning")
+        return None
+
+    return at_arguments, timesteps
+
+
+def set_compiler(operator, compiler):
+    """Make ``operator`` use the toolchain ``compiler`` from now on."""
+    operator._compiler = compiler
+    operator._lib = None
+    operator._cfunction = None
+    operator._compilation = None
+
+
+def cpu_model():
+    """Return the brand name of the host CPU. As querying it is expensive, the
+    outcome is cached."""
+    if not _cpu_model:
+        info = cpuinfo.get_cpu_info()
+        _cpu_model.append(info.get('brand', info.get('brand_raw')))
+    return _cpu_model[0]
+
+
+_cpu_model = []
+
+
 def more_heuristic_attempts(blocksizes):
     # Ramp up to higher block sizes
     handle = OrderedDict([(i, options['at_blocksize'][-1]) for i in blocksizes[0]])
@@ -169,6 +323,8 @@ def more_heuristic_attempts(blocksizes):
 options = {
     'at_squeezer': 5,
     'at_blocksize': sorted({8, 16, 24, 32, 40, 64, 128}),
-    'at_stack_limit': resource.getrlimit(resource.RLIMIT_STACK)[0] / 4
+    'at_stack_limit': resource.getrlimit(resource.RLIMIT_STACK)[0] / 4,
+    'at_flags_repeats': 3,
+    'at_flags_noise': 0.05
 }
 """Autotuning options."""
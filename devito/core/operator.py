@@ -1,10 +1,11 @@
 from __future__ import absolute_import
 
-from devito.core.autotuning import autotune
+from devito.core.autotuning import autotune, autotune_flags, pgo_compile
 from devito.cgen_utils import printmark
 from devito.dle import filter_iterations, retrieve_iteration_tree
 from devito.ir.iet import List, Transformer
 from devito.operator import OperatorRunnable
+from devito.parameters import configuration
 from devito.tools import flatten
 
 __all__ = ['Operator']
@@ -22,6 +23,17 @@ class OperatorCore(OperatorRunnable):
         else:
             return arguments
 
+    def _tune_compilation(self, arguments):
+        """
+        Use auto-tuning on this Operator to determine empirically the best
+        compiler flags and/or recompile it through profile-guided optimization,
+        if requested.
+        """
+        if configuration.core['flagtuning']:
+            autotune_flags(self, arguments)
+        if configuration.core['pgo']:
+            pgo_compile(self, arguments)
+
 
 class OperatorDebug(OperatorCore):
     """
@@ -53,4 +65,6 @@ class Operator(object):
         cls = OperatorDebug if kwargs.pop('debug', False) else OperatorCore
         obj = cls.__new__(cls, *args, **kwargs)
         obj.__init__(*args, **kwargs)
+        if configuration['jit_async']:
+            obj.compile_async()
         return obj
@@ -1,18 +1,21 @@
 import sympy
 from cached_property import cached_property
 
-from devito.arguments import DimensionArgProvider
+from devito.arguments import DimensionArgProvider, infer_dimension_values_tuple
 from devito.types import Symbol
 
-__all__ = ['Dimension', 'SpaceDimension', 'TimeDimension', 'SteppingDimension']
+__all__ = ['Dimension', 'SpaceDimension', 'TimeDimension', 'SteppingDimension',
+           'SubsampledDimension', 'BatchDimension']
 
 
 class Dimension(sympy.Symbol, DimensionArgProvider):
 
     is_Space = False
     is_Time = False
+    is_Batch = False
 
     is_Stepping = False
+    is_Subsampled = False
     is_Lowered = False
 
     """Index object that represents a problem dimension and thus
@@ -101,6 +104,20 @@ class TimeDimension(Dimension):
     """
 
 
+class BatchDimension(Dimension):
+
+    is_Batch = True
+
+    """
+    Dimension symbol to represent a batch of independent problems (e.g., the
+    shots of a seismic survey) computed in a single :class:`Operator`. As the
+    innermost dimension of a :class:`Function`, the problems are interleaved
+    in memory, so that the SIMD lanes run across the batch.
+
+    :param name: Name of the dimension symbol.
+    """
+
+
 class SteppingDimension(Dimension):
 
     is_Stepping = True
@@ -134,6 +151,59 @@ class SteppingDimension(Dimension):
         return self.parent.spacing
 
 
+class SubsampledDimension(Dimension):
+
+    is_Subsampled = True
+
+    """
+    Dimension symbol representing every ``factor``-th point of a parent
+    :class:`Dimension`; for example, to save a wavefield only every few
+    timesteps. Expressions indexed by a SubsampledDimension are only evaluated
+    when the parent iteration variable is a multiple of ``factor``, and access
+    the entry ``parent / factor``.
+
+    :param name: Name of the dimension symbol.
+    :param parent: Parent dimension which is subsampled.
+    :param factor: The subsampling factor.
+    """
+
+    def __new__(cls, name, parent, factor):
+        newobj = sympy.Symbol.__new__(cls, name)
+        assert isinstance(parent, Dimension)
+        newobj.parent = parent
+        newobj.factor = int(factor)
+        return newobj
+
+    @property
+    def is_Time(self):
+        return self.parent.is_Time
+
+    @property
+    def is_Space(self):
+        return self.parent.is_Space
+
+    @property
+    def reverse(self):
+        return self.parent.reverse
+
+    @property
+    def spacing(self):
+        return self.parent.spacing
+
+    def verify(self, value, enforce=False):
+        if value is None:
+            return self.value is not None
+        value = infer_dimension_values_tuple(value, self.rtargs)
+
+        # The n points along ``self`` span the first (n-1)*factor + 1 points
+        # of the parent
+        size, start, end = value
+        self.parent.verify(((size - 1)*self.factor + 1, start*self.factor,
+                            (end - 1)*self.factor + 1))
+
+        return all([a.verify(v, enforce=enforce) for a, v in zip(self.rtargs, value)])
+
+
 class LoweredDimension(Dimension):
 
     is_Lowered = True
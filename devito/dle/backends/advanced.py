@@ -220,10 +220,7 @@ class DevitoRewriter(BasicRewriter):
         blockshape = self.params.get('blockshape')
         if not blockshape:
             # Use trivial heuristic for a suitable blockshape
-            def heuristic(dim_size):
-                ths = 8  # FIXME: This really needs to be improved
-                return ths if dim_size > ths else 1
-            blockshape = {k: heuristic for k in blocked.keys()}
+            blockshape = {k: default_blocksize for k in blocked.keys()}
         else:
             try:
                 nitems, nrequired = len(blockshape), len(blocked)
@@ -258,8 +255,10 @@ class DevitoRewriter(BasicRewriter):
             for i in vector_iterations:
                 handle = FindSymbols('symbolics').visit(i)
                 try:
+                    # Padded Functions have aligned rows regardless of their shape
                     aligned = [j for j in handle if j.is_Tensor and
-                               j.shape[-1] % get_simd_items(j.dtype) == 0]
+                               getattr(j, 'shape_allocated', j.shape)[-1] %
+                               get_simd_items(j.dtype) == 0]
                 except KeyError:
                     aligned = []
                 if aligned:
@@ -536,3 +535,9 @@ class DevitoCustomRewriter(DevitoSpeculativeRewriter):
     def _pipeline(self, state):
         for i in self.passes:
             DevitoCustomRewriter.passes_mapper[i](self, state)
+
+
+def default_blocksize(dim_size):
+    """Trivial heuristic to determine a suitable block size."""
+    ths = 8  # FIXME: This really needs to be improved
+    return ths if dim_size > ths else 1
@@ -102,11 +102,17 @@ class BasicRewriter(AbstractRewriter):
                 not_required.update({as_symbol(i), i.indexify()})
                 for j in i.symbolic_shape:
                     maybe_required.update(j.free_symbols)
-            required = filter_sorted(maybe_required - not_required,
-                                     key=attrgetter('name'))
+            # The runtime arguments of a tensor beyond its data (e.g., the stride
+            # of its padded rows) are passed along with it
+            extra = OrderedDict([(i, [j.name for j in i.rtargs[1:]]) for _, i in args
+                                 if getattr(i, 'is_TensorFunction', False)])
+            provided = set(flatten(extra.values()))
+            required = filter_sorted([i for i in maybe_required - not_required
+                                      if i.name not in provided], key=attrgetter('name'))
             args.extend([(i.name, Scalar(name=i.name, dtype=i.dtype)) for i in required])
 
-            call, params = zip(*args)
+            call = flatten([c] + extra.get(p, []) for c, p in args)
+            params = [p for _, p in args]
             handle = flatten([p.rtargs for p in params])
             name = "f_%d" % root.tag
 
@@ -3,6 +3,7 @@ from collections import OrderedDict, defaultdict
 from time import time
 
 from devito.logger import dle
+from devito.profiling import track_pass
 from devito.tools import as_tuple
 
 
@@ -13,12 +14,13 @@ def dle_pass(func):
 
     def wrapper(self, state, **kwargs):
         tic = time()
-        # Processing
-        processed, extra = func(self, state.nodes, state)
-        for i, nodes in enumerate(list(state.elemental_functions)):
-            state.elemental_functions[i], _ = func(self, nodes, state)
-        # State update
-        state.update(processed, **extra)
+        with track_pass('dle.%s' % func.__name__.lstrip('_')):
+            # Processing
+            processed, extra = func(self, state.nodes, state)
+            for i, nodes in enumerate(list(state.elemental_functions)):
+                state.elemental_functions[i], _ = func(self, nodes, state)
+            # State update
+            state.update(processed, **extra)
         toc = time()
 
         self.timings[func.__name__] = toc - tic
@@ -5,6 +5,7 @@ from time import time
 from devito.symbolics import estimate_cost, freeze_expression, pow_to_mul
 
 from devito.logger import dse
+from devito.profiling import track_pass
 from devito.tools import flatten
 
 __all__ = ['AbstractRewriter', 'State', 'dse_pass']
@@ -24,8 +25,9 @@ def dse_pass(func):
 
         # Invoke the DSE pass
         tic = time()
-        state.update(flatten([func(self, c, template, **kwargs)
-                              for c in state.clusters]))
+        with track_pass('dse.%s' % func.__name__.lstrip('_')):
+            state.update(flatten([func(self, c, template, **kwargs)
+                                  for c in state.clusters]))
         toc = time()
 
         # Profiling
@@ -5,11 +5,12 @@ from functools import partial
 
 from devito.parameters import configuration
 from devito.logger import debug, error, warning
-from devito.memory import CMemory, first_touch
+from devito.memory import (AllocationPolicy, CMemory, ExternalMemory, MappedMemory,
+                           SIMD_ALIGNMENT, first_touch)
 from devito.cgen_utils import INT, FLOAT
 from devito.dimension import Dimension
 from devito.arguments import ConstantArgProvider, TensorFunctionArgProvider
-from devito.types import SymbolicFunction, AbstractSymbol
+from devito.types import SymbolicFunction, AbstractSymbol, Symbol
 from devito.finite_difference import (centered, cross_derivative,
                                       first_derivative, left, right,
                                       second_derivative, generic_derivative,
@@ -100,6 +101,18 @@ class Function(TensorFunction):
     :param dtype: (Optional) data type of the buffered data.
     :param space_order: Discretisation order for space derivatives
     :param initializer: Function to initialize the data, optional
+    :param nbatch: (Optional) number of independent problems (e.g., shots)
+                   to be computed at once. The data gets an additional,
+                   innermost dimension, ``grid.batch_dim``, of size ``nbatch``.
+    :param hugepages: (Optional) whether the data should be backed by
+                      transparent huge pages. Defaults to
+                      ``configuration['hugepages']``.
+    :param numa: (Optional) the NUMA placement of the data, ``'local'`` or
+                 ``'interleave'``. Defaults to ``configuration['numa']``.
+    :param padding: (Optional) whether the innermost (space) dimension of the
+                    data should be padded to a multiple of the vector width,
+                    so that each row starts at an aligned address. Defaults
+                    to ``configuration['padding']``.
 
     .. note::
 
@@ -137,6 +150,9 @@ class Function(TensorFunction):
             else:
                 self.shape_domain = self.grid.shape_domain
                 self.dtype = kwargs.get('dtype', self.grid.dtype)
+            self.nbatch = kwargs.get('nbatch', None)
+            if self.nbatch is not None:
+                self.shape_domain = tuple(self.shape_domain) + (self.nbatch,)
             self.indices = self._indices(**kwargs)
             self.staggered = kwargs.get('staggered',
                                         tuple(0 for _ in self.indices))
@@ -150,6 +166,13 @@ class Function(TensorFunction):
             if self.initializer is not None:
                 assert(callable(self.initializer))
             self._first_touch = kwargs.get('first_touch', configuration['first_touch'])
+            self._policy = AllocationPolicy(kwargs.get('hugepages',
+                                                       configuration['hugepages']),
+                                            kwargs.get('numa', configuration['numa']))
+            self._padding = None
+            if kwargs.get('padding', configuration['padding']) and \
+                    self.grid is not None and self.indices[-1] in self.grid.dimensions:
+                self._padding = vector_items(self.dtype)
             self._data_object = None
 
             # Dynamically add derivative short-cuts
@@ -244,6 +267,8 @@ class Function(TensorFunction):
                 warning("Creating Function with 'grid' and 'dimensions' "
                         "argument; ignoring the 'dimensions' and using 'grid'.")
             dimensions = grid.dimensions
+            if kwargs.get('nbatch', None) is not None:
+                dimensions = tuple(dimensions) + (grid.batch_dim,)
         return dimensions
 
     @property
@@ -257,6 +282,17 @@ class Function(TensorFunction):
     def shape(self):
         return self.shape_data
 
+    @property
+    def shape_allocated(self):
+        """
+        Shape of the memory allocated for the data; that is, ``shape`` with the
+        innermost dimension padded, if requested, to a multiple of the vector
+        width.
+        """
+        if not self._padding:
+            return self.shape
+        return self.shape[:-1] + (-(-self.shape[-1] // self._padding) * self._padding,)
+
     @property
     def space_dimensions(self):
         """Tuple of index dimensions that define physical space."""
@@ -264,21 +300,84 @@ class Function(TensorFunction):
 
     def _allocate_memory(self):
         """Allocate memory in terms of numpy ndarrays."""
-        debug("Allocating memory for %s (%s)" % (self.name, str(self.shape)))
-        self._data_object = CMemory(self.shape, dtype=self.dtype)
+        debug("Allocating memory for %s (%s)" % (self.name, str(self.shape_allocated)))
+        self._data_object = CMemory(self.shape_allocated, dtype=self.dtype,
+                                    policy=self._policy)
         if self._first_touch:
             first_touch(self)
         else:
-            self.data.fill(0)
+            self._data_object.fill(0)
 
     @property
     def data(self):
         """The value of the data object, as a :class:`numpy.ndarray` storing
-        elements in the classical row-major storage layout."""
+        elements in the classical row-major storage layout. If padded, this
+        is a view of the allocated data, excluding the padding."""
+        if self._data_object is None:
+            self._allocate_memory()
+        data = self._data_object.ndpointer
+        if data.shape != self.shape:
+            data = data[..., :self.shape[-1]]
+        return data
+
+    @property
+    def _data_buffer(self):
         if self._data_object is None:
             self._allocate_memory()
         return self._data_object.ndpointer
 
+    def adopt(self, array, copy=None):
+        """
+        Make ``array``, a :class:`numpy.ndarray` or a :class:`numpy.memmap`,
+        the data of ``self`` without copying it. The memory remains owned by
+        ``array``, and is never freed by Devito.
+
+        The array is adopted only if it can be used as is by the generated
+        code: it must have the type of ``self``, and be writeable, C-contiguous
+        and aligned to ``SIMD_ALIGNMENT`` bytes; if ``self`` is padded, it must
+        include the padding. Further, ``self`` must not be allocated under a
+        specific :class:`AllocationPolicy`. Otherwise, ``array`` is copied into
+        newly allocated memory.
+
+        :param array: The array to be adopted, of shape ``self.shape`` or
+                      ``self.shape_allocated``.
+        :param copy: (Optional) If False, raise a ValueError rather than
+                     copying ``array``, when it cannot be adopted. If True,
+                     always copy ``array``. Defaults to None.
+        :returns: True if ``array`` was adopted, False if it was copied.
+        """
+        if array.shape not in (self.shape, self.shape_allocated):
+            raise ValueError("Cannot adopt array of shape %s as the data of `%s` "
+                             "(shape %s)" % (array.shape, self.name, self.shape))
+        if copy:
+            reason = "a copy was requested"
+        elif array.dtype != self.dtype:
+            reason = "its type is %s rather than %s" % (array.dtype,
+                                                        np.dtype(self.dtype))
+        elif not array.flags.c_contiguous:
+            reason = "it is not C-contiguous"
+        elif not array.flags.writeable:
+            reason = "it is read-only"
+        elif array.ctypes.data % SIMD_ALIGNMENT != 0:
+            reason = "it is not aligned to %d bytes" % SIMD_ALIGNMENT
+        elif array.shape != self.shape_allocated:
+            reason = "`%s` is padded" % self.name
+        elif self._policy != AllocationPolicy():
+            reason = "`%s` is allocated with %s" % (self.name, self._policy)
+        else:
+            debug("Adopting array as the data of %s" % self.name)
+            self._data_object = ExternalMemory(array)
+            return True
+        if copy is False:
+            raise ValueError("Cannot adopt array as the data of `%s`: %s"
+                             % (self.name, reason))
+        debug("Copying array into the data of %s, as %s" % (self.name, reason))
+        # Never write through to memory adopted before
+        if not isinstance(self._data_object, CMemory):
+            self._allocate_memory()
+        self.data[:] = array[..., :self.shape[-1]]
+        return False
+
     def initialize(self):
         """Apply the data initilisation function, if it is not None."""
         if self.initializer is not None:
@@ -312,8 +411,12 @@ class Function(TensorFunction):
         appropriate combination of symbolic dimension sizes shifted
         according to the ``staggered`` mask.
         """
-        return tuple(i.symbolic_size - s for i, s in
-                     zip(self.indices, self.staggered))
+        shape = tuple(i.symbolic_size - s for i, s in
+                      zip(self.indices, self.staggered))
+        if self._padding:
+            # The rows may be padded; their stride is passed at runtime
+            shape = shape[:-1] + (Symbol(name=self.stride_name),)
+        return shape
 
 
 class TimeFunction(Function):
@@ -332,6 +435,20 @@ class TimeFunction(Function):
     :param time_order: Order of the time discretization which affects the
                        final size of the leading time dimension of the
                        data buffer.
+    :param subsampling: (Optional) if :param save: is True, save only every
+                        ``subsampling``-th timestep, in a data buffer with
+                        ``(time_dim - 2) // subsampling + 1`` entries along
+                        time; that is, one per saved timestep up to
+                        ``time_dim - 2``, the last one an Operator stepping
+                        forward evaluates. The entry ``i`` holds the timestep
+                        ``i * subsampling``.
+    :param out_of_core: (Optional) if :param save: is True, store the data in a
+                        memory-mapped file, rather than in RAM. Either True or
+                        the directory, ideally on a local fast disk, where the
+                        file is created. Operators stage the data in and out
+                        of RAM in slabs of ``slab_size`` timesteps.
+    :param slab_size: (Optional) the number of timesteps in a slab of an
+                      out-of-core TimeFunction. Defaults to 8.
 
     .. note::
 
@@ -364,6 +481,9 @@ class TimeFunction(Function):
             self.time_dim = kwargs.get('time_dim', None)
             self.time_order = kwargs.get('time_order', 1)
             self.save = kwargs.get('save', False)
+            self.subsampling = kwargs.get('subsampling', None)
+            self.out_of_core = kwargs.get('out_of_core', None)
+            self.slab_size = int(kwargs.get('slab_size', 8))
 
             if not self.save:
                 if self.time_dim is not None:
@@ -378,6 +498,14 @@ class TimeFunction(Function):
                     error('Time dimension (time_dim) is required'
                           'to save intermediate data with save=True')
                     raise ValueError("Unknown time dimensions")
+            if self.subsampling is not None and not self.save:
+                error('Time subsampling requires save=True')
+                raise ValueError("Subsampling a stepping time dimension")
+            if self.out_of_core and not self.save:
+                error('Out-of-core storage requires save=True')
+                raise ValueError("Out-of-core stepping time dimension")
+            if self.slab_size < 1:
+                raise ValueError("The slab size must be a positive integer")
 
     @property
     def shape_data(self):
@@ -386,6 +514,8 @@ class TimeFunction(Function):
         """
         if self.save:
             tsize = self.time_dim - self.staggered[0]
+            if self.subsampling is not None:
+                tsize = (tsize - 2) // self.subsampling + 1
         else:
             tsize = self.time_order + 1
         shape_domain = tuple(i - s for i, s in zip(self.shape_domain,
@@ -396,6 +526,17 @@ class TimeFunction(Function):
         if self.initializer is not None:
             self.initializer(self.data)
 
+    def _allocate_memory(self):
+        """Allocate memory, in a memory-mapped file if out-of-core."""
+        if not self.out_of_core:
+            return super(TimeFunction, self)._allocate_memory()
+        directory = None if self.out_of_core is True else self.out_of_core
+        debug("Mapping memory for %s (%s) in a file" % (self.name,
+                                                        str(self.shape_allocated)))
+        # The file is zero-initialized, and touched only when staged in
+        self._data_object = MappedMemory(self.shape_allocated, dtype=self.dtype,
+                                         directory=directory)
+
     @classmethod
     def _indices(cls, **kwargs):
         """Return the default dimension indices for a given data shape
@@ -406,12 +547,16 @@ class TimeFunction(Function):
         """
         save = kwargs.get('save', None)
         grid = kwargs.get('grid', None)
+        subsampling = kwargs.get('subsampling', None)
 
         if grid is None:
             error('TimeFunction objects require a grid parameter.')
             raise ValueError('No grid provided for TimeFunction.')
 
-        tidx = grid.time_dim if save else grid.stepping_dim
+        if save and subsampling is not None:
+            tidx = grid.subsampled_dim(subsampling)
+        else:
+            tidx = grid.time_dim if save else grid.stepping_dim
         _indices = Function._indices(**kwargs)
         return tuple([tidx] + list(_indices))
 
@@ -488,6 +633,10 @@ class SparseFunction(CompositeFunction):
     :param nt: Size of the time dimension for point data
     :param coordinates: Optional coordinate data for the sparse points
     :param dtype: Data type of the buffered data
+    :param nbatch: (Optional) number of independent problems (e.g., shots)
+                   to be computed at once; each problem has its own set of
+                   points, so the point data and the coordinates get an
+                   additional dimension, ``grid.batch_dim``, of size ``nbatch``.
     """
 
     is_SparseFunction = True
@@ -506,8 +655,8 @@ class SparseFunction(CompositeFunction):
             # Allocate and copy coordinate data
             d = Dimension('d')
             self.coordinates = Function(name='%s_coords' % self.name,
-                                        dimensions=[self.indices[1], d],
-                                        shape=(self.npoint, self.grid.dim))
+                                        dimensions=list(self.indices[1:]) + [d],
+                                        shape=self.shape_data[1:] + (self.grid.dim,))
             self._children.append(self.coordinates)
             coordinates = kwargs.get('coordinates', None)
             if coordinates is not None:
@@ -529,7 +678,11 @@ class SparseFunction(CompositeFunction):
         """
         dimensions = kwargs.get('dimensions', None)
         grid = kwargs.get('grid', None)
-        return dimensions or [grid.time_dim, Dimension('p')]
+        if dimensions is None:
+            dimensions = [grid.time_dim, Dimension('p')]
+            if kwargs.get('nbatch', None) is not None:
+                dimensions.append(grid.batch_dim)
+        return dimensions
 
     @property
     def shape_data(self):
@@ -537,7 +690,10 @@ class SparseFunction(CompositeFunction):
         Full allocated shape of the data associated with this
         :class:`SparseFunction`.
         """
-        return (self.nt, self.npoint)
+        if self.nbatch is None:
+            return (self.nt, self.npoint)
+        else:
+            return (self.nt, self.npoint, self.nbatch)
 
     @property
     def coefficients(self):
@@ -619,8 +775,8 @@ class SparseFunction(CompositeFunction):
     @property
     def coordinate_symbols(self):
         """Symbol representing the coordinate values in each dimension"""
-        p_dim = self.indices[1]
-        return tuple([self.coordinates.indexify((p_dim, i))
+        indices = tuple(self.indices[1:])
+        return tuple([self.coordinates.indexify(indices + (i,))
                       for i in range(self.grid.dim)])
 
     @property
@@ -640,6 +796,14 @@ class SparseFunction(CompositeFunction):
                                            self.coordinate_indices,
                                            indices[:self.grid.dim])])
 
+    def _point_index(self, v, idx):
+        """Index the grid variable ``v`` at the space indices ``idx``. If
+        ``v`` is batched, it is indexed at the batch of this object."""
+        if v.base.function.nbatch is None:
+            return v.base[v.indices[:-self.grid.dim] + idx]
+        else:
+            return v.base[v.indices[:-self.grid.dim-1] + idx + v.indices[-1:]]
+
     def interpolate(self, expr, offset=0, **kwargs):
         """Creates a :class:`sympy.Eq` equation for the interpolation
         of an expression onto this sparse point collection.
@@ -670,8 +834,7 @@ class SparseFunction(CompositeFunction):
         # Generate index substituions for all grid variables
         idx_subs = []
         for i, idx in enumerate(index_matrix):
-            v_subs = [(v, v.base[v.indices[:-self.grid.dim] + idx])
-                      for v in variables]
+            v_subs = [(v, self._point_index(v, idx)) for v in variables]
             idx_subs += [OrderedDict(v_subs)]
         # Substitute coordinate base symbols into the coefficients
         subs = OrderedDict(zip(self.point_symbols, self.coordinate_bases))
@@ -714,7 +877,7 @@ class SparseFunction(CompositeFunction):
         # the sparse `SparseFunction` types
         idx_subs = []
         for i, idx in enumerate(index_matrix):
-            v_subs = [(v, v.base[v.indices[:-self.grid.dim] + idx])
+            v_subs = [(v, self._point_index(v, idx))
                       for v in variables if not v.base.function.is_SparseFunction]
             idx_subs += [OrderedDict(v_subs)]
 
@@ -723,3 +886,16 @@ class SparseFunction(CompositeFunction):
         return [Eq(field.subs(vsub),
                    field.subs(vsub) + expr.subs(subs).subs(vsub) * b.subs(subs))
                 for b, vsub in zip(self.coefficients, idx_subs)]
+
+
+def vector_items(dtype):
+    """
+    Return the number of items of type ``dtype`` fitting in a vector register
+    of the current architecture; if unknown, in an AVX-512 register, the widest
+    expectable.
+    """
+    from devito.dle.backends.utils import get_simd_items, simdinfo
+    try:
+        return get_simd_items(dtype)
+    except KeyError:
+        return simdinfo['avx512f'] // np.dtype(dtype).itemsize
@@ -1,5 +1,6 @@
 from devito.tools import as_tuple
-from devito.dimension import SpaceDimension, TimeDimension, SteppingDimension
+from devito.dimension import (BatchDimension, SpaceDimension, SubsampledDimension,
+                              TimeDimension, SteppingDimension)
 from devito.base import Constant
 
 import numpy as np
@@ -89,11 +90,20 @@ class Grid(object):
             self.stepping_dim = SteppingDimension('%s_s' % time_dimension.name,
                                                   parent=self.time_dim)
 
+        # The dimension of the Functions computing a batch of problems at once
+        self.batch_dim = BatchDimension('batch')
+
     def __repr__(self):
         return "Grid[extent=%s, shape=%s, dimensions=%s]" % (
             self.extent, self.shape, self.dimensions
         )
 
+    def subsampled_dim(self, factor):
+        """The :class:`SubsampledDimension` taking every ``factor``-th point
+        of the time dimension."""
+        return SubsampledDimension('%s_sub%d' % (self.time_dim.name, factor),
+                                   parent=self.time_dim, factor=factor)
+
     @property
     def dim(self):
         """Problem dimension, or number of spatial dimensions."""
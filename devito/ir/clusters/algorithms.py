@@ -3,7 +3,7 @@ from collections import OrderedDict, namedtuple
 from devito.ir.clusters.cluster import Cluster
 from devito.ir.dfg import TemporariesGraph
 from devito.ir.support import Stencil
-from devito.symbolics import xreplace_indices
+from devito.symbolics import retrieve_indexed, xreplace_indices
 from devito.types import Scalar
 
 __all__ = ['clusterize', 'optimize']
@@ -13,14 +13,26 @@ def merge(clusters):
     """
     Given an ordered collection of :class:`Cluster` objects, return a
     (potentially) smaller sequence in which clusters with identical stencil
-    have been merged into a single :class:`Cluster`.
+    (and guards) have been merged into a single :class:`Cluster`. Reductions
+    are kept apart, so as not to constrain the parallelization of the others.
+    A cluster is never merged into a preceding one if a cluster in between
+    accesses a tensor it writes, or writes a tensor it reads.
     """
-    mapper = OrderedDict()
+    groups = []
     for c in clusters:
-        mapper.setdefault((c.stencil.entries, c.atomics), []).append(c)
+        key = (c.stencil.entries, c.atomics, c.guards, c.reductions)
+        for k, v in reversed(groups):
+            if k == key:
+                v.append(c)
+                break
+            if dependent(c, v):
+                groups.append((key, [c]))
+                break
+        else:
+            groups.append((key, [c]))
 
     processed = []
-    for (entries, atomics), clusters in mapper.items():
+    for (entries, atomics, _, _), clusters in groups:
         # Eliminate redundant temporaries
         temporaries = OrderedDict()
         for c in clusters:
@@ -33,6 +45,23 @@ def merge(clusters):
     return processed
 
 
+def dependent(cluster, clusters):
+    """
+    Return True if ``cluster`` accesses a tensor written by any of ``clusters``,
+    or writes a tensor they read.
+    """
+    def accesses(c):
+        writes = {e.lhs.base.function for e in c.exprs if e.lhs.is_Indexed}
+        reads = {i.base.function for e in c.exprs for i in retrieve_indexed(e.rhs)}
+        return writes, reads
+    writes, reads = accesses(cluster)
+    for c in clusters:
+        w, r = accesses(c)
+        if w & (writes | reads) or r & writes:
+            return True
+    return False
+
+
 def optimize(clusters):
     """
     Attempt scalar promotion. Candidates are tensors that do not appear in
@@ -1,5 +1,8 @@
+from cached_property import cached_property
+
 from devito.ir.dfg import TemporariesGraph
-from devito.tools import as_tuple
+from devito.symbolics import retrieve_indexed
+from devito.tools import as_tuple, filter_sorted
 
 
 class Cluster(object):
@@ -27,6 +30,34 @@ class Cluster(object):
     def exprs(self):
         return self.trace.values()
 
+    @cached_property
+    def guards(self):
+        """
+        The :class:`SubsampledDimension`s indexing the expressions. The Cluster
+        is only evaluated when the iteration variable of their parent is a
+        multiple of the subsampling factor.
+        """
+        guards = [d for e in self.exprs for i in retrieve_indexed(e)
+                  for j in i.indices for d in j.free_symbols
+                  if getattr(d, 'is_Subsampled', False)]
+        return tuple(filter_sorted(guards, key=lambda d: d.name))
+
+    @cached_property
+    def reductions(self):
+        """
+        The non-time :class:`Dimension`s along which the Cluster performs a
+        reduction; that is, it updates a tensor entry that does not depend on
+        them. For example, ``s[t, x] = max(s[t, x], |u[t, x, y]|)`` is a
+        reduction along ``y``.
+        """
+        reductions = []
+        for e in self.exprs:
+            if e.lhs.is_Indexed and e.lhs in retrieve_indexed(e.rhs):
+                indices = set().union(*[i.free_symbols for i in e.lhs.indices])
+                reductions.extend([d for d in self.stencil.dimensions
+                                   if d not in indices and not d.is_Time])
+        return tuple(filter_sorted(reductions, key=lambda d: d.name))
+
     @property
     def unknown(self):
         return self.trace.unknown
@@ -12,7 +12,8 @@ a library such as ISL (the Integer Set Library).
 from collections import OrderedDict
 
 from devito.ir.iet import (Iteration, SEQUENTIAL, PARALLEL, VECTOR, WRAPPABLE,
-                           FindSections, IsPerfectIteration, NestedTransformer)
+                           REDUCTION, FindSections, IsPerfectIteration,
+                           NestedTransformer)
 from devito.symbolics import as_symbol
 from devito.tools import as_tuple, flatten
 
@@ -37,12 +38,16 @@ def analyze_iterations(nodes):
         mapper = detect_outermost_sequential_inner_parallel(tree, deps_graph, mapper)
         mapper = detect_innermost_unitstride(tree, deps_graph, mapper)
         mapper = detect_wrappable_iterations(tree, deps_graph, mapper)
+        mapper = detect_reductions(tree, exprs, mapper)
 
     # Global analysis
     for k, v in list(mapper.items()):
         args = k.args
         # SEQUENTIAL kills PARALLEL
         properties = [i for i in v if i != PARALLEL] if SEQUENTIAL in v else v
+        # REDUCTION kills PARALLEL and VECTOR
+        if REDUCTION in properties:
+            properties = [i for i in properties if i not in (PARALLEL, VECTOR)]
         properties = as_tuple(args.pop('properties')) + as_tuple(properties)
         mapper[k] = Iteration(properties=properties, **args)
 
@@ -186,3 +191,23 @@ def detect_wrappable_iterations(tree, deps_graph, mapper=None):
     if is_WP:
         mapper.setdefault(stepping, []).append(WRAPPABLE)
     return mapper
+
+
+def detect_reductions(tree, exprs, mapper=None):
+    """
+    Update ``mapper``, a dictionary from :class:`Iteration`s to
+    :class:`IterationProperty`s, by annotating the Iterations along which an
+    :class:`Expression` updates a tensor entry that does not depend on them,
+    such as ``y`` in ``s[x] = max(s[x], u[x, y])``. Time Iterations are
+    inherently sequential, hence never annotated.
+    """
+    if mapper is None:
+        mapper = OrderedDict()
+    for e in exprs:
+        if e.is_scalar or e.output not in e.reads:
+            continue
+        indices = set().union(*[i.free_symbols for i in e.output.indices])
+        for i in tree:
+            if i.dim not in indices and not i.dim.is_Time:
+                mapper.setdefault(i, []).append(REDUCTION)
+    return mapper
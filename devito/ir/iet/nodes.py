@@ -19,7 +19,7 @@ from devito.arguments import ArgumentProvider, Argument
 import devito.types as types
 
 __all__ = ['Node', 'Block', 'Denormals', 'Expression', 'Element', 'Callable',
-           'Call', 'Iteration', 'List', 'LocalExpression', 'TimedList']
+           'Call', 'Conditional', 'Iteration', 'List', 'LocalExpression', 'TimedList']
 
 
 class Node(object):
@@ -32,6 +32,7 @@ class Node(object):
     is_Callable = False
     is_Call = False
     is_List = False
+    is_Conditional = False
     is_Element = False
 
     """
@@ -127,6 +128,20 @@ class List(Block):
     is_List = True
 
 
+class Conditional(Block):
+
+    """A sequence of nodes, evaluated only if ``condition`` holds."""
+
+    is_Conditional = True
+
+    def __init__(self, condition, body=None):
+        super(Conditional, self).__init__(body=body)
+        self.condition = condition
+
+    def __repr__(self):
+        return "<Conditional %s>" % self.condition
+
+
 class Element(Node):
 
     """A generic node in an Iteration/Expression tree. Can be a comment,
@@ -136,7 +151,7 @@ class Element(Node):
 
     def __init__(self, element):
         assert isinstance(element, (c.Comment, c.Statement, c.Value, c.Initializer,
-                                    c.Pragma, c.Line, c.Assign, c.POD))
+                                    c.Pragma, c.Line, c.Assign, c.POD, c.If))
         self.element = element
 
     def __repr__(self):
@@ -42,6 +42,10 @@ PARALLEL = IterationProperty('parallel')
 VECTOR = IterationProperty('vector-dim')
 """The Iteration can be SIMD-vectorized."""
 
+REDUCTION = IterationProperty('reduction')
+"""The Iteration carries a reduction, i.e., the same entry of a tensor is updated
+at each of its iterations, e.g. s[x] = max(s[x], u[x, y]) along y."""
+
 ELEMENTAL = IterationProperty('elemental')
 """The Iteration can be pulled out to an elemental function."""
 
@@ -13,7 +13,7 @@ from operator import attrgetter
 import cgen as c
 import numpy as np
 
-from devito.cgen_utils import blankline, ccode
+from devito.cgen_utils import CodePrinter, blankline, ccode
 from devito.dimension import LoweredDimension
 from devito.exceptions import VisitorException
 from devito.ir.iet.nodes import Iteration, Node, UnboundedIndex
@@ -23,8 +23,9 @@ from devito.tools import as_tuple, filter_ordered, filter_sorted, flatten, ctype
 
 __all__ = ['FindNodes', 'FindSections', 'FindSymbols', 'FindScopes',
            'IsPerfectIteration', 'SubstituteExpression', 'printAST', 'CGen',
-           'ResolveTimeStepping', 'Transformer', 'NestedTransformer',
-           'FindAdjacentIterations', 'MergeOuterIterations', 'MapExpressions']
+           'CGenUnits', 'CGenBatch', 'ResolveTimeStepping', 'Transformer',
+           'NestedTransformer', 'FindAdjacentIterations', 'MergeOuterIterations',
+           'MapExpressions']
 
 
 class Visitor(object):
@@ -272,6 +273,11 @@ class CGen(Visitor):
         body = flatten(self.visit(i) for i in o.children)
         return c.Module(o.header + (c.Collection(body),) + o.footer)
 
+    def visit_Conditional(self, o):
+        body = flatten(self.visit(i) for i in o.children)
+        # Not /ccode/, which would print a relational as an assignment
+        return c.If(CodePrinter().doprint(o.condition), c.Block(body))
+
     def visit_Element(self, o):
         return o.element
 
@@ -342,18 +348,25 @@ class CGen(Visitor):
         return c.FunctionBody(signature, c.Block(casts + body))
 
     def visit_Operator(self, o):
-        # Kernel signature and body
+        signature, kernel = self._operator_kernel(o)
+
+        # Elemental functions
+        efuncs = [i.root.ccode for i in o.func_table.values() if i.local] + [blankline]
+
+        return c.Module(self._operator_preamble(o, signature) + efuncs + [kernel])
+
+    def _operator_kernel(self, o):
+        """Return the signature and the body of the kernel of an Operator."""
         body = flatten(self.visit(i) for i in o.children)
         decls = self._args_decl(o.parameters)
         casts = self._args_cast(o.parameters)
         signature = c.FunctionDeclaration(c.Value(o.retval, o.name), decls)
         retval = [c.Statement("return 0")]
         kernel = c.FunctionBody(signature, c.Block(casts + body + retval))
+        return signature, kernel
 
-        # Elemental functions
-        efuncs = [i.root.ccode for i in o.func_table.values() if i.local] + [blankline]
-
-        # Header files, extra definitions, ...
+    def _operator_preamble(self, o, signature):
+        """Return the header files, extra definitions, ... of an Operator."""
         header = [c.Line(i) for i in o._headers]
         includes = [c.Include(i, system=False) for i in o._includes]
         includes += [blankline]
@@ -361,8 +374,75 @@ class CGen(Visitor):
         if o._compiler.src_ext == 'cpp':
             cglobals += [c.Extern('C', signature)]
         cglobals = [i for j in cglobals for i in (j, blankline)]
+        return header + includes + cglobals
+
+
+class CGenUnits(CGen):
+
+    """
+    Return a representation of an :class:`Operator` as a list of separate
+    translation units, that is ``cgen`` modules: one for the Operator kernel,
+    followed by one for each of its local elemental functions. Each unit
+    carries its own copy of the Operator preamble, while the kernel unit
+    declares the prototypes of the elemental functions.
+    """
 
-        return c.Module(header + includes + cglobals + efuncs + [kernel])
+    def visit_Operator(self, o):
+        signature, kernel = self._operator_kernel(o)
+        preamble = self._operator_preamble(o, signature)
+
+        efuncs = [i.root.ccode for i in o.func_table.values() if i.local]
+        prototypes = [i.fdecl for i in efuncs] + [blankline]
+
+        units = [c.Module(preamble + prototypes + [kernel])]
+        units.extend(c.Module(preamble + [i]) for i in efuncs)
+        return units
+
+
+class CGenBatch(CGen):
+
+    """
+    Return a representation of an :class:`Operator` as a ``cgen`` module
+    providing a driver, ``<kernel>_batch``, which invokes the (separately
+    compiled and loaded) Operator kernel, through the function pointer
+    ``_kernel``, on a batch of argument sets back to back. For each kernel
+    argument, the driver takes an array of per-invocation values; the
+    ``_nreset`` buffers in ``_reset`` are zeroed in between any two invocations.
+    """
+
+    def visit_Operator(self, o):
+        signature, driver = self._operator_batch(o)
+        module = [c.Include('string.h', system=False), blankline]
+        if o._compiler.src_ext == 'cpp':
+            module += [c.Extern('C', signature), blankline]
+        return c.Module(module + [driver])
+
+    def _operator_batch(self, o):
+        """Return the signature and the body of the batch driver of an Operator."""
+        kernel = ', '.join(i.inline() for i in self._args_decl(o.parameters))
+        decls = [c.Value(o.retval, '(*_kernel)(%s)' % kernel),
+                 c.Value('const int', '_nbatch'), c.Value('const int', '_nreset'),
+                 c.Value('void', '**_reset'), c.Value('const long', '*_reset_bytes')]
+        args = []
+        for i in o.parameters:
+            if i.is_ScalarArgument:
+                decls.append(c.Value('const %s' % c.dtype_to_ctype(i.dtype),
+                                     '*%s' % i.name))
+                args.append('%s[_b]' % i.name)
+            elif i.is_TensorArgument:
+                decls.append(c.Value(c.dtype_to_ctype(i.dtype), '**%s_vec' % i.name))
+                args.append('%s_vec[_b]' % i.name)
+            else:
+                decls.append(c.Value('void', '**_%s' % i.name))
+                args.append('_%s[_b]' % i.name)
+        reset = c.For('int _r = 0', '_r < _nreset', '_r += 1',
+                      c.Statement('memset(_reset[_r], 0, _reset_bytes[_r])'))
+        call = c.Statement('_kernel(%s)' % ', '.join(args))
+        loop = c.For('int _b = 0', '_b < _nbatch', '_b += 1',
+                     c.Block([c.If('_b > 0', reset), call]))
+        signature = c.FunctionDeclaration(c.Value(o.retval, '%s_batch' % o.name), decls)
+        driver = c.FunctionBody(signature, c.Block([loop, c.Statement('return 0')]))
+        return signature, driver
 
 
 class FindSections(Visitor):
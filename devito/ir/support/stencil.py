@@ -1,6 +1,6 @@
 from collections import OrderedDict, namedtuple
 
-from sympy import Eq
+from sympy import Eq, preorder_traversal
 
 from devito.exceptions import StencilOperationError
 from devito.dimension import Dimension
@@ -69,7 +69,8 @@ class Stencil(DefaultOrderedDict):
             elif e.is_Indexed:
                 d = []
                 for a in e.indices:
-                    found = [i for i in a.free_symbols if isinstance(i, Dimension)]
+                    # Traversal order, as /free_symbols/ is unordered
+                    found = [i for i in preorder_traversal(a) if isinstance(i, Dimension)]
                     d.extend([i for i in found if i not in d])
                 dims[tuple(d)] = e
         # ... giving higher priority to TimeFunction objects; time always go first
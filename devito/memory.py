@@ -1,16 +1,27 @@
 from __future__ import absolute_import
 
 import ctypes
+import mmap
+import os
+import tempfile
+import threading
+import weakref
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from ctypes.util import find_library
 from functools import reduce
 from operator import mul
+from sys import platform
+from time import time
 
+import cgen as c
 import numpy as np
-from sympy import Eq
 
-from devito.logger import error
+from devito.compiler import jit_compile, load
+from devito.logger import error, warning
+from devito.parameters import configuration
 from devito.tools import numpy_to_ctypes
-import devito
 
 """
 Pre-load ``libc`` to explicitly manage C memory
@@ -18,19 +29,473 @@ Pre-load ``libc`` to explicitly manage C memory
 libc = ctypes.CDLL(find_library('c'))
 
 
+# The allocator of the C memory of the Functions: 'default', allocating and
+# freeing it through the system allocator, or 'pool', reusing the freed memory.
+# At most 'allocator_pool_size' bytes are retained by the pool (None means
+# unbounded)
+configuration.add('allocator', 'default', ['default', 'pool'])
+configuration.add('allocator_pool_size', None)
+
+# The default allocation policy of the C memory of the Functions: whether it
+# should be backed by transparent huge pages, and its NUMA placement ('local'
+# or 'interleave'; None leaves it to the kernel)
+configuration.add('hugepages', 0, [0, 1], lambda i: bool(i))
+configuration.add('numa', None, [None, 'local', 'interleave'])
+
+
 class CMemory(object):
 
-    def __init__(self, shape, dtype=np.float32, alignment=None):
-        self.ndpointer, self.data_pointer = malloc_aligned(shape, alignment, dtype)
+    """
+    A data object living in aligned C memory, obtained from the allocator
+    selected through ``configuration['allocator']``.
+
+    :param shape: Shape of the data.
+    :param dtype: (Optional) Data type of the data. Defaults to np.float32.
+    :param alignment: (Optional) Alignment, in bytes. Defaults to the page size.
+    :param policy: (Optional) The :class:`AllocationPolicy` of the memory.
+    """
+
+    def __init__(self, shape, dtype=np.float32, alignment=None, policy=None):
+        self.allocator = get_allocator()
+        self.policy = policy
+        self.nbytes = int(reduce(mul, shape)) * np.dtype(dtype).itemsize
+        self.alignment = alignment or libc.getpagesize()
+        if policy is not None:
+            self.alignment = max(self.alignment, policy.alignment)
+            self.nbytes = policy.block_size(self.nbytes)
+
+        address = self.allocator.malloc(self.nbytes, self.alignment, policy)
+        if address is None:
+            error("Unable to allocate memory for shape %s", str(shape))
+            raise MemoryError("Unable to allocate %d bytes" % self.nbytes)
+        self.data_pointer = ctypes.cast(address, np.ctypeslib.ndpointer(dtype=dtype,
+                                                                        shape=shape))
+        self.ndpointer = np.ctypeslib.as_array(self.data_pointer, shape=shape)
 
     def __del__(self):
-        free(self.data_pointer)
-        self.data_pointer = None
+        if getattr(self, 'data_pointer', None) is not None:
+            self.allocator.free(ctypes.cast(self.data_pointer, ctypes.c_void_p).value,
+                                self.nbytes, self.alignment, self.policy)
+            self.data_pointer = None
 
     def fill(self, val):
         self.ndpointer.fill(val)
 
 
+class MemoryAllocator(object):
+
+    """
+    Allocate and free aligned C memory through the system allocator, keeping
+    track of the bytes in use.
+    """
+
+    def __init__(self):
+        # Memory may be freed, upon garbage collection, by any thread, even
+        # within an allocation
+        self._lock = threading.RLock()
+        self._live = 0
+        self._peak = 0
+
+    def block_size(self, nbytes):
+        """The size, in bytes, of the block allocated for ``nbytes`` bytes."""
+        return nbytes
+
+    def malloc(self, nbytes, alignment, policy=None):
+        """
+        Return the address of a block of (at least) ``nbytes`` bytes, aligned
+        to ``alignment`` bytes and placed according to the
+        :class:`AllocationPolicy` ``policy``, or None if the allocation fails.
+        """
+        size = self.block_size(nbytes)
+        address = self._malloc(size, alignment, policy)
+        if address is not None:
+            with self._lock:
+                self._live += size
+                self._peak = max(self._peak, self._live)
+        return address
+
+    def free(self, address, nbytes, alignment, policy=None):
+        """Free the block at ``address``, allocated through :meth:`malloc`."""
+        size = self.block_size(nbytes)
+        with self._lock:
+            self._live -= size
+        self._free(address, size, alignment, policy)
+
+    def _malloc(self, size, alignment, policy):
+        address = ctypes.c_void_p()
+        ret = libc.posix_memalign(ctypes.byref(address), alignment,
+                                  ctypes.c_size_t(max(size, 1)))
+        if ret != 0:
+            return None
+        if policy is not None:
+            # The pages are not touched yet, so the policy affects them all
+            policy.apply(address.value, size)
+        return address.value
+
+    def _free(self, address, size, alignment, policy):
+        libc.free(ctypes.c_void_p(address))
+
+    @property
+    def pooled(self):
+        """The bytes retained for reuse."""
+        return 0
+
+    @property
+    def stats(self):
+        """The :class:`AllocatorStats` of ``self``."""
+        with self._lock:
+            return AllocatorStats(self._live, self.pooled, self._peak)
+
+    def reset_stats(self):
+        """Reset the peak of the bytes in use to the bytes currently in use."""
+        with self._lock:
+            self._peak = self._live
+
+
+class PoolAllocator(MemoryAllocator):
+
+    """
+    A :class:`MemoryAllocator` retaining the freed blocks in pools, for reuse
+    by later allocations, rather than returning them to the system; the pages
+    of a reused block are already mapped, and need not be faulted in again.
+
+    The requested sizes are rounded up to a size class: a multiple of the page
+    size, and one of four sizes (1, 1.25, 1.5 and 1.75 times a power of two)
+    per power of two, which wastes at most 25% of a block. Each size class,
+    alignment and :class:`AllocationPolicy` gets its own pool, as reused blocks
+    keep the placement of their pages. Freed blocks not fitting within the
+    ``capacity``, in bytes, of the pools are returned to the system.
+
+    :param capacity: (Optional) The maximum number of bytes retained. Defaults
+                     to ``configuration['allocator_pool_size']``.
+    """
+
+    def __init__(self, capacity=None):
+        super(PoolAllocator, self).__init__()
+        self._capacity = capacity
+        self._pools = {}
+        self._pooled = 0
+
+    @property
+    def capacity(self):
+        if self._capacity is not None:
+            return self._capacity
+        capacity = configuration['allocator_pool_size']
+        return None if capacity is None else int(capacity)
+
+    def block_size(self, nbytes):
+        pagesize = mmap.PAGESIZE
+        npages = max(-(-nbytes // pagesize), 1)
+        # The size class: the number of pages rounded up to 3 significant bits
+        step = 2**max(npages.bit_length() - 3, 0)
+        return -(-npages // step) * step * pagesize
+
+    def _malloc(self, size, alignment, policy):
+        with self._lock:
+            pool = self._pools.get((size, alignment, policy))
+            if pool:
+                self._pooled -= size
+                return pool.pop()
+        return super(PoolAllocator, self)._malloc(size, alignment, policy)
+
+    def _free(self, address, size, alignment, policy):
+        with self._lock:
+            capacity = self.capacity
+            if capacity is None or self._pooled + size <= capacity:
+                self._pools.setdefault((size, alignment, policy), []).append(address)
+                self._pooled += size
+                return
+        super(PoolAllocator, self)._free(address, size, alignment, policy)
+
+    @property
+    def pooled(self):
+        return self._pooled
+
+    def release(self):
+        """Return all of the retained blocks to the system."""
+        with self._lock:
+            pools, self._pools, self._pooled = self._pools, {}, 0
+        for (size, alignment, policy), pool in pools.items():
+            for address in pool:
+                super(PoolAllocator, self)._free(address, size, alignment, policy)
+
+
+class AllocationPolicy(namedtuple('AllocationPolicy', 'hugepages numa')):
+
+    """
+    The placement of a block of C memory. If ``hugepages``, the block is
+    aligned to, and sized in multiples of, 2 MiB, and advised to be backed by
+    transparent huge pages. ``numa`` is the NUMA placement of its pages:
+    ``'local'``, on the node of the thread touching them first, or
+    ``'interleave'``, round-robin over all nodes; None leaves it to the kernel.
+
+    The NUMA placement is carried out through libnuma; if unavailable, it is
+    dropped from the policy, with a warning.
+    """
+
+    def __new__(cls, hugepages=False, numa=None):
+        if numa not in (None, 'local', 'interleave'):
+            raise ValueError("Illegal NUMA placement `%s`; expected 'local' or "
+                             "'interleave'" % numa)
+        if numa is not None and get_libnuma() is None:
+            numa = None
+        return super(AllocationPolicy, cls).__new__(cls, bool(hugepages), numa)
+
+    def __str__(self):
+        return 'hugepages=%s, numa=%s' % ('on' if self.hugepages else 'off',
+                                          self.numa or 'default')
+
+    @property
+    def alignment(self):
+        return HUGEPAGE_SIZE if self.hugepages else libc.getpagesize()
+
+    def block_size(self, nbytes):
+        """The bytes allocated, under ``self``, for ``nbytes`` bytes."""
+        return -(-nbytes // self.alignment) * self.alignment
+
+    def apply(self, address, nbytes):
+        """Apply ``self`` to the (untouched) block of ``nbytes`` bytes at
+        ``address``."""
+        if self.hugepages:
+            if libc.madvise(ctypes.c_void_p(address), ctypes.c_size_t(nbytes),
+                            MADV_HUGEPAGE) != 0:
+                warning("Transparent huge pages are not available")
+        if self.numa == 'local':
+            get_libnuma().numa_setlocal_memory(ctypes.c_void_p(address),
+                                               ctypes.c_size_t(nbytes))
+        elif self.numa == 'interleave':
+            libnuma = get_libnuma()
+            nodes = ctypes.c_void_p.in_dll(libnuma, 'numa_all_nodes_ptr')
+            libnuma.numa_interleave_memory(ctypes.c_void_p(address),
+                                           ctypes.c_size_t(nbytes), nodes)
+
+
+HUGEPAGE_SIZE = 2*1024**2
+MADV_HUGEPAGE = 14
+
+
+_libnuma = []
+
+
+def get_libnuma():
+    """Return libnuma, if available on a NUMA-capable system, or None."""
+    if not _libnuma:
+        libnuma = None
+        name = find_library('numa')
+        if name is not None:
+            try:
+                libnuma = ctypes.CDLL(name)
+                if libnuma.numa_available() < 0:
+                    libnuma = None
+            except OSError:
+                libnuma = None
+        if libnuma is None:
+            warning("libnuma is not available; the NUMA placement of the data "
+                    "is left to the kernel")
+        _libnuma.append(libnuma)
+    return _libnuma[0]
+
+
+AllocatorStats = namedtuple('AllocatorStats', 'live pooled peak')
+"""The bytes of C memory in use, retained for reuse, and the peak of the bytes
+in use, of a :class:`MemoryAllocator`."""
+
+
+_allocators = {'default': MemoryAllocator(), 'pool': PoolAllocator()}
+
+
+def get_allocator(name=None):
+    """
+    Return the :class:`MemoryAllocator` ``name`` (one of ``'default'`` and
+    ``'pool'``); defaults to the one selected through ``configuration``.
+    """
+    return _allocators[name or configuration['allocator']]
+
+
+def allocator_stats(name=None):
+    """
+    Return the :class:`AllocatorStats` of the allocator ``name``; defaults to
+    the one selected through ``configuration``.
+    """
+    return get_allocator(name).stats
+
+
+SIMD_ALIGNMENT = 64
+"""The alignment, in bytes, the generated code assumes for the data of
+:class:`Function`s."""
+
+
+class ExternalMemory(object):
+
+    """
+    A data object wrapping memory allocated outside of Devito, for example
+    a :class:`numpy.ndarray` mapped onto a shared memory segment, or a
+    :class:`numpy.memmap`. Unlike :class:`CMemory`, the memory is owned by the
+    array, hence never freed by Devito; the array is kept alive for as long as
+    the data object is referenced.
+
+    The array is wrapped as is: it must be C-contiguous and aligned to
+    ``SIMD_ALIGNMENT`` bytes, as checked by :meth:`Function.adopt`.
+    """
+
+    def __init__(self, array):
+        self.ndpointer = array
+
+    def fill(self, val):
+        self.ndpointer.fill(val)
+
+
+class MappedMemory(object):
+
+    """
+    A data object living in a memory-mapped file, for data not fitting in RAM
+    such as a saved wavefield. The entries along the leading (time) axis are
+    staged in and out of RAM in slabs, through :meth:`stage`, by a background
+    I/O thread: while a slab is computed upon, the next one is prefetched and
+    the ones no longer needed are written back to the file and evicted.
+
+    :param shape: Shape of the data.
+    :param dtype: (Optional) Data type of the data. Defaults to np.float32.
+    :param directory: (Optional) The directory, ideally on a local fast disk,
+                      in which the (temporary) file is created. Defaults to
+                      the system temporary directory.
+    """
+
+    def __init__(self, shape, dtype=np.float32, directory=None):
+        self.shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        size = int(reduce(mul, self.shape))
+        self.entry_nbytes = size // self.shape[0] * dtype.itemsize
+
+        fd, self.filename = tempfile.mkstemp(prefix='devito-', suffix='.dat',
+                                             dir=directory)
+        os.ftruncate(fd, max(size * dtype.itemsize, 1))
+        self._mmap = mmap.mmap(fd, max(size * dtype.itemsize, 1), flags=mmap.MAP_SHARED)
+        self._fd = fd
+        self._finalizer = weakref.finalize(self, _unmap, fd, self.filename)
+        self.ndpointer = np.frombuffer(self._mmap, dtype=dtype,
+                                       count=size).reshape(self.shape)
+
+        # The staging state
+        self._executor = None
+        self._pending = None
+        self._resident = set()
+        self.reset_stats()
+
+    def fill(self, val):
+        self.ndpointer.fill(val)
+
+    def reset_stats(self):
+        """Reset the I/O statistics: the number of bytes staged in and out
+        of RAM, the time spent by the I/O thread, and the time the computation
+        waited (stalled) for the I/O to complete."""
+        self.nbytes = 0
+        self.io_time = 0.
+        self.stall_time = 0.
+
+    def stage(self, needed, upcoming):
+        """
+        Make resident the entries ``needed`` next, then, in the background,
+        prefetch the entries ``upcoming`` afterwards, and write back and evict
+        all other entries.
+
+        :param needed: An iterable of indices along the leading axis.
+        :param upcoming: An iterable of indices along the leading axis.
+        """
+        tic = time()
+        self.wait()
+        missing = [i for i in needed if i not in self._resident]
+        self._transfer(missing, ())
+        self.stall_time += time() - tic
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        keep = set(needed) | set(upcoming)
+        evict = self._resident - keep
+        prefetch = [i for i in upcoming if i not in self._resident]
+        self._pending = self._executor.submit(self._transfer, prefetch, evict)
+
+    def wait(self):
+        """Wait for the background I/O in progress, if any."""
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+
+    def flush(self):
+        """Write back and evict all resident entries."""
+        tic = time()
+        self.wait()
+        self._transfer((), set(self._resident))
+        self.stall_time += time() - tic
+
+    def _transfer(self, prefetch, evict):
+        tic = time()
+        for start, stop in _ranges(evict):
+            self._writeback(start, stop)
+        for start, stop in _ranges(prefetch):
+            self._prefetch(start, stop)
+        self._resident.difference_update(evict)
+        self._resident.update(prefetch)
+        self.nbytes += (len(prefetch) + len(evict)) * self.entry_nbytes
+        self.io_time += time() - tic
+
+    def _extent(self, start, stop, inward=False):
+        """The page-aligned byte range covering the entries in [start, stop)."""
+        pagesize = mmap.PAGESIZE
+        lower, upper = start * self.entry_nbytes, stop * self.entry_nbytes
+        if inward:
+            lower, upper = -(-lower // pagesize) * pagesize, upper // pagesize * pagesize
+        else:
+            lower, upper = lower // pagesize * pagesize, -(-upper // pagesize) * pagesize
+        upper = min(upper, len(self._mmap))
+        return lower, max(upper - lower, 0)
+
+    def _prefetch(self, start, stop):
+        offset, nbytes = self._extent(start, stop)
+        if nbytes == 0:
+            return
+        if hasattr(os, 'posix_fadvise'):
+            # Not available e.g. on OSX, where faulting the pages in suffices
+            os.posix_fadvise(self._fd, offset, nbytes, os.POSIX_FADV_WILLNEED)
+        # Fault the pages in from this thread, rather than from the computation
+        pages = np.frombuffer(self._mmap, dtype=np.uint8, count=nbytes, offset=offset)
+        pages[::mmap.PAGESIZE].sum()
+
+    def _writeback(self, start, stop):
+        address = self.ndpointer.ctypes.data
+        offset, nbytes = self._extent(start, stop)
+        if nbytes > 0:
+            libc.msync(ctypes.c_void_p(address + offset), ctypes.c_size_t(nbytes),
+                       MS_SYNC)
+        # Only the pages entirely within [start, stop) may be dropped
+        offset, nbytes = self._extent(start, stop, inward=True)
+        if nbytes > 0:
+            libc.madvise(ctypes.c_void_p(address + offset), ctypes.c_size_t(nbytes),
+                         MADV_DONTNEED)
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(self._fd, offset, nbytes, os.POSIX_FADV_DONTNEED)
+
+
+MS_SYNC = 0x10 if platform == 'darwin' else 4
+MADV_DONTNEED = 4
+
+
+def _unmap(fd, filename):
+    os.close(fd)
+    os.unlink(filename)
+
+
+def _ranges(indices):
+    """Group the integers ``indices`` into maximal ranges [start, stop)."""
+    ranges = []
+    for i in sorted(indices):
+        if ranges and ranges[-1][1] == i:
+            ranges[-1][1] = i + 1
+        else:
+            ranges.append([i, i + 1])
+    return ranges
+
+
 def malloc_aligned(shape, alignment=None, dtype=np.float32):
     """ Allocate memory using the C function malloc_aligned
     :param shape: Shape of the array to allocate
@@ -74,10 +539,97 @@ def free(internal_pointer):
     libc.free(internal_pointer)
 
 
-def first_touch(array):
-    """Uses the Propagator low-level API to initialize the given array(in Devito types)
-    in the same pattern that would later be used to access it.
+def first_touch(function):
+    """
+    Zero the data of the :class:`Function` ``function``, in parallel, with the
+    same static schedule the Operators iterate over it with, so that each
+    memory page is placed close to the thread that will compute on it.
+
+    Within a :func:`first_touch_batch` context, the first touch is deferred
+    to the end of the context, where all pending data is touched at once.
+    """
+    pending = getattr(_first_touch_pending, 'functions', None)
+    if pending is None:
+        _first_touch([function])
+    else:
+        pending.append(function)
+
+
+@contextmanager
+def first_touch_batch():
     """
-    exp_init = [Eq(array.indexed[array.indices], 0)]
-    op = devito.Operator(exp_init)
-    op.apply()
+    Defer the first touch of the data allocated within the context to its end,
+    where it is carried out in a single parallel pass.
+    """
+    if getattr(_first_touch_pending, 'functions', None) is not None:
+        # Nested within another batch
+        yield
+        return
+    _first_touch_pending.functions = []
+    try:
+        yield
+    finally:
+        functions = _first_touch_pending.functions
+        _first_touch_pending.functions = None
+        if functions:
+            _first_touch(functions)
+
+
+_first_touch_pending = threading.local()
+
+
+def _first_touch(functions):
+    """
+    Zero the data of ``functions`` through the ``first_touch`` routine of the
+    support library. Each array is seen as a sequence of blocks, one for each
+    index along time, if any, of rows along the outermost space dimension,
+    which the Operators parallelize over.
+    """
+    arrays, nblocks, nrows, rowbytes = [], [], [], []
+    for i in functions:
+        array = i._data_object.ndpointer
+        ntime = 1 if i.indices[0].is_Time and array.ndim > 1 else 0
+        arrays.append(array.ctypes.data)
+        nblocks.append(int(np.prod(array.shape[:ntime])))
+        nrows.append(array.shape[ntime] if array.ndim > 0 else 1)
+        rowbytes.append(int(np.prod(array.shape[ntime+1:])) * array.itemsize)
+    n = len(functions)
+    support_library().first_touch(n, (ctypes.c_void_p * n)(*arrays),
+                                  (ctypes.c_long * n)(*nblocks),
+                                  (ctypes.c_long * n)(*nrows),
+                                  (ctypes.c_long * n)(*rowbytes))
+
+
+def support_library(_libs={}):
+    """
+    Return the support library, JIT-compiled with the current compiler; that
+    is, loaded from the JIT cache, unless compiled by no process before.
+    """
+    compiler = configuration['compiler']
+    key = (str(compiler), repr(compiler))
+    if key not in _libs:
+        basename = jit_compile(str(_support_code(compiler)), compiler)
+        _libs[key] = load(basename, compiler)
+    return _libs[key]
+
+
+def _support_code(compiler):
+    """The C code of the support library."""
+    from devito.dle.backends.utils import omplang
+
+    decls = [c.Value('const int', 'n'), c.Value('char', '**arrays'),
+             c.Value('const long', '*nblocks'), c.Value('const long', '*nrows'),
+             c.Value('const long', '*rowbytes')]
+    row = c.For('long k = 0', 'k < nrows[i]', 'k += 1',
+                c.Statement('memset(block + k*rowbytes[i], 0, rowbytes[i])'))
+    block = c.Block([c.Initializer(c.Value('char', '*block'),
+                                   'arrays[i] + j*nrows[i]*rowbytes[i]'),
+                     omplang['for'], row])
+    loop = c.For('int i = 0', 'i < n', 'i += 1',
+                 c.For('long j = 0', 'j < nblocks[i]', 'j += 1', block))
+    signature = c.FunctionDeclaration(c.Value('void', 'first_touch'), decls)
+    region = [omplang['par-region'](''), c.Block([loop])]
+    body = c.FunctionBody(signature, c.Block(region))
+
+    extra = [c.Extern('C', signature)] if compiler.src_ext == 'cpp' else []
+    return c.Module([c.Include('string.h')] + extra + [body])
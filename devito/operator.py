@@ -1,31 +1,51 @@
 from __future__ import absolute_import
 
 from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from hashlib import sha1
 from operator import attrgetter
+from os import path
 
 import ctypes
+import pickle
+import platform as py_platform
+import sys
+import threading
+import weakref
+
+import cpuinfo
 import numpy as np
+from cached_property import cached_property
+from cgen import If, Initializer, Line, Statement, Value
 import sympy
+from sympy import And, Mod
 
-from devito.arguments import infer_dimension_values_tuple
+from devito.arguments import (ArgumentPlan, argument_scope,
+                              infer_dimension_values_tuple)
 from devito.cgen_utils import Allocator
-from devito.compiler import jit_compile, load
+from devito.compiler import (get_jit_cache, get_jit_executor, jit_compile,
+                             jit_compile_units, lib_ext, load)
 from devito.dimension import Dimension
 from devito.dle import compose_nodes, filter_iterations, transform
 from devito.dse import rewrite
 from devito.exceptions import InvalidArgument, InvalidOperator
 from devito.function import Forward, Backward, CompositeFunction
-from devito.logger import bar, error, info
+from devito.logger import bar, error, info, log, warning
 from devito.ir.clusters import clusterize
-from devito.ir.iet import (Element, Expression, Callable, Iteration, List,
-                           LocalExpression, FindScopes, ResolveTimeStepping,
+from devito.ir.iet import (Element, Expression, Callable, CGenBatch, CGenUnits,
+                           Conditional, Iteration, List,
+                           LocalExpression, FindNodes, FindScopes, ResolveTimeStepping,
                            SubstituteExpression, Transformer, NestedTransformer,
                            analyze_iterations)
 from devito.ir.support import Stencil
+from devito.memory import MappedMemory, first_touch_batch
 from devito.parameters import configuration
-from devito.profiling import create_profile
-from devito.symbolics import indexify, retrieve_terminals
-from devito.tools import as_tuple, filter_sorted, flatten, numpy_to_ctypes
+from devito.profiling import BuildProfile, IOEntry, create_profile
+from devito.serialization import dumps, loads, origin, reference
+from devito.symbolics import IntDiv, indexify, retrieve_terminals
+from devito.tools import (as_tuple, ctypes_pointer, filter_ordered, filter_sorted,
+                          flatten, numpy_to_ctypes)
 from devito.types import Object
 
 
@@ -35,6 +55,19 @@ class Operator(Callable):
     _default_includes = ['stdlib.h', 'math.h', 'sys/time.h']
     _default_globals = []
 
+    _cacheable = True
+    """True if the lowered Operator may be stored in the persistent Operator cache."""
+
+    _cache_attrs = ['dtype', 'shape', 'indices', 'staggered', 'space_order',
+                    'time_order', 'save', 'time_dim', 'npoint', '_padding']
+    """The properties of the input objects the lowered Operator depends upon."""
+
+    _cache_configuration = ['backend', 'compiler', 'isa', 'platform', 'openmp',
+                            'dse', 'dle', 'dle_options', 'padding', 'debug_compiler',
+                            'jit_split']
+    """The configuration parameters the lowered and compiled Operator depends
+    upon; the others (e.g., logging, caching, allocation) leave it unaffected."""
+
     """A special :class:`Callable` to generate and compile C code evaluating
     an ordered sequence of stencil expressions.
 
@@ -51,6 +84,13 @@ class Operator(Callable):
                 defaults to ``configuration['dse']``.
         * dle : Use the Devito Loop Engine to optimize the loops -
                 defaults to ``configuration['dle']``.
+        * callback : A Python function, called with the current time index
+                     every ``callback_period`` timesteps of the time loop (e.g.,
+                     to report progress or to save a snapshot of a wavefield).
+                     It is invoked from within the JIT-compiled code, through a
+                     C function pointer.
+        * callback_period : The number of timesteps in between two invocations
+                            of ``callback`` - defaults to 1.
     """
     def __init__(self, expressions, **kwargs):
         expressions = as_tuple(expressions)
@@ -60,6 +100,8 @@ class Operator(Callable):
             raise InvalidOperator("Only SymPy expressions are allowed.")
 
         self.name = kwargs.get("name", "Kernel")
+        self.build_profile = BuildProfile(self.name)
+        phase = self.build_profile.phase
         subs = kwargs.get("subs", {})
         time_axis = kwargs.get("time_axis", Forward)
         dse = kwargs.get("dse", configuration['dse'])
@@ -74,54 +116,116 @@ class Operator(Callable):
         self._compiler = configuration['compiler']
         self._lib = None
         self._cfunction = None
+        self._batch_cfunction = None
+        self._compilation = None
+        self._origin = None
+
+        # The Python function invoked from within the time loop, if any
+        self._callback = None
+        if kwargs.get("callback") is not None:
+            self._callback = (kwargs["callback"], int(kwargs.get("callback_period", 1)))
+            if self._callback[1] < 1:
+                raise InvalidOperator("The callback period must be a positive integer")
+
+        self._callback_cfunctions = {}
+
+        # Argument plans, for low-overhead invocations of the JIT-compiled code
+        self._plans = OrderedDict()
 
         # References to local or external routines
         self.func_table = OrderedDict()
 
         # Expression lowering
-        expressions = [indexify(s) for s in expressions]
-        expressions = [s.xreplace(subs) for s in expressions]
+        with phase('indexify'):
+            expressions = [indexify(s) for s in expressions]
+            expressions = [s.xreplace(subs) for s in expressions]
 
         # Analysis
-        self.dtype = self._retrieve_dtype(expressions)
-        self.input, self.output, self.dimensions = self._retrieve_symbols(expressions)
-        stencils = self._retrieve_stencils(expressions)
+        with phase('retrieve_symbols'):
+            self.dtype = self._retrieve_dtype(expressions)
+            self.input, self.output, self.dimensions = self._retrieve_symbols(expressions)
+        with phase('retrieve_stencils'):
+            stencils = self._retrieve_stencils(expressions)
+
+        # The out-of-core TimeFunctions, staged in and out of RAM from within
+        # the time loop
+        self._staged = [i for i in self.input if getattr(i, 'out_of_core', None)]
+        self._staging = None
+        self._staging_lock = threading.Lock()
+
+        # Serialize the (lazy) tuning, compilation and loading of the JIT-compiled
+        # code, as an Operator may be run concurrently from multiple threads
+        self._compilation_lock = threading.RLock()
 
         # Extract argument offsets
         self._store_argument_offsets(stencils)
 
         # Set the direction of time acoording to the given TimeAxis
+        self._direction = -1 if time_axis == Backward else 1
         for time in [d for d in self.dimensions if d.is_Time]:
-            if not time.is_Stepping:
+            if not (time.is_Stepping or time.is_Subsampled):
                 time.reverse = time_axis == Backward
 
         # Parameters of the Operator (Dimensions necessary for data casts)
         parameters = self.input + self.dimensions
 
+        # Retrieve the lowered Operator from the registry or the persistent
+        # cache, or lower it
+        with phase('cache_load'):
+            key = self._fingerprint = self._cache_key(expressions, dse, dle, time_axis)
+            nodes = self._cache_load(key, parameters)
+        if nodes is None:
+            namespace = list(parameters)
+            nodes = self._lower(expressions, stencils, parameters, dse, dle)
+            with phase('cache_store'):
+                self._cache_store(key, nodes, parameters, namespace)
+
+        # Finish instantiation
+        super(Operator, self).__init__(self.name, nodes, 'int', parameters, ())
+
+    def _lower(self, expressions, stencils, parameters, dse, dle):
+        """
+        Lower a sequence of expressions into an Iteration/Expression tree.
+
+        ``parameters`` is modified in-place adding any argument introduced
+        during lowering.
+        """
+        phase = self.build_profile.phase
+
         # Group expressions based on their Stencil
-        clusters = clusterize(expressions, stencils)
+        with phase('clusterize'):
+            clusters = clusterize(expressions, stencils)
 
         # Apply the Devito Symbolic Engine (DSE) for symbolic optimization
-        clusters = rewrite(clusters, mode=set_dse_mode(dse))
+        with phase('dse'):
+            clusters = rewrite(clusters, mode=set_dse_mode(dse))
 
         # Wrap expressions with Iterations according to dimensions
-        nodes = self._schedule_expressions(clusters)
+        with phase('schedule_expressions'):
+            nodes = self._schedule_expressions(clusters)
 
         # Data dependency analysis. Properties are attached directly to nodes
-        nodes = analyze_iterations(nodes)
+        with phase('analyze_iterations'):
+            nodes = analyze_iterations(nodes)
 
         # Introduce C-level profiling infrastructure
-        nodes, self.profiler = self._profile_sections(nodes, parameters)
+        with phase('profile_sections'):
+            nodes, self.profiler = self._profile_sections(nodes, parameters)
 
         # Resolve and substitute dimensions for loop index variables
-        nodes, subs = ResolveTimeStepping().visit(nodes)
-        nodes = SubstituteExpression(subs=subs).visit(nodes)
+        with phase('resolve_timestepping'):
+            nodes, subs = ResolveTimeStepping().visit(nodes)
+            subs.update({d: IntDiv(d.parent, d.factor) for d in self.dimensions
+                         if d.is_Subsampled})
+            nodes = SubstituteExpression(subs=subs).visit(nodes)
 
         # Translate into backend-specific representation (e.g., GPU, Yask)
-        nodes = self._specialize(nodes, parameters)
+        with phase('specialize'):
+            nodes = self._specialize(nodes, parameters)
 
         # Apply the Devito Loop Engine (DLE) for loop optimization
-        dle_state = transform(nodes, *set_dle_mode(dle))
+        with phase('dle'):
+            dle_state = transform(nodes, *set_dle_mode(dle))
 
         # Update the Operator state based on the DLE
         self.dle_arguments = dle_state.arguments
@@ -132,40 +236,348 @@ class Operator(Callable):
         self.dimensions.extend([i.argument for i in self.dle_arguments
                                 if isinstance(i.argument, Dimension)])
         self._includes.extend(list(dle_state.includes))
+        nodes = dle_state.nodes
+
+        # Invoke the user-provided callback from within the time loop
+        if self._callback is not None:
+            nodes = self._insert_callback(nodes, parameters, 'callback', *self._callback)
+
+        # Stage the out-of-core data, a slab at a time, from within the time loop
+        if self._staged:
+            period = min(i.slab_size for i in self._staged)
+            nodes = self._insert_callback(nodes, parameters, 'stage', self._stage, period)
 
         # Introduce all required C declarations
-        nodes = self._insert_declarations(dle_state.nodes)
+        with phase('insert_declarations'):
+            return self._insert_declarations(nodes)
 
-        # Finish instantiation
-        super(Operator, self).__init__(self.name, nodes, 'int', parameters, ())
+    def _insert_callback(self, nodes, parameters, name, callback, period):
+        """
+        Call the Python function ``callback``, with the time index, at the end
+        of every ``period``-th iteration of the time loop. The callback is
+        passed to the kernel, as the argument ``name``, through a pointer to a
+        C function pointer.
+
+        ``parameters`` is modified in-place adding the callback argument.
+        """
+        iterations = [i for i in FindNodes(Iteration).visit(nodes) if i.dim.is_Time]
+        if not iterations:
+            raise InvalidOperator("Cannot register a callback without a time loop")
+        time = iterations[0]
+
+        # Keep the C function pointer alive as long as the Operator
+        cfunction = ctypes.CFUNCTYPE(None, ctypes.c_int)(callback)
+        self._callback_cfunctions[name] = cfunction
+        self._globals.append(Line('typedef void (*%s_t)(const int);' % name))
+        parameters.append(Object(name, ctypes_pointer('%s_t' % name),
+                                 ctypes.pointer(cfunction)))
+
+        counter = '%s_steps' % name
+        call = If('++%s %% %d == 0' % (counter, period),
+                  Statement('(*%s)(%s)' % (name, time.index)))
+        processed = List(header=Initializer(Value('int', counter), 0),
+                         body=time._rebuild(nodes=time.nodes + (Element(call),)))
+        return Transformer({time: processed}).visit(nodes)
+
+    @property
+    def _slab_size(self):
+        """The number of timesteps in between two stagings of the out-of-core
+        data, that is the smallest slab size of the out-of-core TimeFunctions."""
+        return min(i.slab_size for i in self._staged)
+
+    def _slab(self, function, start):
+        """
+        Return the entries of the out-of-core ``function`` accessed by the slab
+        of timesteps beginning at ``start``, in the direction of the time loop.
+        """
+        times = (start, start + self._direction*(self._slab_size - 1))
+        margin = function.time_order + 1
+        factor = function.subsampling or 1
+        lower = max((min(times) - margin) // factor, 0)
+        upper = min((max(times) + margin) // factor + 1, function.shape[0])
+        return range(lower, upper)
+
+    def _stage(self, time):
+        """
+        Invoked from within the time loop at the end of a slab, ``time`` being
+        its last timestep: make the next slab of out-of-core data resident, and
+        get the I/O thread to prefetch the following one.
+        """
+        start = time + self._direction
+        for function, data in self._staging:
+            data.stage(self._slab(function, start),
+                       self._slab(function, start + self._direction*self._slab_size))
+
+    def _cache_key(self, expressions, dse, dle, time_axis):
+        """
+        Return the key identifying the lowered Operator in the
+        :class:`OperatorRegistry` and in the persistent Operator cache, or
+        None if the Operator must not be cached.
+
+        The key is a hash of everything the outcome of the lowering depends on:
+        the (indexified) expressions, the properties of the objects therein,
+        the DSE and DLE modes, the relevant configuration, and the toolchain.
+        """
+        if not self._cacheable or self._callback is not None or self._staged:
+            return None
+        if not (configuration['operator_cache'] or configuration['operator_registry']):
+            return None
+        import devito
+        functions = [(i.name, origin(type(i)).__name__) +
+                     tuple(str(getattr(i, j, None)) for j in self._cache_attrs)
+                     for i in self.input]
+        dimensions = [(i.name, type(i).__name__, i.reverse, str(i.spacing),
+                       str(getattr(i, 'parent', None)), getattr(i, 'modulo', None))
+                      for i in self.dimensions]
+        configs = [(k, str(configuration[k])) for k in self._cache_configuration]
+        description = [type(self).__name__, self.name, sympy.srepr(expressions),
+                       functions, dimensions, set_dse_mode(dse), set_dle_mode(dle),
+                       str(time_axis), configs, devito.__version__, sympy.__version__,
+                       sys.version]
+        return get_jit_cache().key(str(description), self._compiler)
+
+    def _cache_load(self, key, parameters):
+        """
+        Retrieve the lowered Operator identified by ``key`` from the
+        :class:`OperatorRegistry` or, if not therein, from the persistent
+        Operator cache. Return the Iteration/Expression tree, or None if
+        ``key`` isn't in either.
+
+        ``parameters`` is modified in-place adding any argument introduced
+        during lowering.
+        """
+        if key is None:
+            return None
+        registry = get_operator_registry()
+        data, origin = registry.lookup(key)
+        if data is None and configuration['operator_cache']:
+            data = get_jit_cache().read(key, 'op')
+        if data is None:
+            return None
+        try:
+            nodes = self._loads(data, parameters)
+        except Exception as e:
+            warning("Couldn't load Operator `%s` from cache [%s]" % (self.name, e))
+            return None
+
+        if origin is None:
+            registry.register(key, data, self)
+        self._origin = origin
+
+        log("Operator `%s` loaded from cache" % self.name)
+        return nodes
+
+    def _cache_store(self, key, nodes, parameters, namespace):
+        """
+        Store the lowered Operator in the :class:`OperatorRegistry` and, if
+        enabled, in the persistent Operator cache.
+
+        :param namespace: The user-level objects the lowered Operator depends
+                          upon, which will be provided upon retrieval.
+        """
+        if key is None:
+            return
+        try:
+            data = self._dumps(nodes, parameters, namespace)
+        except Exception as e:
+            # Some of the objects cannot be serialized, e.g. because they are
+            # backend-specific
+            log("Operator `%s` cannot be cached [%s]" % (self.name, e))
+            return
+        get_operator_registry().register(key, data, self)
+        if configuration['operator_cache']:
+            get_jit_cache().write(key, 'op', data)
+
+    def _dumps(self, nodes, parameters, namespace):
+        """
+        Serialize the lowered Operator, that is the Iteration/Expression tree
+        ``nodes`` along with the state produced by the lowering.
+
+        :param namespace: The user-level objects the lowered Operator depends
+                          upon, which are serialized by reference.
+        """
+        state = {'nodes': nodes, 'parameters': parameters,
+                 'dimensions': self.dimensions, 'func_table': self.func_table,
+                 'dle_arguments': self.dle_arguments, 'dle_flags': self.dle_flags,
+                 'headers': self._headers, 'includes': self._includes,
+                 'globals': self._globals}
+        profiler = self.profiler
+        if profiler is not None:
+            profiler = dumps(profiler, namespace)
+            namespace = namespace + [i for i in parameters
+                                     if getattr(i, 'is_Object', False) and
+                                     i.name == self.profiler.varname]
+        state = dumps(state, namespace, self.dimensions)
+        return pickle.dumps((profiler, state), pickle.HIGHEST_PROTOCOL)
+
+    def _loads(self, data, parameters):
+        """
+        Deserialize a lowered Operator produced by :meth:`_dumps`, restoring
+        the state produced by the lowering. Return the Iteration/Expression tree.
+
+        ``parameters``, the user-level objects the lowered Operator depends upon,
+        is modified in-place adding any argument introduced during lowering.
+        """
+        profiler, state = pickle.loads(data)
+        namespace = list(parameters)
+        if profiler is not None:
+            profiler = loads(profiler, namespace)
+            namespace.append(Object(profiler.varname, profiler.dtype,
+                                    profiler.setup()))
+        state = loads(state, namespace)
+
+        self.profiler = profiler
+        self.dimensions = state['dimensions']
+        self.func_table = state['func_table']
+        self.dle_arguments = state['dle_arguments']
+        self.dle_flags = state['dle_flags']
+        self._headers = state['headers']
+        self._includes = state['includes']
+        self._globals = state['globals']
+        parameters[:] = state['parameters']
+
+        return state['nodes']
+
+    def export(self, filename):
+        """
+        Export the Operator to a portable bundle, which may later be loaded
+        through :func:`load_operator` on a machine with the same target, such
+        as the compute nodes of a cluster, skipping both the symbolic lowering
+        and the JIT compilation.
+
+        The bundle contains the JIT-compiled shared object (the Operator is
+        compiled, if necessary), the lowered Operator, and a description of the
+        target it was compiled for.
+
+        :param filename: The file the bundle is written to.
+        :raises InvalidOperator: If the Operator cannot be exported.
+        """
+        if not self._cacheable:
+            raise InvalidOperator("Operator `%s` cannot be exported" % self.name)
+        with open("%s.%s" % (self.compile, lib_ext()), 'rb') as f:
+            lib = f.read()
+
+        # The user-level objects, to be provided upon loading
+        dle_dimensions = [i.argument for i in self.dle_arguments]
+        namespace = self.input + [i for i in self.dimensions if i not in dle_dimensions]
+        try:
+            parameters = filter_ordered([i.provider for i in self.parameters])
+            state = self._dumps(self.body, parameters, namespace)
+        except Exception as e:
+            raise InvalidOperator("Operator `%s` cannot be exported [%s]" %
+                                  (self.name, e))
+
+        import devito
+        bundle = {'version': devito.__version__, 'target': host_target(),
+                  'cls': type(self), 'name': self.name, 'dtype': self.dtype,
+                  'argument_offsets': self.argument_offsets,
+                  'input': [reference(i) for i in self.input],
+                  'output': [reference(i) for i in self.output],
+                  'namespace': [reference(i) for i in namespace],
+                  'state': state, 'lib': lib}
+        with open(filename, 'wb') as f:
+            pickle.dump(bundle, f, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def _from_bundle(cls, bundle, functions):
+        """
+        Reconstruct an Operator from a bundle produced by :meth:`export`,
+        binding it to the user-level objects ``functions``.
+        """
+        # Resolve the user-level objects the Operator depends upon
+        candidates = list(functions)
+        for i in functions:
+            candidates.extend(getattr(i, 'indices', ()))
+            grid = getattr(i, 'grid', None)
+            if grid is not None:
+                candidates.extend(grid.dimensions)
+                candidates.extend([grid.time_dim, grid.stepping_dim])
+        candidates.extend([i.parent for i in candidates
+                           if isinstance(i, Dimension) and i.is_Stepping])
+        candidates.extend([i.spacing for i in candidates
+                           if isinstance(i, Dimension) and
+                           getattr(i.spacing, 'is_Constant', False)])
+        mapper = {reference(i): i for i in candidates}
+        missing = [i[1] for i in bundle['namespace'] if tuple(i) not in mapper]
+        if missing:
+            raise InvalidArgument("Couldn't find the objects %s required by the "
+                                  "Operator `%s`" % (missing, bundle['name']))
+        namespace = [mapper[tuple(i)] for i in bundle['namespace']]
+
+        obj = cls.__new__(cls)
+        obj.name = bundle['name']
+        obj.dtype = bundle['dtype']
+        obj.argument_offsets = bundle['argument_offsets']
+        obj.input = [mapper[tuple(i)] for i in bundle['input']]
+        obj.output = [mapper[tuple(i)] for i in bundle['output']]
+        obj._compiler = configuration['compiler']
+        obj._cfunction = None
+        obj._batch_cfunction = None
+        obj._compilation = None
+        obj._origin = None
+        obj._plans = OrderedDict()
+        obj._staged = []
+        obj._staging = None
+        obj._staging_lock = threading.Lock()
+        obj._compilation_lock = threading.RLock()
+        obj.build_profile = BuildProfile(obj.name)
+
+        parameters = list(namespace)
+        nodes = obj._loads(bundle['state'], parameters)
+        super(Operator, obj).__init__(obj.name, nodes, 'int', parameters, ())
+
+        # Publish the shared object in the JIT cache, and load it from there
+        cache = get_jit_cache()
+        key = sha1(bundle['lib']).hexdigest()
+        cache.write(key, lib_ext(), bundle['lib'])
+        basename = path.join(cache.directory, key)
+        obj._lib = load(basename, obj._compiler)
+        obj._lib.name = basename
+
+        return obj
 
     def arguments(self, **kwargs):
         """ Process any apply-time arguments passed to apply and derive values for
             any remaining arguments
         """
-        new_params = {}
-        # If we've been passed CompositeFunction objects as kwargs,
-        # they might have children that need to be substituted as well.
-        for k, v in kwargs.items():
-            if isinstance(v, CompositeFunction):
-                orig_param_l = [i for i in self.input if i.name == k]
-                # If I have been passed a parameter, I must have seen it before
-                if len(orig_param_l) == 0:
-                    raise InvalidArgument("Parameter %s does not exist in expressions " +
-                                          "passed to this Operator" % k)
-                # We've made sure the list isn't empty. Names should be unique so it
-                # should have exactly one entry
-                assert(len(orig_param_l) == 1)
-                orig_param = orig_param_l[0]
-                # Pull out the children and add them to kwargs
-                for orig_child, new_child in zip(orig_param.children, v.children):
-                    new_params[orig_child.name] = new_child
-        kwargs.update(new_params)
+        self._expand_composites(kwargs)
+
+        # The data not allocated yet is first-touched in a single parallel pass
+        with first_touch_batch():
+            for i in self.input:
+                i = kwargs.get(i.name, i)
+                if getattr(i, 'is_SymbolicFunction', False) and \
+                        getattr(i, '_data_object', False) is None:
+                    i.data
+
+        # The values derived here are local to this call (and thread), so that
+        # Operators sharing symbolic objects may process their arguments concurrently
+        with argument_scope():
+            arguments, dim_sizes, autotune = self._derive_args(kwargs)
+
+        with self._compilation_lock:
+            if self._lib is None:
+                self._share_compilation()
+            if self._lib is None:
+                # Must happen before the JIT-compiled code is loaded
+                self._tune_compilation(arguments)
+
+            if autotune:
+                arguments = self._autotune(arguments)
+
+        return arguments, dim_sizes
 
+    def _derive_args(self, kwargs):
+        """
+        Derive the runtime arguments from the apply-time arguments ``kwargs``,
+        which are consumed in the process.
+        """
         # Derivation. It must happen in the order [tensors -> dimensions -> scalars]
         for i in self.parameters:
             if i.is_TensorArgument:
                 assert(i.verify(kwargs.pop(i.name, None)))
+            elif i.is_PtrArgument:
+                i.verify(kwargs.pop(i.name, None))
         for d in self.dimensions:
             user_provided_value = kwargs.pop(d.name, None)
             if user_provided_value is not None:
@@ -201,27 +613,33 @@ class Operator(Callable):
         for d, v in dim_sizes.items():
             assert(mapper[d].verify(v))
 
-        arguments = self._default_args()
-
-        if autotune:
-            arguments = self._autotune(arguments)
+        return self._default_args(), dim_sizes, autotune
 
-        # Clear the temp values we stored in the arg objects since we've pulled them out
-        # into the OrderedDict object above
-        self._reset_args()
-
-        return arguments, dim_sizes
+    def _expand_composites(self, kwargs):
+        """
+        Add to ``kwargs`` the children of the :class:`CompositeFunction`s
+        therein, as they might need to be substituted as well.
+        """
+        new_params = {}
+        for k, v in kwargs.items():
+            if isinstance(v, CompositeFunction):
+                orig_param_l = [i for i in self.input if i.name == k]
+                # If I have been passed a parameter, I must have seen it before
+                if len(orig_param_l) == 0:
+                    raise InvalidArgument("Parameter %s does not exist in expressions " +
+                                          "passed to this Operator" % k)
+                # We've made sure the list isn't empty. Names should be unique so it
+                # should have exactly one entry
+                assert(len(orig_param_l) == 1)
+                orig_param = orig_param_l[0]
+                # Pull out the children and add them to kwargs
+                for orig_child, new_child in zip(orig_param.children, v.children):
+                    new_params[orig_child.name] = new_child
+        kwargs.update(new_params)
 
     def _default_args(self):
         return OrderedDict([(x.name, x.value) for x in self.parameters])
 
-    def _reset_args(self):
-        """
-        Reset any runtime argument derivation information from a previous run.
-        """
-        for x in list(self.parameters) + self.dimensions:
-            x.reset()
-
     def _dle_arguments(self, dim_sizes):
         # Add user-provided block sizes, if any
         dle_arguments = OrderedDict()
@@ -264,33 +682,93 @@ class Operator(Callable):
         """
         if self._lib is None:
             # No need to recompile if a shared object has already been loaded.
-            return jit_compile(self.ccode, self._compiler)
+            if self._compilation is None:
+                return self._jit_compile()
+            else:
+                # Wait for the background compilation to complete
+                return self._compilation.result()
         else:
             return self._lib.name
 
+    def compile_async(self):
+        """
+        Submit the JIT-compilation of the C code generated by the Operator to
+        a pool of background workers, and return immediately. Any subsequent
+        access to ``self.compile`` (e.g., through ``apply``) blocks until the
+        compilation has completed.
+
+        :returns: A :class:`concurrent.futures.Future` whose result is the file
+                  name of the JIT-compiled function.
+        """
+        if self._compilation is None:
+            self._compilation = get_jit_executor().submit(self._jit_compile)
+        return self._compilation
+
+    def _jit_compile(self):
+        phase = self.build_profile.phase
+        with phase('codegen'):
+            units = self.ccode_units if configuration['jit_split'] else []
+            ccode = self.ccode if len(units) <= 1 else None
+        with phase('jit_compile'):
+            if ccode is None:
+                basename = jit_compile_units(units, self._compiler)
+            else:
+                basename = jit_compile(ccode, self._compiler)
+        self.build_profile.emit()
+        return basename
+
+    @property
+    def ccode_units(self):
+        """
+        The C code generated by the Operator, split into separate translation
+        units: one for the Operator kernel, followed by one for each of the
+        elemental functions.
+        """
+        return [str(i) for i in CGenUnits().visit(self)]
+
+    def _share_compilation(self):
+        """
+        Share the JIT-compiled code of the equivalent Operator this Operator
+        was retrieved from through the :class:`OperatorRegistry`, if any and
+        if already loaded.
+        """
+        origin = self._origin and self._origin()
+        if origin is not None and origin._lib is not None:
+            self._compiler = origin._compiler
+            self._lib = origin._lib
+
     @property
     def cfunction(self):
         """Returns the JIT-compiled C function as a ctypes.FuncPtr object."""
-        if self._lib is None:
-            basename = self.compile
-            self._lib = load(basename, self._compiler)
-            self._lib.name = basename
-
         if self._cfunction is None:
-            self._cfunction = getattr(self._lib, self.name)
-            # Associate a C type to each argument for runtime type check
-            argtypes = []
-            for i in self.parameters:
-                if i.is_ScalarArgument:
-                    argtypes.append(numpy_to_ctypes(i.dtype))
-                elif i.is_TensorArgument:
-                    argtypes.append(np.ctypeslib.ndpointer(dtype=i.dtype, flags='C'))
-                else:
-                    argtypes.append(ctypes.c_void_p)
-            self._cfunction.argtypes = argtypes
+            with self._compilation_lock:
+                if self._lib is None:
+                    self._share_compilation()
+                if self._lib is None:
+                    basename = self.compile
+                    self._lib = load(basename, self._compiler)
+                    self._lib.name = basename
+
+                cfunction = getattr(self._lib, self.name)
+                cfunction.argtypes = self._argtypes
+                self._cfunction = cfunction
 
         return self._cfunction
 
+    @property
+    def _argtypes(self):
+        """The C types of the arguments of the JIT-compiled C function,
+        for runtime type check."""
+        argtypes = []
+        for i in self.parameters:
+            if i.is_ScalarArgument:
+                argtypes.append(numpy_to_ctypes(i.dtype))
+            elif i.is_TensorArgument:
+                argtypes.append(np.ctypeslib.ndpointer(dtype=i.dtype, flags='C'))
+            else:
+                argtypes.append(ctypes.c_void_p)
+        return argtypes
+
     def _profile_sections(self, nodes, parameters):
         """Introduce C-level profiling nodes within the Iteration/Expression tree."""
         return List(body=nodes), None
@@ -300,6 +778,11 @@ class Operator(Callable):
         best block sizes when loop blocking is in use."""
         return arguments
 
+    def _tune_compilation(self, arguments):
+        """Exploit the runtime arguments to tune the JIT-compilation of this
+        Operator, e.g. through auto-tuning of the compiler flags."""
+        return
+
     def _schedule_expressions(self, clusters):
         """Create an Iteartion/Expression tree given an iterable of
         :class:`Cluster` objects."""
@@ -308,6 +791,7 @@ class Operator(Callable):
         processed = []
         schedule = OrderedDict()
         atomics = ()
+        isolated = False
         for i in clusters:
             # Build the Expression objects to be inserted within an Iteration tree
             expressions = [Expression(v, np.int32 if i.trace.is_index(k) else self.dtype)
@@ -318,10 +802,14 @@ class Operator(Callable):
                 entries = i.stencil.entries
 
                 # Can I reuse any of the previously scheduled Iterations ?
+                # Guarded clusters and reductions only share the Iterations
+                # over time
                 index = 0
                 for j0, j1 in zip(entries, list(schedule)):
                     if j0 != j1 or j0.dim in atomics:
                         break
+                    if (i.guards or i.reductions or isolated) and not j0.dim.is_Time:
+                        break
                     root = schedule[j1]
                     index += 1
                 needed = entries[index:]
@@ -329,6 +817,15 @@ class Operator(Callable):
                 # Build and insert the required Iterations
                 iters = [Iteration([], j.dim, j.dim.limits, offsets=j.ofs) for j in
                          needed]
+                if i.guards:
+                    # Evaluate the cluster only every /factor/ timesteps
+                    ntime = len([j for j in needed if j.dim.is_Time])
+                    condition = And(*[sympy.Eq(Mod(d.parent, d.factor), 0)
+                                      for d in i.guards])
+                    expressions = [Conditional(condition,
+                                               compose_nodes(iters[ntime:] +
+                                                             [expressions]))]
+                    iters = iters[:ntime]
                 body, tree = compose_nodes(iters + [expressions], retrieve=True)
                 scheduling = OrderedDict(zip(needed, tree))
                 if root is None:
@@ -349,6 +846,7 @@ class Operator(Callable):
 
             # Track dimensions that cannot be fused at next stage
             atomics = i.atomics
+            isolated = bool(i.guards or i.reductions)
 
         return List(body=processed)
 
@@ -409,9 +907,12 @@ class Operator(Callable):
         """
         Retrieve the data type of a set of expressions. Raise an error if there
         is no common data type (ie, if at least one expression differs in the
-        data type).
+        data type). Integer data, such as quantized wavefields, may be written
+        alongside floating-point data, the latter determining the data type.
         """
         lhss = set([s.lhs.base.function.dtype for s in expressions])
+        if len(lhss) > 1:
+            lhss = set([i for i in lhss if np.issubdtype(i, np.floating)])
         if len(lhss) != 1:
             raise RuntimeError("Expression types mismatch.")
         return lhss.pop()
@@ -419,6 +920,16 @@ class Operator(Callable):
     def _retrieve_stencils(self, expressions):
         """Determine the :class:`Stencil` of each provided expression."""
         stencils = [Stencil(i) for i in expressions]
+
+        # Subsampled dimensions are iterated over through their parent
+        for n, i in enumerate(list(stencils)):
+            if any(d.is_Subsampled for d in i.dimensions):
+                entries = OrderedDict()
+                for d, v in i.items():
+                    d = d.parent if d.is_Subsampled else d
+                    entries.setdefault(d, set()).update(v)
+                stencils[n] = Stencil(entries.items())
+
         dimensions = set.union(*[set(i.dimensions) for i in stencils])
 
         # Filter out aliasing stepping dimensions
@@ -436,6 +947,9 @@ class Operator(Callable):
         as well as all traversed dimensions.
         """
         terms = flatten(retrieve_terminals(i) for i in expressions)
+        # Functions may also be read within index expressions (indirect accesses)
+        terms += flatten(retrieve_terminals(j) for i in terms if i.is_Indexed
+                         for j in i.indices)
 
         input = []
         for i in terms:
@@ -448,13 +962,16 @@ class Operator(Callable):
         output = [i.lhs.base.function for i in expressions if i.lhs.is_Indexed]
 
         indexeds = [i for i in terms if i.is_Indexed]
+        # The Dimensions of the Functions come first, as index expressions built
+        # by SymPy's cache may hold stale Dimension objects with the same name
         dimensions = []
         for indexed in indexeds:
+            dimensions.extend(list(indexed.base.function.indices))
             for i in indexed.indices:
                 dimensions.extend([k for k in i.free_symbols
                                    if isinstance(k, Dimension)])
-            dimensions.extend(list(indexed.base.function.indices))
-        dimensions.extend([d.parent for d in dimensions if d.is_Stepping])
+        dimensions.extend([d.parent for d in dimensions if d.is_Stepping or
+                           d.is_Subsampled])
         dimensions = filter_sorted(dimensions, key=attrgetter('name'))
 
         return input, output, dimensions
@@ -466,29 +983,254 @@ class OperatorRunnable(Operator):
     C code evaluating stencil expressions, can also execute the computation.
     """
 
+    _plans_capacity = 16
+    """The maximum number of :class:`ArgumentPlan`s retained by an Operator."""
+
     def __call__(self, **kwargs):
         self.apply(**kwargs)
 
     def apply(self, **kwargs):
         """Apply the stencil kernel to a set of data objects"""
-        # Build the arguments list to invoke the kernel function
-        arguments, dim_sizes = self.arguments(**kwargs)
+        invocation, arguments, timings = self._prepare(kwargs)
+        allocation = self._allocation(kwargs)
 
         # Invoke kernel function with args
-        self.cfunction(*list(arguments.values()))
+        io = invocation()
 
         # Output summary of performance achieved
-        return self._profile_output(arguments)
+        return self._profile_output(arguments, timings, io if self._staged else None,
+                                    allocation)
+
+    def apply_async(self, **kwargs):
+        """
+        Apply the stencil kernel to a set of data objects in the background.
+        The arguments are processed (and, if needed, the Operator compiled) on
+        the calling thread, as in :meth:`apply`, while the kernel is run by a
+        worker thread. The data objects in use are kept alive until the
+        invocation is over.
 
-    def _profile_output(self, arguments):
-        """Return a performance summary of the profiled sections."""
-        summary = self.profiler.summary(arguments, self.dtype)
+        :returns: A :class:`concurrent.futures.Future` resolving to the
+                  performance summary of the invocation.
+
+        .. note::
+
+            The invocations are run in submission order. The data objects
+            must not be modified until the returned future is done.
+        """
+        invocation, arguments, timings = self._prepare(kwargs)
+        allocation = self._allocation(kwargs)
+
+        # The data objects used by the kernel, which must outlive the invocation
+        objects = list(kwargs.values())
+        objects += [i.provider for i in self.parameters if i.is_TensorArgument]
+        data = [i._data_object if getattr(i, 'is_SymbolicFunction', False) else i
+                for i in objects]
+
+        def run(data):
+            io = invocation()
+            return self._profile_output(arguments, timings,
+                                        io if self._staged else None, allocation)
+        return get_apply_executor().submit(run, data)
+
+    def _prepare(self, kwargs):
+        """
+        Process the apply-time arguments ``kwargs``. Return a callable invoking
+        the kernel function, the runtime arguments, and the profiling struct
+        populated by the invocation.
+        """
+        self._expand_composites(kwargs)
+        signature = ArgumentPlan.signature(kwargs, self._swappable)
+
+        # Each invocation gets its own profiling struct, so that an Operator
+        # may be run concurrently from multiple threads
+        timings = self.profiler.dtype()
+        kwargs[self.profiler.varname] = ctypes.byref(timings)
+
+        plan = self._plans.get(signature)
+        if plan is not None and plan.lib is self._lib:
+            # Fast path: same shapes and scalar values as a previous invocation
+            invocation = partial(plan.cfunction, *plan.bind(kwargs))
+            arguments = plan.arguments
+        else:
+            # Build the arguments list to invoke the kernel function
+            arguments, dim_sizes = self.arguments(**kwargs)
+            invocation = partial(self.cfunction, *list(arguments.values()))
+
+            if signature is not None:
+                plan = ArgumentPlan(self.parameters, arguments, self._lib, self.name)
+                with self._compilation_lock:
+                    self._plans.pop(signature, None)
+                    self._plans[signature] = plan
+                    while len(self._plans) > self._plans_capacity:
+                        self._plans.popitem(last=False)
+
+        if self._staged:
+            invocation = partial(self._apply_staged, invocation, kwargs, arguments)
+
+        return invocation, arguments, timings
+
+    def _apply_staged(self, invocation, kwargs, arguments):
+        """
+        Run ``invocation``, staging the out-of-core data in and out of RAM
+        around and, a slab at a time, within the time loop. Return the
+        :class:`IOEntry` summarizing the I/O performed.
+        """
+        staging = []
+        for i in self._staged:
+            data = getattr(kwargs.get(i.name, i), '_data_object', None)
+            if isinstance(data, MappedMemory):
+                staging.append((kwargs.get(i.name, i), data))
+
+        time = [d for d in self.dimensions if d.is_Time and
+                not (d.is_Stepping or d.is_Subsampled)][0]
+        if self._direction > 0:
+            start = arguments[time.start_name]
+        else:
+            start = arguments[time.end_name] - 1
+
+        # Concurrent invocations would compete for the same slabs
+        with self._staging_lock:
+            self._staging = staging
+            try:
+                for function, data in staging:
+                    data.reset_stats()
+                    following = start + self._direction*self._slab_size
+                    data.stage(self._slab(function, start),
+                               self._slab(function, following))
+                invocation()
+            finally:
+                for function, data in staging:
+                    data.flush()
+                self._staging = None
+
+        nbytes = sum(data.nbytes for _, data in staging)
+        elapsed = sum(data.io_time for _, data in staging)
+        stall = sum(data.stall_time for _, data in staging)
+        return IOEntry(nbytes, elapsed, stall, nbytes/max(elapsed, 10**-6)/10**9)
+
+    def apply_batch(self, batch, reset=None):
+        """
+        Apply the stencil kernel to a batch of argument sets (e.g., the sources
+        and receivers of multiple shots) back to back, through a single call to
+        a JIT-compiled driver loop, with no Python round trips in between.
+
+        The driver calls the very kernel used by :meth:`apply`. Operators
+        staging out-of-core data can't be applied to a batch.
+
+        :param batch: A list of dictionaries, each of which provides the
+                      apply-time arguments of an invocation, as in :meth:`apply`.
+        :param reset: (Optional) the data objects zeroed in between any two
+                      invocations. Defaults to the :class:`TimeFunction`s written
+                      by the Operator and shared by all argument sets, that is
+                      the reused wavefields.
+        :returns: A list with the performance summary of each invocation.
+        """
+        if self._staged:
+            raise InvalidOperator("Operator `%s` stages out-of-core data, hence it "
+                                  "can't be applied to a batch" % self.name)
+        batch = [self.arguments(**kwargs)[0] for kwargs in batch]
+        nbatch = len(batch)
+        if nbatch == 0:
+            return []
+
+        # Each invocation gets its own profiling struct
+        timings = (self.profiler.dtype * nbatch)()
+        for arguments, i in zip(batch, timings):
+            arguments[self.profiler.varname] = ctypes.byref(i)
+
+        # Pack the per-invocation arguments
+        args = []
+        for i in self.parameters:
+            values = [arguments[i.name] for arguments in batch]
+            if i.is_ScalarArgument:
+                args.append((numpy_to_ctypes(i.dtype) * nbatch)(*values))
+            elif i.is_TensorArgument:
+                # Also type-checks the data objects
+                ndpointer = np.ctypeslib.ndpointer(dtype=i.dtype, flags='C')
+                values = [ndpointer.from_param(v).data for v in values]
+                args.append((ctypes.c_void_p * nbatch)(*values))
+            elif i.name == self.profiler.varname:
+                values = [ctypes.addressof(v) for v in timings]
+                args.append((ctypes.c_void_p * nbatch)(*values))
+            else:
+                values = [ctypes.cast(v, ctypes.c_void_p).value for v in values]
+                args.append((ctypes.c_void_p * nbatch)(*values))
+
+        # The buffers to be zeroed in between invocations
+        if reset is None:
+            shared = [i.name for i in self.output if i.is_TimeFunction and
+                      all(j[i.name] is batch[0][i.name] for j in batch)]
+            reset = [batch[0][i] for i in shared]
+        else:
+            reset = [i._data_buffer if i.is_SymbolicFunction else i for i in reset]
+        nreset = len(reset)
+
+        self.cbatchfunction(ctypes.cast(self.cfunction, ctypes.c_void_p), nbatch, nreset,
+                            (ctypes.c_void_p * nreset)(*[i.ctypes.data for i in reset]),
+                            (ctypes.c_long * nreset)(*[i.nbytes for i in reset]),
+                            *args)
+
+        summaries = [self.profiler.summary(arguments, self.dtype, i)
+                     for arguments, i in zip(batch, timings)]
+        info("Batch of %d invocations computed in %.3f s" %
+             (nbatch, sum(sum(i.timings.values()) for i in summaries)))
+        return summaries
+
+    @property
+    def cbatchfunction(self):
+        """Returns the JIT-compiled batch driver (see :meth:`apply_batch`) as a
+        ctypes.FuncPtr object. The driver takes, as first argument, a pointer
+        to the kernel, that is :attr:`cfunction`."""
+        if self._batch_cfunction is None:
+            basename = jit_compile(str(CGenBatch().visit(self)), self._compiler)
+            self._batch_cfunction = getattr(load(basename, self._compiler),
+                                            '%s_batch' % self.name)
+        return self._batch_cfunction
+
+    @cached_property
+    def _swappable(self):
+        """The names of the scalar arguments which may be swapped in an
+        :class:`ArgumentPlan`."""
+        return [i.name for i in self.parameters
+                if i.is_ScalarArgument and getattr(i.provider, 'is_Constant', False)]
+
+    def _allocation(self, kwargs):
+        """Map the name of each tensor argument living in C memory, as
+        overridden by ``kwargs``, to its :class:`AllocationPolicy`."""
+        allocation = OrderedDict()
+        for i in self.parameters:
+            if i.is_TensorArgument:
+                data = getattr(kwargs.get(i.name, i.provider), '_data_object', None)
+                if getattr(data, 'policy', None) is not None:
+                    allocation[i.name] = data.policy
+        return allocation
+
+    def _profile_output(self, arguments, timings=None, io=None, allocation=None):
+        """Return a performance summary of the profiled sections. The timings
+        are read from the C-level struct ``timings``, if provided. The
+        :class:`IOEntry` ``io``, if provided, summarizes the out-of-core I/O,
+        while ``allocation`` maps the data to its :class:`AllocationPolicy`."""
+        summary = self.profiler.summary(arguments, self.dtype, timings)
+        summary.io = io
+        summary.allocation = allocation or OrderedDict()
         with bar():
             for k, v in summary.items():
                 name = '%s<%s>' % (k, ','.join('%d' % i for i in v.itershape))
                 gpointss = ", %.2f GPts/s" % v.gpointss if k == 'main' else ''
+                if gpointss and v.nbatch > 1:
+                    gpointss += " (%.2f GPts/s per problem)" % (v.gpointss / v.nbatch)
                 info("Section %s with OI=%.2f computed in %.3f s [%.2f GFlops/s%s]" %
                      (name, v.oi, v.time, v.gflopss, gpointss))
+            if io is not None:
+                info("Out-of-core I/O of %.3f GB in %.3f s [%.2f GB/s], %.3f s stalled"
+                     % (io.nbytes/10**9, io.time, io.bandwidth, io.stall))
+            # The allocation policies are reported unless all default
+            policies = OrderedDict()
+            for k, v in summary.allocation.items():
+                policies.setdefault(v, []).append(k)
+            if any(v.hugepages or v.numa for v in policies):
+                info("Allocation: %s" % '; '.join('%s [%s]' % (k, ', '.join(v))
+                                                  for k, v in policies.items()))
         return summary
 
     def _profile_sections(self, nodes, parameters):
@@ -499,6 +1241,151 @@ class OperatorRunnable(Operator):
         return nodes, profiler
 
 
+_apply_executor = []
+
+
+def get_apply_executor():
+    """
+    Return the thread running the kernels launched through
+    :meth:`OperatorRunnable.apply_async`. The JIT-compiled code releases the
+    GIL, so the kernels run concurrently with the main thread.
+    """
+    if not _apply_executor:
+        _apply_executor.append(ThreadPoolExecutor(max_workers=1))
+    return _apply_executor[0]
+
+
+class OperatorRegistry(object):
+
+    """
+    An in-memory registry of lowered Operators, keyed by a structural
+    fingerprint of the equations, of the properties of the objects therein
+    (names, shapes, data types, space and time orders, ...), of the DSE and
+    DLE modes, and of the configuration (see :meth:`Operator._cache_key`).
+
+    Building an :class:`Operator` equivalent to a registered one skips the
+    lowering, and shares the JIT-compiled code of the registered Operator. The
+    new Operator, however, is bound to its own data objects.
+
+    At most ``capacity`` entries are retained; once exceeded, the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, capacity=0):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return "OperatorRegistry[%d/%d]" % (len(self), self.capacity)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, key):
+        """
+        Return the serialized lowered Operator identified by ``key`` and the
+        registered Operator, if still alive, or ``(None, None)`` if ``key``
+        isn't in the registry. A successful lookup marks the entry as the
+        most recently used one.
+        """
+        try:
+            data, ref = self.entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None, None
+        self.entries[key] = (data, ref)
+        self.hits += 1
+        return data, ref
+
+    def register(self, key, data, operator):
+        """Register ``operator``, whose serialized lowered form is ``data``."""
+        if not self.capacity:
+            return
+        self.entries.pop(key, None)
+        self.entries[key] = (data, weakref.ref(operator))
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def evict(self, operator=None):
+        """
+        Evict the entry of the :class:`Operator` ``operator`` or, if not
+        provided, the least recently used entry.
+        """
+        if operator is None:
+            if self.entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.pop(getattr(operator, '_fingerprint', None), None)
+
+    def clear(self):
+        """Evict all entries."""
+        self.entries.clear()
+
+
+_operator_registry = OperatorRegistry()
+
+
+def get_operator_registry():
+    """Return the :class:`OperatorRegistry`, whose capacity is given by
+    ``configuration['operator_registry']``."""
+    _operator_registry.capacity = configuration['operator_registry']
+    while len(_operator_registry) > _operator_registry.capacity:
+        _operator_registry.evict()
+    return _operator_registry
+
+
+def load_operator(filename, functions):
+    """
+    Load an :class:`Operator` from a bundle produced by :meth:`Operator.export`.
+    Neither the symbolic lowering nor the JIT compilation take place, so no
+    compiler toolchain is required.
+
+    :param filename: The file the bundle is read from.
+    :param functions: The user-level objects, such as :class:`Function`s and
+                      :class:`Constant`s, in input to the exported Operator,
+                      which will be bound to the loaded Operator. The
+                      :class:`Dimension`s of such objects are retrieved
+                      automatically.
+    :raises InvalidOperator: If the bundle was built for a different target,
+                             e.g. a different ISA, or by a different version
+                             of Devito.
+    """
+    with open(filename, 'rb') as f:
+        bundle = pickle.load(f)
+
+    import devito
+    if bundle['version'] != devito.__version__:
+        raise InvalidOperator("Bundle `%s` was exported by Devito %s, but this is "
+                              "Devito %s" % (filename, bundle['version'],
+                                             devito.__version__))
+    exported = bundle['target']
+    target = host_target()
+    mismatches = ["%s (%s vs %s)" % (k, v, target[k]) for k, v in exported.items()
+                  if k != 'flags' and v != target[k]]
+    missing = sorted(set(exported['flags']) - set(target['flags']))
+    if missing:
+        mismatches.append("cpu flags (missing %s)" % ', '.join(missing))
+    if mismatches:
+        raise InvalidOperator("Bundle `%s` was exported for a different target: %s"
+                              % (filename, '; '.join(mismatches)))
+
+    return bundle['cls']._from_bundle(bundle, as_tuple(functions))
+
+
+def compile_all(operators):
+    """
+    JIT-compile concurrently a collection of :class:`Operator`s.
+
+    :param operators: An iterable of :class:`Operator`s.
+    :returns: The file names of the JIT-compiled functions.
+    """
+    futures = [i.compile_async() for i in operators]
+    return [i.result() for i in futures]
+
+
 # Misc helpers
 
 
@@ -509,6 +1396,17 @@ the function was generated by Devito itself.
 """
 
 
+def host_target():
+    """
+    Return a description of the target the JIT-compiled Operators are
+    built for, that is the host architecture and the relevant configuration.
+    """
+    return {'machine': py_platform.machine(), 'system': sys.platform,
+            'isa': configuration['isa'], 'platform': configuration['platform'],
+            'openmp': configuration['openmp'],
+            'flags': cpuinfo.get_cpu_info().get('flags', [])}
+
+
 def set_dse_mode(mode):
     """
     Transform :class:`Operator` input in a format understandable by the DLE.
@@ -91,7 +91,20 @@ env_vars_mapper = {
     'DEVITO_OPENMP': 'openmp',
     'DEVITO_LOGGING': 'log_level',
     'DEVITO_FIRST_TOUCH': 'first_touch',
+    'DEVITO_PADDING': 'padding',
+    'DEVITO_ALLOCATOR': 'allocator',
+    'DEVITO_ALLOCATOR_POOL_SIZE': 'allocator_pool_size',
+    'DEVITO_HUGEPAGES': 'hugepages',
+    'DEVITO_NUMA': 'numa',
     'DEVITO_DEBUG_COMPILER': 'debug_compiler',
+    'DEVITO_JIT_CACHE_DIR': 'jit_cache_dir',
+    'DEVITO_JIT_CACHE_SIZE': 'jit_cache_size',
+    'DEVITO_OPERATOR_CACHE': 'operator_cache',
+    'DEVITO_OPERATOR_REGISTRY': 'operator_registry',
+    'DEVITO_JIT_ASYNC': 'jit_async',
+    'DEVITO_JIT_WORKERS': 'jit_workers',
+    'DEVITO_JIT_SPLIT': 'jit_split',
+    'DEVITO_BUILD_PROFILE': 'build_profile',
 }
 
 configuration = Parameters("Devito-Configuration")
@@ -1,16 +1,22 @@
 from __future__ import absolute_import
 
+import json
 import operator
+import threading
+import tracemalloc
 from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
 from functools import reduce
+from time import time
 
 from ctypes import Structure, byref, c_double
 from cgen import Struct, Value
 
 from devito.ir.iet import Expression, TimedList, FindSections, FindNodes, Transformer
+from devito.parameters import configuration
 from devito.symbolics import estimate_cost, estimate_memory
 
-__all__ = ['Profile', 'create_profile']
+__all__ = ['Profile', 'BuildProfile', 'IOEntry', 'create_profile', 'track_pass']
 
 
 def create_profile(node):
@@ -34,12 +40,16 @@ def create_profile(node):
     profiler = Profiler()
 
     # Group by root Iteration
+    sections = FindSections().visit(node)
     mapper = OrderedDict()
-    for itspace in FindSections().visit(node):
+    for itspace in sections:
         mapper.setdefault(itspace[0], []).append(itspace)
 
-    # Group sections if their iteration spaces overlap
-    key = lambda itspace: set([i.dim for i in itspace])
+    # Group sections if their iteration spaces overlap. Sections evaluated only
+    # every few timesteps (e.g., saving a time-subsampled TimeFunction) are
+    # guarded by a condition, hence kept apart
+    key = lambda itspace: (set([i.dim for i in itspace]),
+                           subsampling(sections[itspace]))
     found = []
     for v in mapper.values():
         queue = list(v)
@@ -74,8 +84,9 @@ def create_profile(node):
 
         # Estimate computational properties of the profiled section
         expressions = FindNodes(Expression).visit(body)
-        ops = estimate_cost([e.expr for e in expressions])
-        memory = estimate_memory([e.expr for e in expressions])
+        factor = subsampling(expressions)
+        ops = estimate_cost([e.expr for e in expressions]) / factor
+        memory = estimate_memory([e.expr for e in expressions]) / factor
 
         # Keep track of the new profiled section
         profiler.add(name, group[0], ops, memory)
@@ -86,6 +97,17 @@ def create_profile(node):
     return processed, profiler
 
 
+def subsampling(expressions):
+    """
+    Return the factor by which the evaluation of ``expressions`` is subsampled
+    along time; that is, 1 unless they access a time-subsampled
+    :class:`TimeFunction`, through a :class:`SubsampledDimension`.
+    """
+    factors = [d.factor for e in expressions for d in e.dimensions
+               if getattr(d, 'is_Subsampled', False)]
+    return max(factors or [1])
+
+
 class Profiler(object):
 
     """
@@ -100,6 +122,12 @@ class Profiler(object):
         self._sections = OrderedDict()
         self._C_timings = None
 
+    def __getstate__(self):
+        # The C-level timers cannot be pickled; they are re-allocated by /setup/
+        state = self.__dict__.copy()
+        state['_C_timings'] = None
+        return state
+
     def add(self, name, section, ops, memory):
         """
         Add a profiling section.
@@ -119,7 +147,7 @@ class Profiler(object):
         self._C_timings = self.dtype()
         return byref(self._C_timings)
 
-    def summary(self, arguments, dtype):
+    def summary(self, arguments, dtype, timings=None):
         """
         Return a summary of the performance numbers measured.
 
@@ -128,19 +156,24 @@ class Profiler(object):
                           and the perfomance achieved in GFlops/s.
         :param dtype: The data type of the objects in the profiled sections. Used
                       to compute the operational intensity.
+        :param timings: (Optional) the C-level timers Struct to read the timings
+                        from. Defaults to the one allocated by ``self.setup()``.
         """
+        timings = self.timings if timings is None else self._extract(timings)
 
         summary = PerformanceSummary()
         for itspace, profile in self._sections.items():
             dims = {i: i.dim.parent if i.dim.is_Stepping else i.dim for i in itspace}
 
             # Time
-            time = self.timings[profile.name]
+            time = timings[profile.name]
 
             # Flops
             itershape = [i.extent(finish=arguments[dims[i].end_name],
                                   start=arguments[dims[i].start_name]) for i in itspace]
             iterspace = reduce(operator.mul, itershape)
+            nbatch = reduce(operator.mul, [j for i, j in zip(itspace, itershape)
+                                           if dims[i].is_Batch], 1)
             flops = float(profile.ops*iterspace)
             gflops = flops/10**9
             gpoints = iterspace/10**9
@@ -157,7 +190,7 @@ class Profiler(object):
 
             # Keep track of performance achieved
             summary.setsection(profile.name, time, gflopss, gpointss, oi, profile.ops,
-                               itershape, datashape)
+                               itershape, datashape, nbatch)
 
         # Rename the most time consuming section as 'main'
         if len(summary) > 0:
@@ -172,8 +205,11 @@ class Profiler(object):
         """
         if self._C_timings is None:
             raise RuntimeError("Cannot extract timings with non-finalized Profiler.")
-        return {field: max(getattr(self._C_timings, field), 10**-6)
-                for field, _ in self._C_timings._fields_}
+        return self._extract(self._C_timings)
+
+    def _extract(self, timings):
+        return {field: max(getattr(timings, field), 10**-6)
+                for field, _ in timings._fields_}
 
     @property
     def dtype(self):
@@ -197,10 +233,21 @@ class PerformanceSummary(OrderedDict):
 
     """
     A special dictionary to track and quickly access performance data.
+
+    The attribute ``io`` is an :class:`IOEntry` summarizing the staging of
+    out-of-core data, if any, or None. The attribute ``allocation`` maps the
+    name of the data in C memory to its :class:`AllocationPolicy`.
     """
 
-    def setsection(self, key, time, gflopss, gpointss, oi, ops, itershape, datashape):
-        self[key] = PerfEntry(time, gflopss, gpointss, oi, ops, itershape, datashape)
+    def __init__(self, *args, **kwargs):
+        super(PerformanceSummary, self).__init__(*args, **kwargs)
+        self.io = None
+        self.allocation = OrderedDict()
+
+    def setsection(self, key, time, gflopss, gpointss, oi, ops, itershape, datashape,
+                   nbatch=1):
+        self[key] = PerfEntry(time, gflopss, gpointss, oi, ops, itershape, datashape,
+                              nbatch)
 
     @property
     def gflopss(self):
@@ -215,9 +262,169 @@ class PerformanceSummary(OrderedDict):
         return OrderedDict([(k, v.time) for k, v in self.items()])
 
 
+class BuildProfile(OrderedDict):
+
+    """
+    The profile of the construction of an :class:`Operator`. Map each phase
+    of the construction (e.g., ``'clusterize'``, ``'dse'``, ``'codegen'``,
+    ``'jit_compile'``), as well as each DSE and DLE pass (e.g., ``'dse.factorize'``),
+    to a :class:`BuildEntry`, that is the time spent in it, in seconds, and the
+    peak memory allocated within it, in MB.
+
+    The memory is traced, through :mod:`tracemalloc`, only if the profile is
+    emitted (that is, if ``configuration['build_profile']`` is set), as tracing
+    slows down the construction; otherwise, it is None.
+
+    Passes applied multiple times (e.g., a DSE pass applied to each
+    :class:`Cluster`) are accumulated: the times are summed up, while the
+    peak memory is the largest one.
+    """
+
+    _current = threading.local()
+
+    def __init__(self, name):
+        super(BuildProfile, self).__init__()
+        self.name = name
+
+    @contextmanager
+    def phase(self, name):
+        """Track the phase ``name``, including the DSE and DLE passes therein."""
+        previous = getattr(BuildProfile._current, 'profile', None)
+        BuildProfile._current.profile = self
+        try:
+            with self.track(name):
+                yield
+        finally:
+            BuildProfile._current.profile = previous
+
+    @contextmanager
+    def track(self, name):
+        """Account the time spent, and the peak memory allocated, within the
+        block to the phase or pass ``name``."""
+        scope = MemoryScope.enter() if configuration['build_profile'] else None
+        tic = time()
+        try:
+            yield
+        finally:
+            self.add(name, time() - tic, scope.exit() if scope else None)
+
+    def add(self, name, elapsed, memory=None):
+        """Account ``elapsed`` seconds, and a peak of ``memory`` MB, to the phase
+        or pass ``name``."""
+        entry = self.get(name, BuildEntry(0., None))
+        if entry.memory is not None:
+            memory = max(memory, entry.memory) if memory is not None else entry.memory
+        self[name] = BuildEntry(entry.time + elapsed, memory)
+
+    @property
+    def phases(self):
+        """The phases of the construction, excluding the DSE and DLE passes."""
+        return OrderedDict([(k, v) for k, v in self.items() if '.' not in k])
+
+    @property
+    def time(self):
+        """The overall construction time, in seconds."""
+        return sum(i.time for i in self.phases.values())
+
+    def to_json(self):
+        """Return a JSON representation of the profile."""
+        return json.dumps(OrderedDict([
+            ('name', self.name),
+            ('time', self.time),
+            ('phases', OrderedDict([(k, v._asdict()) for k, v in self.items()]))
+        ]))
+
+    def emit(self):
+        """
+        Append the JSON representation of the profile, as a single line, to the
+        file ``configuration['build_profile']``, if set.
+        """
+        filename = configuration['build_profile']
+        if filename:
+            with open(filename, 'a') as f:
+                f.write(self.to_json() + '\n')
+
+
+@contextmanager
+def track_pass(name):
+    """
+    Account the time spent, and the peak memory allocated, within the block to
+    the pass ``name`` in the :class:`BuildProfile` of the phase currently in
+    progress, if any.
+    """
+    profile = getattr(BuildProfile._current, 'profile', None)
+    if profile is None:
+        yield
+    else:
+        with profile.track(name):
+            yield
+
+
+class MemoryScope(object):
+
+    """
+    The peak memory allocated within a block of code, as traced by
+    :mod:`tracemalloc`. Tracing starts with the outermost open scope, and
+    stops with it.
+
+    Scopes may be nested. As the peak traced memory is only reset by clearing
+    the traces, upon entering a scope, each open scope accounts for the memory
+    traced so far through an offset. Allocations by other threads, as well as
+    releases of memory allocated before the scope was entered, are included.
+    """
+
+    _open = []
+    _started = False
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.offset = 0
+        self.peak = 0
+
+    @classmethod
+    def enter(cls):
+        """Open, and return, a new scope."""
+        with cls._lock:
+            if not cls._open:
+                cls._started = not tracemalloc.is_tracing()
+                if cls._started:
+                    tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            for i in cls._open:
+                i.peak = max(i.peak, i.offset + peak)
+                i.offset += current
+            tracemalloc.clear_traces()
+            scope = cls()
+            cls._open.append(scope)
+            return scope
+
+    def exit(self):
+        """Close ``self``, and return its peak memory, in MB."""
+        with self._lock:
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, self.offset + peak)
+            self._open.remove(self)
+            if not self._open and MemoryScope._started:
+                tracemalloc.stop()
+        return self.peak / 1024.**2
+
+
+BuildEntry = namedtuple('BuildEntry', 'time memory')
+"""The time, in seconds, and the peak memory allocated, in MB (or None, if not
+traced), of a build phase or pass."""
+
+
 Profile = namedtuple('Profile', 'name ops memory')
 """Metadata for a profiled code section."""
 
 
-PerfEntry = namedtuple('PerfEntry', 'time gflopss gpointss oi ops itershape datashape')
-"""Structured performance data."""
+PerfEntry = namedtuple('PerfEntry',
+                       'time gflopss gpointss oi ops itershape datashape nbatch')
+"""Structured performance data. ``nbatch`` is the number of independent problems
+(e.g., shots) computed at once, along a :class:`BatchDimension`."""
+
+
+IOEntry = namedtuple('IOEntry', 'nbytes time stall bandwidth')
+"""The I/O staging out-of-core data in and out of RAM: the bytes moved, the time
+spent by the I/O threads and the time the computation stalled, in seconds, and
+the achieved bandwidth, in GB/s."""
@@ -0,0 +1,214 @@
+"""
+Serialization of Iteration/Expression trees and of the symbolic objects they
+embed, as required to reconstruct an :class:`Operator` without going through
+the symbolic lowering pipeline.
+
+Devito symbolic objects (e.g., :class:`Function`, :class:`Scalar`) are instances
+of classes created on-the-fly, so they cannot be pickled as they are. Here,
+they are either reconstructed from their defining properties or, if they are
+user-level objects (e.g., the :class:`Function`s and :class:`Dimension`s in
+input to an Operator), referenced by name and resolved, upon deserialization,
+against a namespace of live objects.
+"""
+
+from __future__ import absolute_import
+
+import io
+import pickle
+import sys
+
+import sympy
+from sympy.core.function import UndefinedFunction
+
+from devito.arguments import Argument
+from devito.dimension import Dimension, LoweredDimension, SteppingDimension
+from devito.types import AbstractFunction, Array, IndexedData, Scalar, Symbol
+
+__all__ = ['dumps', 'loads']
+
+
+def dumps(obj, namespace, dimensions=()):
+    """
+    Serialize ``obj``, an arbitrary structure of Iteration/Expression trees,
+    symbolic objects and runtime arguments.
+
+    :param namespace: An iterable of user-level objects, such as :class:`Function`s,
+                      :class:`Dimension`s and :class:`Object`s, which are not
+                      serialized; rather, a reference by name is stored.
+    :param dimensions: (Optional) an iterable of :class:`Dimension`s whose
+                       symbolic size, start and end, if encountered, are
+                       serialized as references to the Dimension itself.
+    :raises PicklingError: If ``obj`` depends on symbolic objects which cannot
+                           be serialized.
+    """
+    stream = io.BytesIO()
+    Pickler(stream, namespace, dimensions).dump(obj)
+    return stream.getvalue()
+
+
+def loads(data, namespace):
+    """
+    Deserialize an object produced by :func:`dumps`.
+
+    :param namespace: An iterable of user-level objects to resolve the references
+                      stored by :func:`dumps`.
+    :raises UnpicklingError: If a reference cannot be resolved.
+    """
+    return Unpickler(io.BytesIO(data), namespace).load()
+
+
+class Pickler(pickle.Pickler):
+
+    def __init__(self, file, namespace, dimensions=()):
+        self._references = {id(i): reference(i) for i in namespace}
+        self._namespace = list(namespace)  # Keep the referenced objects alive
+
+        self._symbols = {}
+        for d in list(dimensions) + [i for i in namespace if isinstance(i, Dimension)]:
+            self._symbols[d.size_name] = (d, 'symbolic_size')
+            self._symbols[d.start_name] = (d, 'symbolic_start')
+            self._symbols[d.end_name] = (d, 'symbolic_end')
+
+        super(Pickler, self).__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.dispatch_table = Reducers(self)
+
+    def persistent_id(self, obj):
+        return self._references.get(id(obj))
+
+
+class Unpickler(pickle.Unpickler):
+
+    def __init__(self, file, namespace):
+        super(Unpickler, self).__init__(file)
+        self._namespace = {reference(i): i for i in namespace}
+
+    def persistent_load(self, pid):
+        try:
+            return self._namespace[tuple(pid)]
+        except KeyError:
+            raise pickle.UnpicklingError("Unresolved reference to `%s`" % str(pid))
+
+
+class Reducers(object):
+
+    """
+    A dispatch table mapping the types of Devito objects which cannot be
+    pickled as they are to functions returning their reduced form.
+    """
+
+    def __init__(self, pickler):
+        self.pickler = pickler
+
+    def get(self, cls, default=None):
+        try:
+            return self[cls]
+        except KeyError:
+            return default
+
+    def __getitem__(self, cls):
+        if issubclass(cls, Argument):
+            return self._reduce_argument
+        elif issubclass(cls, UndefinedFunction):
+            return self._reduce_undefined_function
+        elif issubclass(cls, Dimension):
+            return self._reduce_dimension
+        elif issubclass(cls, Symbol):
+            return self._reduce_symbol
+        elif issubclass(cls, AbstractFunction):
+            return self._reduce_function
+        elif issubclass(cls, IndexedData):
+            return self._reduce_indexed_data
+        elif getattr(cls, 'is_Constant', False):
+            return self._reduce_constant
+        elif getattr(cls, 'is_Object', False):
+            return self._unpicklable
+        raise KeyError(cls)
+
+    def _unpicklable(self, obj):
+        raise pickle.PicklingError("Cannot serialize `%s` (%s)" % (obj, type(obj)))
+
+    def _reduce_argument(self, obj):
+        try:
+            index = obj.provider.rtargs.index(obj)
+        except (AttributeError, ValueError):
+            self._unpicklable(obj)
+        return rtarg, (obj.provider, index)
+
+    def _reduce_undefined_function(self, obj):
+        return sympy.Function, (obj.__name__,)
+
+    def _reduce_dimension(self, obj):
+        if isinstance(obj, LoweredDimension):
+            return rebuild, (LoweredDimension, (obj.name, obj.stepping, obj.offset))
+        elif isinstance(obj, SteppingDimension):
+            return rebuild, (SteppingDimension, (obj.name, obj.parent),
+                             {'modulo': obj.modulo})
+        return rebuild, (type(obj), (obj.name,),
+                         {'reverse': obj.reverse, 'spacing': obj.spacing})
+
+    def _reduce_symbol(self, obj):
+        cls = origin(type(obj))
+        if cls is Symbol and obj.name in self.pickler._symbols:
+            return getattr, self.pickler._symbols[obj.name]
+        elif cls in (Symbol, Scalar):
+            return rebuild, (cls, (), {'name': obj.name, 'dtype': obj.dtype})
+        self._unpicklable(obj)
+
+    def _reduce_function(self, obj):
+        if obj is not obj.function:
+            return apply_function, (obj.function, obj.args)
+        elif isinstance(obj, Array):
+            return rebuild, (Array, (), {'name': obj.name, 'shape': obj.shape,
+                                         'dimensions': obj.indices, 'dtype': obj.dtype,
+                                         'external': obj._external,
+                                         'onstack': obj._onstack,
+                                         'onheap': obj._onheap})
+        self._unpicklable(obj)
+
+    def _reduce_constant(self, obj):
+        # E.g., the spacing of a Dimension which isn't referenced
+        return rebuild, (origin(type(obj)), (), {'name': obj.name, 'dtype': obj.dtype,
+                                                 'value': obj.data})
+
+    def _reduce_indexed_data(self, obj):
+        return rebuild, (IndexedData, (obj.label.name,),
+                         {'shape': obj.shape, 'function': obj.function})
+
+
+# Helpers invoked upon deserialization
+
+
+def rebuild(cls, args, kwargs=None):
+    return cls(*args, **(kwargs or {}))
+
+
+def rtarg(provider, index):
+    return provider.rtargs[index]
+
+
+def apply_function(function, args):
+    return function.func(*args)
+
+
+# Misc helpers
+
+
+def reference(obj):
+    """Return the name-based reference to the user-level object ``obj``."""
+    if isinstance(obj, Dimension):
+        return ('dimension', obj.name)
+    elif getattr(obj, 'is_Object', False):
+        return ('object', obj.name)
+    else:
+        return ('function', obj.name)
+
+
+def origin(cls):
+    """
+    Return the first class in the MRO of ``cls`` which is not a dynamically
+    created, per-object class (see :meth:`CachedSymbol._symbol_type`).
+    """
+    for i in cls.__mro__:
+        if getattr(sys.modules.get(i.__module__), i.__name__, None) is i:
+            return i
+    return cls
@@ -9,8 +9,8 @@ from sympy.functions.elementary.trigonometric import TrigonometricFunction
 
 from devito.tools import as_tuple
 
-__all__ = ['FrozenExpr', 'Eq', 'Mul', 'Add', 'FunctionFromPointer', 'ListInitializer',
-           'taylor_sin', 'taylor_cos', 'bhaskara_sin', 'bhaskara_cos']
+__all__ = ['FrozenExpr', 'Eq', 'Mul', 'Add', 'IntDiv', 'FunctionFromPointer',
+           'ListInitializer', 'taylor_sin', 'taylor_cos', 'bhaskara_sin', 'bhaskara_cos']
 
 
 class FrozenExpr(Expr):
@@ -63,6 +63,27 @@ class Add(sympy.Add, FrozenExpr):
     pass
 
 
+class IntDiv(Expr):
+
+    """
+    Symbolic representation of the C notation ``lhs / rhs``, with ``lhs``
+    and ``rhs`` integers; that is, the integer division of ``lhs`` by ``rhs``.
+    """
+
+    is_integer = True
+
+    def __new__(cls, lhs, rhs):
+        return Expr.__new__(cls, lhs, sympy.sympify(rhs))
+
+    @property
+    def lhs(self):
+        return self.args[0]
+
+    @property
+    def rhs(self):
+        return self.args[1]
+
+
 class FunctionFromPointer(sympy.Symbol):
 
     """
@@ -32,6 +32,17 @@ def freeze_expression(expr):
         return expr.func(*[freeze_expression(e) for e in expr.args])
 
 
+def unevaluated(func, *args):
+    """
+    Build ``func(*args)`` without evaluating it, if ``func`` supports it.
+    Some SymPy classes, such as :class:`sympy.Max`, are always evaluated.
+    """
+    try:
+        return func(*args, evaluate=False)
+    except TypeError:
+        return func(*args)
+
+
 def xreplace_constrained(exprs, make, rule=None, costmodel=lambda e: True, repeat=False):
     """
     Unlike ``xreplace``, which replaces all objects specified in a mapper,
@@ -96,21 +107,21 @@ def xreplace_constrained(exprs, make, rule=None, costmodel=lambda e: True, repea
             matching = [a for a, flag in children if flag]
             other = [a for a, _ in children if a not in matching]
             if matching:
-                matched = expr.func(*matching, evaluate=False)
+                matched = unevaluated(expr.func, *matching)
                 if len(matching) == len(children) and rule(expr):
                     # Go look for longer expressions first
                     return matched, True
                 elif rule(matched) and costmodel(matched):
                     # Replace what I can replace, then give up
-                    rebuilt = expr.func(*(other + [replace(matched)]), evaluate=False)
+                    rebuilt = unevaluated(expr.func, *(other + [replace(matched)]))
                     return rebuilt, False
                 else:
                     # Replace flagged children, then give up
                     replaced = [replace(e) for e in matching if costmodel(e)]
                     unreplaced = [e for e in matching if not costmodel(e)]
-                    rebuilt = expr.func(*(other + replaced + unreplaced), evaluate=False)
+                    rebuilt = unevaluated(expr.func, *(other + replaced + unreplaced))
                     return rebuilt, False
-            return expr.func(*other, evaluate=False), False
+            return unevaluated(expr.func, *other), False
 
     # Process the provided expressions
     for expr in as_tuple(exprs):
@@ -157,7 +168,7 @@ def pow_to_mul(expr):
         else:
             return sympy.Mul(*[base]*exp, evaluate=False)
     else:
-        return expr.func(*[pow_to_mul(i) for i in expr.args], evaluate=False)
+        return unevaluated(expr.func, *[pow_to_mul(i) for i in expr.args])
 
 
 def as_symbol(expr):
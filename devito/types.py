@@ -15,6 +15,10 @@ __all__ = ['Symbol', 'Indexed']
 
 configuration.add('first_touch', 0, [0, 1], lambda i: bool(i))
 
+# Whether the innermost dimension of the data of the Functions should be padded
+# to a multiple of the vector width
+configuration.add('padding', 0, [0, 1], lambda i: bool(i))
+
 # This cache stores a reference to each created data object
 # so that we may re-create equivalent symbols during symbolic
 # manipulation with the correct shapes, pointers, etc.
@@ -4,8 +4,8 @@ import cgen as c
 import numpy as np
 from sympy import Indexed
 
+from devito.arguments import argument_scope
 from devito.cgen_utils import ccode
-from devito.compiler import jit_compile
 from devito.dimension import LoweredDimension
 from devito.dle import filter_iterations, retrieve_iteration_tree
 from devito.types import Object
@@ -31,6 +31,9 @@ class Operator(OperatorRunnable):
     _default_headers += ['#define restrict __restrict']
     _default_includes = OperatorRunnable._default_includes + ['yask_kernel_api.hpp']
 
+    # The YASK solution, built while lowering, cannot be serialized
+    _cacheable = False
+
     def __init__(self, expressions, **kwargs):
         kwargs['dle'] = ('denormals',) + (('openmp',) if configuration['openmp'] else ())
         super(Operator, self).__init__(expressions, **kwargs)
@@ -117,27 +120,28 @@ class Operator(OperatorRunnable):
         local_grids_mapper = {namespace['code-grid-name'](k): v
                               for k, v in self.yk_soln.local_grids.items()}
 
-        # The user has the illusion to provide plain data objects to the
-        # generated kernels, but what we actually need and thus going to
-        # provide are pointers to the wrapped YASK grids.
-        for i in self.parameters:
-            grid_arg = mapper.get(namespace['code-grid-name'](i.name))
-            if grid_arg is not None:
-                assert i.provider.from_YASK is True
-                obj = kwargs.get(i.name, i.provider)
-                # Get the associated YaskGrid wrapper (scalars are a special case)
-                wrapper = obj.data if not np.isscalar(obj) else YaskGridConst(obj)
-                # Setup YASK grids ("sharing" user-provided or default data)
-                target = self.yk_soln.grids.get(i.name)
-                if target is not None:
-                    wrapper.give_storage(target)
-                # Add C-level pointer to the YASK grids
-                assert grid_arg.verify(wrapper.rawpointer)
-            elif i.name in local_grids_mapper:
-                # Add C-level pointer to the temporary YASK grids
-                assert i.verify(rawpointer(local_grids_mapper[i.name]))
-
-        return super(Operator, self).arguments(**kwargs)
+        with argument_scope():
+            # The user has the illusion to provide plain data objects to the
+            # generated kernels, but what we actually need and thus going to
+            # provide are pointers to the wrapped YASK grids.
+            for i in self.parameters:
+                grid_arg = mapper.get(namespace['code-grid-name'](i.name))
+                if grid_arg is not None:
+                    assert i.provider.from_YASK is True
+                    obj = kwargs.get(i.name, i.provider)
+                    # Get the associated YaskGrid wrapper (scalars are a special case)
+                    wrapper = obj.data if not np.isscalar(obj) else YaskGridConst(obj)
+                    # Setup YASK grids ("sharing" user-provided or default data)
+                    target = self.yk_soln.grids.get(i.name)
+                    if target is not None:
+                        wrapper.give_storage(target)
+                    # Add C-level pointer to the YASK grids
+                    assert grid_arg.verify(wrapper.rawpointer)
+                elif i.name in local_grids_mapper:
+                    # Add C-level pointer to the temporary YASK grids
+                    assert i.verify(rawpointer(local_grids_mapper[i.name]))
+
+            return super(Operator, self).arguments(**kwargs)
 
     def apply(self, **kwargs):
         # Build the arguments list to invoke the kernel function
@@ -168,23 +172,10 @@ class Operator(OperatorRunnable):
         # Output summary of performance achieved
         return self._profile_output(arguments)
 
-    @property
-    def compile(self):
-        """
-        JIT-compile the C code generated by the Operator.
-
-        It is ensured that JIT compilation will only be performed once per
-        :class:`Operator`, reagardless of how many times this method is invoked.
-
-        :returns: The file name of the JIT-compiled function.
-        """
-        if self._lib is None:
-            # No need to recompile if a shared object has already been loaded.
-            if not isinstance(self.yk_soln, YaskNullKernel):
-                self._compiler.libraries.append(self.yk_soln.soname)
-            return jit_compile(self.ccode, self._compiler)
-        else:
-            return self._lib.name
+    def _jit_compile(self):
+        if not isinstance(self.yk_soln, YaskNullKernel):
+            self._compiler.libraries.append(self.yk_soln.soname)
+        return super(Operator, self)._jit_compile()
 
 
 class sympy2yask(object):
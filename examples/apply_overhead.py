@@ -0,0 +1,66 @@
+from argparse import ArgumentParser
+from timeit import default_timer as timer
+
+from devito import Grid, TimeFunction, Eq, Operator, configuration
+
+
+def setup(shape, space_order):
+    """A small diffusion Operator, whose run time is dominated by the
+    per-call overhead of :meth:`Operator.apply`."""
+    grid = Grid(shape=shape)
+    u = TimeFunction(name='u', grid=grid, space_order=space_order)
+    op = Operator(Eq(u.forward, u + 0.1*u.laplace))
+    return op, u
+
+
+def run(shape=(16, 16), space_order=2, timesteps=1, calls=2000, repeats=5,
+        plans=True):
+    """
+    Time ``calls`` invocations of :meth:`Operator.apply` on a small kernel,
+    with the argument plans cached (``plans=True``) or rebuilt at every call.
+    Return the best, over ``repeats`` runs, of the average time per call in
+    microseconds.
+    """
+    op, u = setup(shape, space_order)
+    if not plans:
+        # Plans are recorded and immediately evicted; each call takes the
+        # full argument processing path
+        op._plans_capacity = 0
+
+    # Warm up, so as to exclude JIT compilation and the first (slow) call
+    op.apply(time=timesteps)
+
+    timings = []
+    for _ in range(repeats):
+        start = timer()
+        for _ in range(calls):
+            op.apply(time=timesteps)
+        timings.append((timer() - start) / calls * 1e6)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Measure the per-call overhead of "
+                            "Operator.apply, with and without argument plans")
+    parser.add_argument("-d", "--shape", nargs="*", default=[16, 16], type=int,
+                        help="Number of grid points along each axis")
+    parser.add_argument("-so", "--space_order", default=2, type=int,
+                        help="Space order of the stencil")
+    parser.add_argument("-t", "--timesteps", default=1, type=int,
+                        help="Number of timesteps per call")
+    parser.add_argument("-n", "--calls", default=2000, type=int,
+                        help="Number of calls per repetition")
+    parser.add_argument("-x", "--repeats", default=5, type=int,
+                        help="Repetitions; the fastest one is reported")
+    args = parser.parse_args()
+
+    # The performance summary of each call is otherwise logged
+    configuration['log_level'] = 'ERROR'
+
+    parameters = vars(args).copy()
+    parameters['shape'] = tuple(parameters['shape'])
+    results = [(plans, run(plans=plans, **parameters)) for plans in [False, True]]
+    for plans, timing in results:
+        print("Argument plans %-3s: %8.1f us per call"
+              % ('on' if plans else 'off', timing))
+    print("Speedup: %.2fx" % (results[0][1] / results[1][1]))
@@ -3,6 +3,8 @@ from sympy import solve, Symbol
 from devito import Eq, Operator, Forward, Backward, Function, TimeFunction
 from devito.logger import error
 from examples.seismic import PointSource, Receiver
+from examples.seismic.boundary import BoundaryWavefield
+from examples.seismic.compression import QuantizedWavefield
 
 
 def laplacian(field, time_order, m, s):
@@ -57,8 +59,36 @@ def iso_stencil(field, time_order, m, s, damp, **kwargs):
     return [Eq(next, eq_time.subs({H: lap}))]
 
 
+def reconstruction(u, model, source, boundary):
+    """
+    The equations reconstructing the forward wavefield ``u`` backwards in time,
+    from the band ``boundary`` saved by the forward run: the wave equation is
+    reversed, and the source un-injected, in the core of the domain, while the
+    band is restored. Only second order in time is supported, as the fourth
+    order scheme, reversed, is unstable in the core.
+    """
+    m = model.m
+    src = PointSource(name='src', grid=model.grid, ntime=source.nt,
+                      npoint=source.npoint)
+
+    # Get computational time-step value
+    dt = model.critical_dt
+
+    # The core of the domain lies outside the absorbing layer
+    s = model.grid.stepping_dim.spacing
+    eqn = iso_stencil(u, 2, m, s, 0, forward=False)
+    eqn = [Eq(i.lhs, boundary.core * i.rhs) for i in eqn]
+
+    # Undo the source injection
+    src_term = src.inject(field=u.backward, expr=src * dt**2 / m,
+                          offset=model.nbpml)
+
+    return eqn + src_term + boundary.restore(u)
+
+
 def ForwardOperator(model, source, receiver, time_order=2, space_order=4,
-                    save=False, **kwargs):
+                    save=False, subsampling=None, compression=None, boundary=False,
+                    **kwargs):
     """
     Constructor method for the forward modelling operator in an acoustic media
 
@@ -68,12 +98,19 @@ def ForwardOperator(model, source, receiver, time_order=2, space_order=4,
     :param time_order: Time discretization order
     :param space_order: Space discretization order
     :param save: Saving flag, True saves all time steps, False only the three
+    :param subsampling: (Optional) if :param save: is True, save only every
+                        ``subsampling``-th time step, into ``usave``
+    :param compression: (Optional) if :param save: is True, save the time
+                        steps into ``usave`` quantized to ``compression`` bits
+    :param boundary: (Optional) if :param save: is True, save only a band of
+                     the time steps, along the absorbing layer, into ``ubnd``
     """
     m, damp = model.m, model.damp
 
     # Create symbols for forward wavefield, source and receivers
-    u = TimeFunction(name='u', grid=model.grid,
-                     save=save, time_dim=source.nt if save else None,
+    buffered = not save or subsampling or compression or boundary
+    u = TimeFunction(name='u', grid=model.grid, save=not buffered,
+                     time_dim=None if buffered else source.nt,
                      time_order=2, space_order=space_order)
     src = PointSource(name='src', grid=model.grid, ntime=source.nt,
                       npoint=source.npoint)
@@ -93,6 +130,23 @@ def ForwardOperator(model, source, receiver, time_order=2, space_order=4,
     # Create interpolation expression for receivers
     rec_term = rec.interpolate(expr=u, offset=model.nbpml)
 
+    # Save the wavefield every few time steps and/or compressed, or only along
+    # the absorbing layer, if requested
+    if save and boundary:
+        if time_order != 2:
+            raise ValueError("Boundary-saved wavefields require time_order=2")
+        ubnd = BoundaryWavefield('ubnd', model, source.nt, space_order=space_order)
+        rec_term += ubnd.save(u)
+    elif save and compression:
+        usave = QuantizedWavefield('usave', model.grid, source.nt, bits=compression,
+                                   subsampling=subsampling, space_order=space_order)
+        rec_term += usave.compress(u)
+    elif save and subsampling:
+        usave = TimeFunction(name='usave', grid=model.grid, save=True,
+                             time_dim=source.nt, subsampling=subsampling,
+                             time_order=2, space_order=space_order)
+        rec_term += [Eq(usave, u)]
+
     # Substitute spacing terms to reduce flops
     return Operator(eqn + src_term + rec_term, subs=model.spacing_map,
                     time_axis=Forward, name='Forward', **kwargs)
@@ -135,8 +189,33 @@ def AdjointOperator(model, source, receiver, time_order=2, space_order=4, **kwar
                     time_axis=Backward, name='Adjoint', **kwargs)
 
 
+def ReconstructionOperator(model, source, receiver, time_order=2, space_order=4,
+                           **kwargs):
+    """
+    Constructor method for the operator reconstructing, backwards in time, the
+    forward wavefield in an acoustic media, from the band of the wavefield
+    saved along the absorbing layer by the forward operator
+
+    :param model: :class:`Model` object containing the physical parameters
+    :param source: :class:`PointData` object containing the source geometry
+    :param receiver: :class:`PointData` object containing the acquisition geometry
+    :param time_order: Time discretization order
+    :param space_order: Space discretization order
+    """
+    if time_order != 2:
+        raise ValueError("Boundary-saved wavefields require time_order=2")
+    u = TimeFunction(name='u', grid=model.grid, save=False,
+                     time_order=2, space_order=space_order)
+    ubnd = BoundaryWavefield('ubnd', model, source.nt, space_order=space_order)
+    eqn = reconstruction(u, model, source, ubnd)
+
+    # Substitute spacing terms to reduce flops
+    return Operator(eqn, subs=model.spacing_map, time_axis=Backward,
+                    name='Reconstruction', **kwargs)
+
+
 def GradientOperator(model, source, receiver, time_order=2, space_order=4, save=True,
-                     **kwargs):
+                     subsampling=None, compression=None, boundary=False, **kwargs):
     """
     Constructor method for the gradient operator in an acoustic media
 
@@ -145,13 +224,37 @@ def GradientOperator(model, source, receiver, time_order=2, space_order=4, save=
     :param receiver: :class:`PointData` object containing the acquisition geometry
     :param time_order: Time discretization order
     :param space_order: Space discretization order
+    :param subsampling: (Optional) read the forward wavefield ``usave``,
+                        saved every ``subsampling``-th time step
+    :param compression: (Optional) read the forward wavefield ``usave``,
+                        quantized to ``compression`` bits
+    :param boundary: (Optional) reconstruct the forward wavefield ``u``
+                     alongside the adjoint one, from the band ``ubnd`` saved
+                     along the absorbing layer
     """
     m, damp = model.m, model.damp
 
     # Gradient symbol and wavefield symbols
     grad = Function(name='grad', grid=model.grid)
-    u = TimeFunction(name='u', grid=model.grid, save=save, time_dim=source.nt if save
-                     else None, time_order=2, space_order=space_order)
+    reconstruct = []
+    if compression:
+        if time_order != 2:
+            raise ValueError("Compressed wavefields require time_order=2")
+        usave = QuantizedWavefield('usave', model.grid, source.nt, bits=compression,
+                                   subsampling=subsampling, space_order=space_order)
+        u = usave.decompress()
+    elif boundary:
+        if time_order != 2:
+            raise ValueError("Boundary-saved wavefields require time_order=2")
+        u = TimeFunction(name='u', grid=model.grid, save=False,
+                         time_order=2, space_order=space_order)
+        ubnd = BoundaryWavefield('ubnd', model, source.nt, space_order=space_order)
+        reconstruct = reconstruction(u, model, source, ubnd)
+    else:
+        u = TimeFunction(name='usave' if subsampling else 'u', grid=model.grid,
+                         save=save, time_dim=source.nt if save else None,
+                         subsampling=subsampling, time_order=2,
+                         space_order=space_order)
     v = TimeFunction(name='v', grid=model.grid, save=False,
                      time_order=2, space_order=space_order)
     rec = Receiver(name='rec', grid=model.grid, ntime=receiver.nt,
@@ -161,9 +264,16 @@ def GradientOperator(model, source, receiver, time_order=2, space_order=4, save=
     dt = model.critical_dt * (1.73 if time_order == 4 else 1.0)
 
     s = model.grid.stepping_dim.spacing
-    eqn = iso_stencil(v, time_order, m, s, damp, forward=False)
-
-    if time_order == 2:
+    eqn = reconstruct + iso_stencil(v, time_order, m, s, damp, forward=False)
+
+    if subsampling or compression:
+        # The time derivative is moved onto the adjoint wavefield, available at
+        # every time step; each saved step stands for ``subsampling`` of them
+        update = u * v.dt2
+        if time_order == 4:
+            update += s**2 / 12.0 * u.laplace2(m**(-2)) * v
+        gradient_update = Eq(grad, grad - (subsampling or 1) * update)
+    elif time_order == 2:
         gradient_update = Eq(grad, grad - u.dt2 * v)
     else:
         gradient_update = Eq(grad, grad - (u.dt2 +
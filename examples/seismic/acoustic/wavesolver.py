@@ -1,7 +1,11 @@
 from devito import Function, TimeFunction, memoized
+from devito.logger import info
 from examples.seismic import PointSource, Receiver
+from examples.seismic.boundary import BoundaryWavefield
+from examples.seismic.compression import QuantizedWavefield
 from examples.seismic.acoustic.operators import (
-    ForwardOperator, AdjointOperator, GradientOperator, BornOperator
+    ForwardOperator, AdjointOperator, GradientOperator, BornOperator,
+    ReconstructionOperator
 )
 
 
@@ -43,10 +47,12 @@ class AcousticWaveSolver(object):
         self._kwargs = kwargs
 
     @memoized
-    def op_fwd(self, save=False):
+    def op_fwd(self, save=False, subsampling=None, compression=None, boundary=False):
         """Cached operator for forward runs with buffered wavefield"""
-        return ForwardOperator(self.model, save=save, source=self.source,
-                               receiver=self.receiver, time_order=self.time_order,
+        return ForwardOperator(self.model, save=save, subsampling=subsampling,
+                               compression=compression, boundary=boundary,
+                               source=self.source, receiver=self.receiver,
+                               time_order=self.time_order,
                                space_order=self.space_order, **self._kwargs)
 
     @memoized
@@ -57,12 +63,22 @@ class AcousticWaveSolver(object):
                                space_order=self.space_order, **self._kwargs)
 
     @memoized
-    def op_grad(self):
+    def op_grad(self, subsampling=None, compression=None, boundary=False):
         """Cached operator for gradient runs"""
-        return GradientOperator(self.model, save=True, source=self.source,
-                                receiver=self.receiver, time_order=self.time_order,
+        return GradientOperator(self.model, save=True, subsampling=subsampling,
+                                compression=compression, boundary=boundary,
+                                source=self.source, receiver=self.receiver,
+                                time_order=self.time_order,
                                 space_order=self.space_order, **self._kwargs)
 
+    @memoized
+    def op_reconstruct(self):
+        """Cached operator for the reconstruction of forward wavefields"""
+        return ReconstructionOperator(self.model, source=self.source,
+                                      receiver=self.receiver,
+                                      time_order=self.time_order,
+                                      space_order=self.space_order, **self._kwargs)
+
     @memoized
     def op_born(self):
         """Cached operator for born runs"""
@@ -70,7 +86,8 @@ class AcousticWaveSolver(object):
                             receiver=self.receiver, time_order=self.time_order,
                             space_order=self.space_order, **self._kwargs)
 
-    def forward(self, src=None, rec=None, u=None, m=None, save=False, **kwargs):
+    def forward(self, src=None, rec=None, u=None, m=None, save=False,
+                subsampling=None, compression=None, boundary=False, **kwargs):
         """
         Forward modelling function that creates the necessary
         data objects for running a forward modelling operator.
@@ -80,6 +97,16 @@ class AcousticWaveSolver(object):
         :param u: (Optional) Symbol to store the computed wavefield
         :param m: (Optional) Symbol for the time-constant square slowness
         :param save: Option to store the entire (unrolled) wavefield
+        :param subsampling: (Optional) if ``save`` is True, store the wavefield
+                            only every ``subsampling``-th time step. The stored
+                            wavefield, rather than ``u``, is then returned
+        :param compression: (Optional) if ``save`` is True, store the wavefield
+                            quantized to ``compression`` (8 or 16) bits. A
+                            :class:`QuantizedWavefield` is then returned
+        :param boundary: (Optional) if ``save`` is True, store the wavefield
+                         only in a band along the absorbing layer, from which
+                         it is reconstructed when computing the gradient. A
+                         :class:`BoundaryWavefield` is then returned
 
         :returns: Receiver, wavefield and performance summary
         """
@@ -93,19 +120,48 @@ class AcousticWaveSolver(object):
                            coordinates=self.receiver.coordinates.data)
 
         # Create the forward wavefield if not provided
+        subsampling = subsampling if save else None
+        compression = compression if save else None
+        boundary = boundary if save else False
+        buffered = not save or subsampling or compression or boundary
         if u is None:
-            u = TimeFunction(name='u', grid=self.model.grid, save=save,
-                             time_dim=self.source.nt if save else None,
+            u = TimeFunction(name='u', grid=self.model.grid, save=not buffered,
+                             time_dim=None if buffered else self.source.nt,
                              time_order=2, space_order=self.space_order)
+        usave = u
+        if boundary:
+            usave = BoundaryWavefield('ubnd', self.model, self.source.nt,
+                                      space_order=self.space_order)
+            kwargs.update(usave.arguments)
+        elif compression:
+            usave = QuantizedWavefield('usave', self.model.grid, self.source.nt,
+                                       bits=compression, subsampling=subsampling,
+                                       space_order=self.space_order)
+            usave.initialize(u)
+            kwargs.update(usave.arguments)
+        elif subsampling:
+            usave = TimeFunction(name='usave', grid=self.model.grid, save=True,
+                                 time_dim=self.source.nt, subsampling=subsampling,
+                                 time_order=2, space_order=self.space_order)
+            kwargs['usave'] = usave
 
         # Pick m from model unless explicitly provided
         if m is None:
             m = m or self.model.m
 
         # Execute operator and return wavefield and receiver data
-        summary = self.op_fwd(save).apply(src=src, rec=rec, u=u, m=m,
-                                          dt=self.dt, **kwargs)
-        return rec, u, summary
+        op = self.op_fwd(save, subsampling, compression, boundary)
+        summary = op.apply(src=src, rec=rec, u=u, m=m, dt=self.dt, **kwargs)
+
+        if boundary:
+            usave.finalize(u)
+        elif compression:
+            usave.finalize(u)
+            report = usave.report(sum(i.time for i in summary.values()))
+            info("Wavefield compressed to %d bits: ratio %.2f, error bound %.2e, "
+                 "%.2f GB/s" % report)
+
+        return rec, usave, summary
 
     def adjoint(self, rec, srca=None, v=None, m=None, **kwargs):
         """
@@ -148,7 +204,10 @@ class AcousticWaveSolver(object):
         Jacobian adjoint on an input data.
 
         :param recin: Receiver data as a numpy array
-        :param u: Symbol for full wavefield `u` (created with save=True)
+        :param u: Symbol for full wavefield `u` (created with save=True),
+                  possibly saved only every few time steps or compressed, or
+                  the band of `u` along the absorbing layer, from which `u`
+                  is reconstructed
         :param v: (Optional) Symbol to store the computed wavefield
         :param grad: (Optional) Symbol to store the gradient field
 
@@ -168,10 +227,64 @@ class AcousticWaveSolver(object):
         if m is None:
             m = m or self.model.m
 
-        summary = self.op_grad().apply(rec=rec, grad=grad, v=v, u=u, m=m,
-                                       dt=self.dt, **kwargs)
+        # The forward wavefield may have been saved every few time steps,
+        # and/or compressed, or only along the absorbing layer
+        subsampling, compression, boundary = None, None, False
+        if isinstance(u, BoundaryWavefield):
+            boundary = True
+            kwargs.update(u.arguments)
+            kwargs[u.core.name] = u.core
+            kwargs['u'] = self._reconstructed(u)
+            kwargs.setdefault('src', self.source)
+        elif isinstance(u, QuantizedWavefield):
+            subsampling = u.data.subsampling
+            compression = u.bits
+            kwargs.update(u.arguments)
+        else:
+            subsampling = getattr(u, 'subsampling', None)
+            kwargs[u.name] = u
+
+        op = self.op_grad(subsampling, compression, boundary)
+        summary = op.apply(rec=rec, grad=grad, v=v, m=m, dt=self.dt, **kwargs)
         return grad, summary
 
+    def reconstruct(self, ubnd, src=None, u=None, m=None, **kwargs):
+        """
+        Reconstruction function, running the forward wavefield backwards in
+        time from its band along the absorbing layer, back to its initial
+        state.
+
+        :param ubnd: :class:`BoundaryWavefield` saved by a forward run
+        :param src: Symbol with time series data for the injected source term
+        :param u: (Optional) Symbol to store the reconstructed wavefield
+        :param m: (Optional) Symbol for the time-constant square slowness
+
+        :returns: Reconstructed wavefield and performance summary
+        """
+        # Source term is read-only, so re-use the default
+        if src is None:
+            src = self.source
+
+        # Pick m from model unless explicitly provided
+        if m is None:
+            m = self.model.m
+
+        u = self._reconstructed(ubnd, u)
+        kwargs.update(ubnd.arguments)
+        kwargs[ubnd.core.name] = ubnd.core
+
+        summary = self.op_reconstruct().apply(src=src, u=u, m=m, dt=self.dt,
+                                              **kwargs)
+        return u, summary
+
+    def _reconstructed(self, ubnd, u=None):
+        """The wavefield to be reconstructed from ``ubnd``, in its initial state."""
+        if u is None:
+            u = TimeFunction(name='u', grid=self.model.grid, save=False,
+                             time_order=2, space_order=self.space_order)
+        ubnd.initialize(u)
+        return u
+
     def born(self, dmin, src=None, rec=None, u=None, U=None, m=None, **kwargs):
         """
         Linearized Born modelling function that creates the necessary
@@ -0,0 +1,117 @@
+import numpy as np
+
+from devito import Dimension, Eq, Function
+
+__all__ = ['BoundaryWavefield']
+
+
+class BoundaryWavefield(object):
+
+    """
+    A wavefield saved, as it is computed, only in a thin band along the inner
+    edge of the absorbing layer, as wide as the radius of the stencil; along
+    with the last two timesteps (the buffered wavefield itself), this is all that
+    is needed to reconstruct the wavefield backwards in time. Within the
+    absorbing layer the wave equation is not reversible, but the wavefield
+    there isn't needed: the core of the domain is only affected by the band,
+    whose values are restored at each timestep.
+
+    The memory footprint is ``O(nt*N**(d-1))``, rather than the
+    ``O(nt*N**d)`` of a fully saved wavefield, at the cost of a second
+    propagation, interleaved with the adjoint one.
+
+    :param name: Name of the saved band. The grid indices of the points in
+                 the band are stored in the :class:`Function`s named
+                 ``<name>_<dimension>``.
+    :param model: :class:`Model` object, with the absorbing layer.
+    :param nt: Number of timesteps.
+    :param space_order: (Optional) Space order of the stencil. Defaults to 2.
+    """
+
+    def __init__(self, name, model, nt, space_order=2):
+        grid = model.grid
+        self.model = model
+        self.nt = nt
+        self.width = space_order // 2
+        if self.width >= min(model.shape) // 2:
+            raise ValueError("The domain is too small for a boundary band of "
+                             "width %d" % self.width)
+
+        # The band is the interior of the domain minus its core
+        inner = model.nbpml + self.width
+        interior = tuple(slice(model.nbpml, n - model.nbpml) for n in grid.shape)
+        core = tuple(slice(inner, n - inner) for n in grid.shape)
+        band = np.zeros(grid.shape, dtype=np.bool)
+        band[interior] = True
+        band[core] = False
+        points = np.nonzero(band)
+
+        self.interior = interior
+        self.core = Function(name='%s_core' % name, grid=grid)
+        self.core.data[core] = 1.
+
+        p = Dimension('%s_p' % name)
+        self.points = [Function(name='%s_%s' % (name, d.name), dimensions=(p,),
+                                shape=(len(i),), dtype=np.int32)
+                       for d, i in zip(grid.dimensions, points)]
+        for f, i in zip(self.points, points):
+            f.data[:] = i
+        self.data = Function(name=name, dimensions=(grid.time_dim, p),
+                             shape=(nt, len(points[0])))
+
+        # The buffered wavefield at the end of the forward run
+        self.final = None
+
+    @property
+    def arguments(self):
+        """The arguments to be passed to the Operators saving ``self``; those
+        restoring it also need ``self.core``."""
+        arguments = {self.data.name: self.data}
+        arguments.update({i.name: i for i in self.points})
+        return arguments
+
+    def _band(self, u, time):
+        """Index the buffered wavefield ``u`` at the points of the band."""
+        p = self.data.indices[1]
+        return u.indexed[(time,) + tuple(i.indexed[p] for i in self.points)]
+
+    def save(self, u):
+        """
+        Return the equations saving the band of the buffered wavefield ``u``,
+        whose next timestep is given by ``u.forward``.
+        """
+        time, t = self.model.grid.time_dim, u.indices[0]
+        p = self.data.indices[1]
+        return [Eq(self.data.indexed[time + 1, p], self._band(u, t + 1))]
+
+    def restore(self, u):
+        """
+        Return the equations restoring the band of the buffered wavefield
+        ``u``, reconstructed backwards in time into ``u.backward``.
+        """
+        time, t = self.model.grid.time_dim, u.indices[0]
+        p = self.data.indices[1]
+        return [Eq(self._band(u, t - 1), self.data.indexed[time - 1, p])]
+
+    def finalize(self, u):
+        """
+        Keep a copy of the buffered wavefield ``u``, at the end of the forward
+        run, as the initial state of the reconstruction. Outside of the
+        interior of the domain the wavefield is zeroed, as it is not
+        reconstructed.
+        """
+        exterior = np.ones(u.shape[1:], dtype=np.bool)
+        exterior[self.interior] = False
+        self.final = u.data.copy()
+        self.final[:, exterior] = 0.
+
+    def initialize(self, u):
+        """Set the buffered wavefield ``u`` to the initial state of the
+        reconstruction, as kept by :meth:`finalize`."""
+        u.data[:] = self.final
+
+    @property
+    def nbytes(self):
+        """The memory footprint of ``self``, in bytes."""
+        nbytes = self.data.data.nbytes + sum(i.data.nbytes for i in self.points)
+        return nbytes + (self.final.nbytes if self.final is not None else 0)
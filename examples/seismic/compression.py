@@ -0,0 +1,136 @@
+from collections import namedtuple
+
+import numpy as np
+from sympy import Abs, Max, floor
+
+from devito import Eq, Function, TimeFunction
+
+__all__ = ['QuantizedWavefield']
+
+
+class QuantizedWavefield(object):
+
+    """
+    A wavefield saved, as it is computed, in a lossy compressed form: each
+    timestep is quantized to signed ``bits``-bit integers, with a scale per
+    line of grid points along the innermost dimension (the maximum absolute
+    value over the line). The compression and the decompression are evaluated
+    within the generated code; the error introduced on each grid point is at
+    most ``1/(2*(2**(bits-1) - 1))`` times the maximum of its line.
+
+    The scale of the timestep ``time + 1`` is computed right after the
+    wavefield itself, while the timestep ``time`` is quantized. Since these
+    are not covered by the time loop, the first ``time_order`` and the last
+    timesteps are compressed, on the host, by :meth:`initialize` and
+    :meth:`finalize`.
+
+    :param name: Name of the compressed wavefield. The scales are stored in
+                 a :class:`Function` named ``<name>_scale``.
+    :param grid: :class:`Grid` object defining the computational domain.
+    :param nt: Number of timesteps.
+    :param bits: (Optional) Number of bits, 8 or 16, per value. Defaults to 16.
+    :param tolerance: (Optional) Relative error bound; if provided, the
+                      smallest number of bits honouring it is used.
+    :param subsampling: (Optional) Save only every ``subsampling``-th timestep.
+    :param space_order: (Optional) Space order of the compressed wavefield.
+    """
+
+    def __init__(self, name, grid, nt, bits=16, tolerance=None, subsampling=None,
+                 space_order=2):
+        if tolerance is not None:
+            bits = [i for i in (8, 16) if 1./(2*(2**(i-1) - 1)) <= tolerance]
+            if not bits:
+                raise ValueError("Cannot honour a tolerance of %e with 16 bits"
+                                 % tolerance)
+            bits = bits[0]
+        if bits not in (8, 16):
+            raise ValueError("Unsupported number of bits `%s`; expected 8 or 16"
+                             % bits)
+        self.bits = bits
+        self.qmax = 2**(bits - 1) - 1
+        self.nt = nt
+
+        self.data = TimeFunction(name=name, grid=grid, save=True, time_dim=nt,
+                                 subsampling=subsampling, space_order=space_order,
+                                 dtype=np.int8 if bits == 8 else np.int16)
+        self.scale = Function(name='%s_scale' % name,
+                              dimensions=(grid.time_dim,) + grid.dimensions[:-1],
+                              shape=(nt,) + self.data.shape[1:-1])
+        self.scale.data[:] = np.finfo(np.float32).tiny
+
+    @property
+    def subsampling(self):
+        return self.data.subsampling or 1
+
+    @property
+    def arguments(self):
+        """The arguments to be passed to the Operators using ``self``."""
+        return {self.data.name: self.data, self.scale.name: self.scale}
+
+    def _scale(self, time):
+        return self.scale.indexed[(time,) + self.data.grid.dimensions[:-1]]
+
+    def compress(self, u):
+        """
+        Return the equations compressing the buffered wavefield ``u``,
+        whose next timestep is given by ``u.forward``.
+        """
+        time = self.data.grid.time_dim
+        scale = self._scale(time + 1)
+        return [Eq(scale, Max(scale, Abs(u.forward))),
+                Eq(self.data, floor(self.qmax*u/self._scale(time) + 0.5))]
+
+    def decompress(self):
+        """Return the expression evaluating the decompressed wavefield."""
+        time = self.data.grid.time_dim
+        return self.data * self._scale(time) / self.qmax
+
+    def initialize(self, u):
+        """Compress, on the host, the initial timesteps of ``u``."""
+        for i in range(u.time_order):
+            self._compress(i, u.data[i])
+
+    def finalize(self, u):
+        """Compress, on the host, the last timestep of ``u``."""
+        self._compress(self.nt - 1, u.data[(self.nt - 1) % (u.time_order + 1)])
+
+    def _compress(self, time, values):
+        if time % self.subsampling != 0 or \
+                time // self.subsampling >= self.data.shape[0]:
+            return
+        scale = np.maximum(np.abs(values).max(axis=-1), self.scale.data[time])
+        self.scale.data[time] = scale
+        quantized = np.floor(self.qmax*values/scale[..., None] + 0.5)
+        self.data.data[time // self.subsampling] = quantized
+
+    @property
+    def decompressed(self):
+        """The decompressed wavefield, as a :class:`numpy.ndarray`."""
+        times = np.arange(self.data.shape[0]) * self.subsampling
+        return self.data.data * self.scale.data[times][..., None] / self.qmax
+
+    @property
+    def ratio(self):
+        """The compression ratio, with respect to a float32 saved wavefield."""
+        size = np.prod(self.data.shape)
+        nbytes = size*self.data.dtype().itemsize + self.scale.data.nbytes
+        return 4.*size / nbytes
+
+    @property
+    def error(self):
+        """The bound on the absolute error of the decompressed wavefield."""
+        return float(self.scale.data.max()) / (2*self.qmax)
+
+    def report(self, elapsed):
+        """
+        Summarize the compression of a run lasting ``elapsed`` seconds; the
+        throughput is the amount of (uncompressed) wavefield data produced
+        per second, in GB/s.
+        """
+        nbytes = 4.*np.prod(self.data.shape)
+        return CompressionSummary(self.bits, self.ratio, self.error,
+                                  nbytes/elapsed/10**9)
+
+
+CompressionSummary = namedtuple('CompressionSummary', 'bits ratio error throughput')
+"""The outcome of the compression of a :class:`QuantizedWavefield`."""
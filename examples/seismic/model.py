@@ -312,14 +312,14 @@ class Model(object):
         self.grid = Grid(extent=extent, shape=shape_pml,
                          origin=origin, dtype=dtype)
 
-        # Create square slowness of the wave as symbol `m`
+        # Create square slowness of the wave as symbol `m`; its initial
+        # values are adopted, where possible, rather than copied
         if isinstance(vp, np.ndarray):
             self.m = Function(name="m", grid=self.grid)
+            self.m.adopt(self.pad(1 / (vp * vp)))
         else:
             self.m = Constant(name="m", value=1/vp**2)
-
-        # Set model velocity, which will also set `m`
-        self.vp = vp
+        self._vp = vp
 
         # Create dampening field as symbol `damp`
         self.damp = Function(name="damp", grid=self.grid)
@@ -331,7 +331,7 @@ class Model(object):
         if epsilon is not None:
             if isinstance(epsilon, np.ndarray):
                 self.epsilon = Function(name="epsilon", grid=self.grid)
-                self.epsilon.data[:] = self.pad(1 + 2 * epsilon)
+                self.epsilon.adopt(self.pad(1 + 2 * epsilon))
                 # Maximum velocity is scale*max(vp) if epsilon > 0
                 if np.max(self.epsilon.data) > 0:
                     self.scale = np.sqrt(np.max(self.epsilon.data))
@@ -344,7 +344,7 @@ class Model(object):
         if delta is not None:
             if isinstance(delta, np.ndarray):
                 self.delta = Function(name="delta", grid=self.grid)
-                self.delta.data[:] = self.pad(np.sqrt(1 + 2 * delta))
+                self.delta.adopt(self.pad(np.sqrt(1 + 2 * delta)))
             else:
                 self.delta = delta
         else:
@@ -353,7 +353,7 @@ class Model(object):
         if theta is not None:
             if isinstance(theta, np.ndarray):
                 self.theta = Function(name="theta", grid=self.grid)
-                self.theta.data[:] = self.pad(theta)
+                self.theta.adopt(self.pad(theta))
             else:
                 self.theta = theta
         else:
@@ -362,7 +362,7 @@ class Model(object):
         if phi is not None:
             if isinstance(phi, np.ndarray):
                 self.phi = Function(name="phi", grid=self.grid)
-                self.phi.data[:] = self.pad(phi)
+                self.phi.adopt(self.pad(phi))
             else:
                 self.phi = phi
         else:
@@ -0,0 +1,233 @@
+import mmap
+import multiprocessing
+import os
+import tempfile
+import weakref
+
+import numpy as np
+
+from devito import Function
+from devito.memory import SIMD_ALIGNMENT
+from examples.seismic.source import Receiver
+
+__all__ = ['SharedArray', 'ShotRunner', 'share']
+
+
+class SharedArray(object):
+
+    """
+    A :class:`numpy.ndarray` in POSIX shared memory, that is a file in
+    ``/dev/shm`` mapped with ``MAP_SHARED``.
+
+    Other processes map the same memory by name; in particular, a SharedArray
+    is pickled as its name, shape and dtype, so that sending it to a worker
+    process costs a few bytes and unpickling it maps the memory zero-copy.
+    The shared memory is unlinked once the creating SharedArray is garbage
+    collected; mappings in other processes remain valid until released.
+
+    :param shape: Shape of the array.
+    :param dtype: (Optional) Data type of the array. Defaults to np.float32.
+    :param name: (Optional) Name of an existing shared memory segment to map.
+                 If not provided, a new zero-initialized segment is created.
+    :param aligned: (Optional) If True, each entry along the leading axis
+                    starts at an address aligned to ``SIMD_ALIGNMENT`` bytes,
+                    so that it may be adopted as the data of a :class:`Function`.
+                    Defaults to False.
+    """
+
+    def __init__(self, shape, dtype=np.float32, name=None, aligned=False):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.aligned = aligned
+        strides = np.empty((0,) + self.shape[1:], self.dtype).strides
+        if aligned and self.shape:
+            entry = int(np.prod(self.shape[1:])) * self.dtype.itemsize
+            strides = (-(-entry // SIMD_ALIGNMENT) * SIMD_ALIGNMENT,) + strides[1:]
+        nbytes = max(self.shape[0] * strides[0] if self.shape else
+                     self.dtype.itemsize, 1)
+
+        if name is None:
+            folder = '/dev/shm' if os.path.isdir('/dev/shm') else None
+            fd, name = tempfile.mkstemp(prefix='devito-', dir=folder)
+            os.ftruncate(fd, nbytes)
+            self._finalizer = weakref.finalize(self, os.unlink, name)
+        else:
+            fd = os.open(name, os.O_RDWR)
+            self._finalizer = None
+        try:
+            self._mmap = mmap.mmap(fd, nbytes, flags=mmap.MAP_SHARED)
+        finally:
+            os.close(fd)
+        self.name = name
+
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._mmap,
+                                strides=strides)
+
+    def __reduce__(self):
+        return (SharedArray, (self.shape, self.dtype, self.name, self.aligned))
+
+
+def share(function):
+    """
+    Move the data of ``function`` to shared memory, preserving its values.
+    Processes forked afterwards see, and may update, the same data.
+
+    :param function: A :class:`Function`.
+
+    :returns: The :class:`SharedArray` now backing ``function.data``.
+    """
+    shared = SharedArray(function.shape_allocated, function.dtype)
+    shared.array[..., :function.shape[-1]] = function.data
+    function.adopt(shared.array, copy=False)
+    # The segment must outlive the data object it backs
+    function._shared = shared
+    return shared
+
+
+class ShotRunner(object):
+
+    """
+    Run the shots of a seismic survey in parallel over a pool of worker
+    processes, each executing an entire shot with the Operators of ``solver``.
+
+    The model parameters (``m``, ``damp`` and, for anisotropic models,
+    ``epsilon``, ``delta``, ``theta`` and ``phi``) are moved to shared memory,
+    so that the workers access them without copies; updating them in the
+    parent process (e.g., ``model.m.data[:] = ...``) is visible to the workers.
+    The receiver gathers and the gradients are written by the workers straight
+    into shared buffers, one entry per shot, so that a shot's output does not
+    depend on which worker ran it. The only per-shot message is the shot index
+    and the source coordinates.
+
+    Each worker JIT-compiles (or, more commonly, loads from the JIT cache) an
+    Operator the first time it needs it, and re-uses it for all subsequent
+    shots. The workers are forked lazily at the first run, so Operators already
+    built in the parent are inherited as they are.
+
+    :param solver: An :class:`AcousticWaveSolver` or :class:`AnisotropicWaveSolver`.
+    :param nworkers: (Optional) Number of worker processes. Defaults to the
+                     number of CPUs. To avoid oversubscription, each worker
+                     should typically run with ``OMP_NUM_THREADS`` set to the
+                     number of cores it is supposed to use.
+    """
+
+    parameters = ('m', 'damp', 'epsilon', 'delta', 'theta', 'phi')
+
+    def __init__(self, solver, nworkers=None):
+        self.solver = solver
+        self.nworkers = nworkers or multiprocessing.cpu_count()
+
+        for i in self.parameters:
+            function = getattr(solver.model, i, None)
+            if isinstance(function, Function):
+                share(function)
+
+        self._pool = None
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            context = multiprocessing.get_context('fork')
+            self._pool = context.Pool(self.nworkers, initializer=_init_worker,
+                                      initargs=(self.solver,))
+        return self._pool
+
+    def close(self):
+        """Terminate the worker processes."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __del__(self):
+        self.close()
+
+    def forward(self, sources, **kwargs):
+        """
+        Forward model one shot per source location.
+
+        :param sources: Array of shape ``(nshots, ndim)`` with the physical
+                        coordinates of the source of each shot.
+        :param kwargs: Additional arguments for the solver's forward method.
+
+        :returns: The receiver gathers, as an array of shape
+                  ``(nshots, nt, nrec)``.
+        """
+        sources = np.asarray(sources, dtype=np.float32)
+        rec = self.solver.receiver
+        gathers = SharedArray((len(sources),) + rec.shape, rec.dtype, aligned=True)
+        tasks = [(i, j, gathers, kwargs) for i, j in enumerate(sources)]
+        self.pool.map(_forward, tasks, chunksize=1)
+        return gathers.array.copy()
+
+    def gradient(self, sources, observed, **kwargs):
+        """
+        Compute the FWI objective function and its gradient with respect
+        to the squared slowness, summed over the shots.
+
+        :param sources: Array of shape ``(nshots, ndim)`` with the physical
+                        coordinates of the source of each shot.
+        :param observed: Array of shape ``(nshots, nt, nrec)`` with the
+                         observed receiver gathers.
+
+        :returns: The objective function value and the gradient, as a
+                  :class:`numpy.ndarray` with the shape of ``model.m``.
+        """
+        if not hasattr(self.solver, 'gradient'):
+            raise ValueError("Solver `%s` has no gradient operator" %
+                             type(self.solver).__name__)
+        sources = np.asarray(sources, dtype=np.float32)
+        m = self.solver.model.m
+        data = SharedArray(np.shape(observed), np.float32)
+        data.array[:] = observed
+        grads = SharedArray((len(sources),) + m.shape_allocated, m.dtype,
+                            aligned=True)
+        tasks = [(i, j, data, grads, kwargs) for i, j in enumerate(sources)]
+        fval = sum(self.pool.map(_gradient, tasks, chunksize=1))
+        return fval, grads.array[..., :m.shape[-1]].sum(axis=0)
+
+
+# Worker-side state and tasks
+
+_worker = {}
+
+
+def _init_worker(solver):
+    _worker['solver'] = solver
+
+
+def _shot(coordinates, gather=None):
+    """Set up the source and the receiver of a shot, in the worker; the
+    receiver writes into ``gather``, if provided, or into its own data."""
+    solver = _worker['solver']
+    # The worker's own copy of the source, so it can be updated in place
+    src = solver.source
+    src.coordinates.data[:] = coordinates
+    rec = Receiver(name='rec', grid=solver.model.grid, ntime=solver.receiver.nt,
+                   coordinates=solver.receiver.coordinates.data)
+    if gather is not None:
+        rec.adopt(gather, copy=False)
+    return src, rec
+
+
+def _forward(task):
+    index, coordinates, gathers, kwargs = task
+    src, rec = _shot(coordinates, gathers.array[index])
+    _worker['solver'].forward(src=src, rec=rec, **kwargs)
+
+
+def _gradient(task):
+    index, coordinates, data, grads, kwargs = task
+    solver = _worker['solver']
+
+    # The residual overwrites the modelled data, in the worker's own buffer
+    src, rec = _shot(coordinates)
+    _, u, _ = solver.forward(src=src, rec=rec, save=True, **kwargs)
+    rec.data[:] -= data.array[index]
+
+    # The shot's own slot of the shared gradients, summed up in the parent
+    grad = Function(name='grad', grid=solver.model.grid)
+    grad.adopt(grads.array[index], copy=False)
+    solver.gradient(rec, u, grad=grad, **kwargs)
+
+    return .5*np.linalg.norm(rec.data)**2
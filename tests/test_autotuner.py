@@ -15,7 +15,7 @@ import numpy as np
 
 from devito import Grid, Function, TimeFunction, Eq, Operator, configuration
 from devito.logger import logger, logging, set_log_level
-from devito.core.autotuning import options
+from devito.core.autotuning import options, squeeze
 
 
 @skipif_yask
@@ -116,3 +116,104 @@ def test_timesteps_per_at_run():
     buffer.flush()
     buffer.close()
     set_log_level('INFO')
+
+
+@skipif_yask
+def test_flags_autotuning(monkeypatch, tmpdir):
+    """
+    Check that the compiler flags are auto-tuned when switched on, and that
+    the choice, unless within noise, is retrieved from the persistent JIT
+    cache afterwards.
+    """
+    buffer = StringIO()
+    temporary_handler = logging.StreamHandler(buffer)
+    logger.addHandler(temporary_handler)
+    set_log_level('DEBUG')
+
+    compiler = type(configuration['compiler'])
+    monkeypatch.setattr(compiler, 'tuning_flags', [(), ('-funroll-loops',)])
+    jit_cache_dir = configuration['jit_cache_dir']
+    configuration['jit_cache_dir'] = str(tmpdir)
+    configuration.core['flagtuning'] = True
+
+    grid = Grid(shape=(30, 30))
+    infield = Function(name='infield', grid=grid)
+    infield.data[:] = 1.
+    outfield = Function(name='outfield', grid=grid)
+    stencil = Eq(outfield, outfield + infield*3.0)
+
+    try:
+        # Variants within noise are tuned again
+        monkeypatch.setitem(options, 'at_flags_noise', float('inf'))
+        op = Operator(stencil)
+        op(infield=infield, outfield=outfield)
+        out = buffer.getvalue().split('\n')
+        assert any('not cached' in i for i in out)
+        assert np.all(outfield.data == 3.)
+        outfield.data[:] = 0.
+        buffer.truncate(0)
+
+        monkeypatch.setitem(options, 'at_flags_noise', 0.)
+        op = Operator(stencil)
+        op(infield=infield, outfield=outfield)
+        out = [i for i in buffer.getvalue().split('\n') if 'AutoTuner:' in i]
+        assert len(out) == 2
+        assert np.all(outfield.data == 3.)
+        buffer.truncate(0)
+
+        # The flags chosen for an identical Operator are retrieved from the cache
+        op = Operator(stencil)
+        op(infield=infield, outfield=outfield)
+        out = buffer.getvalue().split('\n')
+        assert not any('AutoTuner:' in i for i in out)
+
+        # The auto-tuning runs have their own timers, not the caller's ones
+        arguments = op.arguments(infield=infield, outfield=outfield)[0]
+        arguments[op.profiler.varname] = op.profiler.setup()
+        at_arguments, _ = squeeze(op, arguments)
+        assert at_arguments[op.profiler.varname] is not arguments[op.profiler.varname]
+        assert any('compiler flags (from cache)' in i for i in out)
+        assert np.all(outfield.data == 6.)
+    finally:
+        configuration.core['flagtuning'] = False
+        configuration['jit_cache_dir'] = jit_cache_dir
+        logger.removeHandler(temporary_handler)
+        set_log_level('INFO')
+
+
+@skipif_yask
+def test_pgo(tmpdir):
+    """
+    Check that Operators are recompiled through profile-guided optimization
+    when switched on, and that the optimized code computes the same results.
+    """
+    buffer = StringIO()
+    temporary_handler = logging.StreamHandler(buffer)
+    logger.addHandler(temporary_handler)
+    set_log_level('DEBUG')
+
+    jit_cache_dir = configuration['jit_cache_dir']
+    configuration['jit_cache_dir'] = str(tmpdir)
+    configuration.core['pgo'] = True
+
+    grid = Grid(shape=(30, 30))
+    u = TimeFunction(name='u', grid=grid)
+    v = TimeFunction(name='v', grid=grid)
+    u.data[:] = 1.
+    v.data[:] = 1.
+
+    try:
+        op = Operator(Eq(u.forward, u + 1.))
+        op(time=10)
+        out = [i for i in buffer.getvalue().split('\n') if 'AutoTuner:' in i]
+        assert len(out) == 1
+        assert 'Instrumented code' in out[0]
+
+        configuration.core['pgo'] = False
+        Operator(Eq(v.forward, v + 1.))(time=10)
+        assert np.all(u.data == v.data)
+    finally:
+        configuration.core['pgo'] = False
+        configuration['jit_cache_dir'] = jit_cache_dir
+        logger.removeHandler(temporary_handler)
+        set_log_level('INFO')
@@ -0,0 +1,291 @@
+from __future__ import absolute_import
+
+import os
+
+import numpy as np
+import pytest
+from conftest import skipif_yask
+
+import devito.operator
+from devito import (Grid, Function, TimeFunction, Eq, Operator, compile_all,
+                    configuration, load_operator)
+from devito.compiler import JITCache, get_jit_cache
+from devito.exceptions import InvalidOperator
+
+
+@pytest.fixture
+def jit_cache(tmpdir):
+    """Redirect the persistent JIT cache to a fresh directory."""
+    keys = ['jit_cache_dir', 'jit_cache_size', 'operator_cache']
+    previous = [configuration[i] for i in keys]
+    configuration['jit_cache_dir'] = str(tmpdir)
+    configuration['operator_cache'] = False
+    yield get_jit_cache()
+    for k, v in zip(keys, previous):
+        configuration[k] = v
+
+
+@pytest.fixture
+def operator_cache(jit_cache):
+    """Enable the persistent Operator cache."""
+    configuration['operator_cache'] = True
+    return jit_cache
+
+
+def build(value):
+    grid = Grid(shape=(4, 4))
+    f = Function(name='f', grid=grid)
+    return Operator(Eq(f, f + value))
+
+
+@skipif_yask
+def test_jit_cache_hit(jit_cache):
+    """Test that Operators generating the same code are compiled only once."""
+    op0 = build(1.)
+    op0.apply()
+    assert jit_cache.misses == 1
+    assert jit_cache.hits == 0
+
+    op1 = build(1.)
+    op1.apply()
+    assert jit_cache.misses == 1
+    assert jit_cache.hits == 1
+    assert op0.compile == op1.compile
+
+    op2 = build(2.)
+    op2.apply()
+    assert jit_cache.misses == 2
+    assert jit_cache.hits == 1
+
+
+@skipif_yask
+def test_jit_cache_eviction(jit_cache):
+    """Test that the least recently used entries get evicted once the
+    maximum cache size is exceeded."""
+    build(1.).compile
+    size = jit_cache.size
+    configuration['jit_cache_size'] = size
+
+    build(2.).compile
+    assert jit_cache.evictions == 1
+    assert jit_cache.size <= size
+
+    # The evicted entry must be recompiled
+    build(1.).compile
+    assert jit_cache.misses == 3
+    assert jit_cache.evictions == 2
+
+
+def test_jit_cache_eviction_locked(tmpdir):
+    """Test that locked entries, as well as lock files and files being written,
+    are never evicted."""
+    cache = JITCache(str(tmpdir))
+    for i, key in enumerate(['a', 'b']):
+        cache.write(key, 'so', b'x'*100)
+        os.utime(str(tmpdir.join('%s.so' % key)), (i, i))
+    tmpdir.join('c.so.123.tmp').write('x'*100)
+    cache.capacity = 150
+
+    with cache.lock('a'):
+        cache.evict()
+        assert tmpdir.join('a.so').check()
+        assert cache.evictions == 0
+    cache.evict()
+    assert not tmpdir.join('a.so').check()
+    assert cache.evictions == 1
+    assert tmpdir.join('a.lock').check() and tmpdir.join('c.so.123.tmp').check()
+    assert [k for k, _ in cache.entries] == ['b']
+
+
+def test_jit_cache_private(tmpdir):
+    """Test that the JIT cache is created private to the current user, while
+    a directory others may write to is replaced by a temporary one."""
+    directory = tmpdir.join('private')
+    cache = JITCache(str(directory))
+    assert cache.directory == str(directory)
+    assert directory.stat().mode & 0o777 == 0o700
+
+    shared = tmpdir.mkdir('shared')
+    shared.chmod(0o777)
+    cache = JITCache(str(shared))
+    assert cache.directory != str(shared)
+    assert os.stat(cache.directory).st_mode & 0o777 == 0o700
+
+
+@skipif_yask
+def test_compile_async(jit_cache):
+    """Test that Operators are compiled in the background when requested."""
+    configuration['jit_async'] = True
+    try:
+        op = build(1.)
+    finally:
+        configuration['jit_async'] = False
+    assert op._compilation is not None
+
+    op.apply()
+    assert op._compilation.done()
+    assert op.compile == op._compilation.result()
+    assert jit_cache.misses == 1
+
+
+@skipif_yask
+def test_compile_all(jit_cache):
+    """Test concurrent compilation of multiple Operators."""
+    ops = [build(float(i)) for i in range(4)]
+    filenames = compile_all(ops)
+    assert len(set(filenames)) == 4
+    assert jit_cache.misses == 4
+    assert [op.compile for op in ops] == filenames
+
+
+@skipif_yask
+def test_jit_split(jit_cache):
+    """Test that elemental functions are compiled as separate translation
+    units, and that the unchanged units are reused across Operators."""
+    def run(value, split):
+        grid = Grid(shape=(16, 16, 16))
+        f = Function(name='f', grid=grid)
+        configuration['jit_split'] = split
+        try:
+            op = Operator(Eq(f, f + value),
+                          dle=('blocking', 'split', {'blockalways': True}))
+            op.apply()
+        finally:
+            configuration['jit_split'] = False
+        return op, f.data.copy()
+
+    op0, f0 = run(1., False)
+    assert jit_cache.misses == 1
+
+    op1, f1 = run(1., True)
+    assert len(op1.ccode_units) == 2
+    assert jit_cache.misses == 4
+    assert np.all(f0 == f1)
+
+    # Only the elemental function has changed
+    run(2., True)
+    assert jit_cache.misses == 6
+
+
+@skipif_yask
+@pytest.mark.parametrize('dse,dle', [
+    ('noop', 'noop'),
+    ('aggressive', 'advanced'),
+    ('advanced', ('blocking', 'openmp', {'blockinner': True}))
+])
+def test_operator_cache(operator_cache, monkeypatch, dse, dle):
+    """Test that an Operator retrieved from the persistent Operator cache
+    is identical to the one produced by the lowering pipeline."""
+    def run():
+        grid = Grid(shape=(12, 12, 12))
+        u = TimeFunction(name='u', grid=grid, space_order=4)
+        m = Function(name='m', grid=grid)
+        m.data[:] = 2.
+        u.data[:, 6, 6, 6] = 1.
+        op = Operator(Eq(u.forward, 2*u - u.backward + u.laplace / m),
+                      dse=dse, dle=dle)
+        op.apply(time=4)
+        return op, u.data[0].copy()
+
+    op0, u0 = run()
+    assert len([k for k, files in operator_cache.entries
+                if any(i.endswith('.op') for i in files)]) == 1
+
+    # The lowering pipeline must be skipped altogether, regardless of the
+    # configuration parameters not affecting it
+    def lower(*args, **kwargs):
+        raise AssertionError("Operator wasn't retrieved from the cache")
+    monkeypatch.setattr(devito.operator.Operator, '_lower', lower)
+    monkeypatch.setitem(configuration, 'log_level', 'WARNING')
+
+    op1, u1 = run()
+    assert str(op0.ccode) == str(op1.ccode)
+    assert op0.dle_flags == op1.dle_flags
+    assert [i.name for i in op0.parameters] == [i.name for i in op1.parameters]
+    assert np.all(u0 == u1)
+
+
+@skipif_yask
+def test_operator_bundle(jit_cache, monkeypatch, tmpdir):
+    """Test that an exported Operator can be loaded and run without going
+    through the symbolic lowering and the JIT compilation."""
+    def setup():
+        grid = Grid(shape=(12, 12, 12))
+        u = TimeFunction(name='u', grid=grid, space_order=4)
+        m = Function(name='m', grid=grid)
+        m.data[:] = 2.
+        u.data[:, 6, 6, 6] = 1.
+        return u, m
+
+    u, m = setup()
+    op0 = Operator(Eq(u.forward, 2*u - u.backward + u.laplace / m),
+                   dle=('blocking', 'openmp'))
+    op0.apply(time=4)
+    filename = str(tmpdir.join('op.bundle'))
+    op0.export(filename)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Operator wasn't loaded from the bundle")
+    monkeypatch.setattr(devito.operator.Operator, '_lower', fail)
+    monkeypatch.setattr(devito.operator, 'jit_compile', fail)
+
+    v, n = setup()
+    op1 = load_operator(filename, [v, n])
+    op1.apply(time=4)
+    assert str(op0.ccode) == str(op1.ccode)
+    assert np.all(u.data == v.data)
+
+    # Bundles can't be loaded on a different target
+    target = dict(devito.operator.host_target(), isa='knc')
+    monkeypatch.setattr(devito.operator, 'host_target', lambda: target)
+    with pytest.raises(InvalidOperator):
+        load_operator(filename, [v, n])
+
+
+@pytest.fixture
+def operator_registry(jit_cache):
+    """Enable the in-memory Operator registry."""
+    configuration['operator_registry'] = 2
+    registry = devito.operator.get_operator_registry()
+    registry.clear()
+    yield registry
+    registry.clear()
+    configuration['operator_registry'] = 0
+
+
+@skipif_yask
+def test_operator_registry(operator_registry, monkeypatch):
+    """Test that building an Operator equivalent to a registered one skips the
+    lowering and shares the JIT-compiled code, but not the data objects."""
+    def run(value):
+        grid = Grid(shape=(4, 4))
+        f = Function(name='f', grid=grid)
+        op = Operator(Eq(f, f + value))
+        op.apply()
+        return op, f
+
+    op0, f0 = run(1.)
+    assert len(operator_registry) == 1
+
+    lower = devito.operator.Operator._lower
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Operator wasn't retrieved from the registry")
+    monkeypatch.setattr(devito.operator.Operator, '_lower', fail)
+
+    op1, f1 = run(1.)
+    assert op1._lib is op0._lib
+    assert np.all(f0.data == 1.) and np.all(f1.data == 1.)
+    assert operator_registry.hits == 1
+
+    # Bounded size, evicting the least recently used entries
+    monkeypatch.setattr(devito.operator.Operator, '_lower', lower)
+    run(2.)
+    run(3.)
+    assert len(operator_registry) == 2
+    operator_registry.evict()
+    assert len(operator_registry) == 1
+    monkeypatch.setattr(devito.operator.Operator, '_lower', fail)
+    op3, _ = run(3.)
+    operator_registry.evict(op3)
+    assert len(operator_registry) == 0
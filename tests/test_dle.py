@@ -411,6 +411,9 @@ def test_cache_blocking_edge_cases_highorder(shape, blockshape):
     # outermost sequential, innermost parallel w/ mixed dimensions
     (['Eq(fc[x+1,y], fc[x,y+1] + fc[x,y])', 'Eq(fc[x+1,y], 2. + fc[x,y+1])'],
      (False, True)),
+    # outermost reduction
+    (['Eq(fa[y], fa[y] + fc[x,y])'],
+     (False, False)),
 ])
 def test_loops_ompized(fa, fb, fc, fd, t0, t1, t2, t3, exprs, expected, iters):
     scope = [fa, fb, fc, fd, t0, t1, t2, t3]
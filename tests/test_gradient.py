@@ -134,3 +134,111 @@ def test_gradientJ(shape, time_order, space_order):
 
 if __name__ == "__main__":
     test_gradientJ(shape=(60, 70), time_order=2, space_order=4)
+
+
+@skipif_yask
+@pytest.mark.parametrize('subsampling', [2, 4])
+@pytest.mark.parametrize('shape', [(70, 80)])
+def test_gradient_subsampled(shape, subsampling):
+    """
+    This test ensures that the FWI gradient computed from a forward wavefield
+    saved only every few time steps matches the one computed from the entire
+    forward wavefield.
+    """
+    wave = setup(shape=shape, spacing=(15., 15.), time_order=2, space_order=4,
+                 nbpml=12)
+    m0 = smooth10(wave.model.m.data, wave.model.shape_domain)
+
+    rec, _, _ = wave.forward()
+    rec0, u0, _ = wave.forward(m=m0, save=True)
+    residual = Receiver(name='rec', grid=wave.model.grid,
+                        data=rec0.data - rec.data,
+                        coordinates=rec0.coordinates.data)
+    reference, _ = wave.gradient(residual, u0, m=m0)
+
+    _, usave, _ = wave.forward(m=m0, save=True, subsampling=subsampling)
+    assert usave.shape[0] == (wave.source.nt - 2) // subsampling + 1
+    assert np.allclose(usave.data, u0.data[:-1:subsampling])
+    gradient, _ = wave.gradient(residual, usave, m=m0)
+
+    error = linalg.norm(gradient.data - reference.data)/linalg.norm(reference.data)
+    info('Relative error of the subsampled gradient: %f' % error)
+    assert error < 0.01
+
+
+@skipif_yask
+@pytest.mark.parametrize('space_order', [4, 8])
+@pytest.mark.parametrize('shape', [(70, 80)])
+def test_gradient_boundary(shape, space_order):
+    """
+    This test ensures that the FWI gradient computed from a forward wavefield
+    saved only along the absorbing layer, and reconstructed backwards in time,
+    matches the one computed from the entire forward wavefield.
+    """
+    nbpml = 12
+    wave = setup(shape=shape, spacing=(15., 15.), time_order=2,
+                 space_order=space_order, nbpml=nbpml)
+    m0 = smooth10(wave.model.m.data, wave.model.shape_domain)
+    interior = (slice(nbpml, -nbpml), slice(nbpml, -nbpml))
+
+    rec, _, _ = wave.forward()
+    rec0, u0, _ = wave.forward(m=m0, save=True)
+    residual = Receiver(name='rec', grid=wave.model.grid,
+                        data=rec0.data - rec.data,
+                        coordinates=rec0.coordinates.data)
+    reference, _ = wave.gradient(residual, u0, m=m0)
+
+    rec1, ubnd, _ = wave.forward(m=m0, save=True, boundary=True)
+    assert np.all(rec1.data == rec0.data)
+    assert ubnd.nbytes < u0.data.nbytes / 5
+
+    # The reconstruction goes back to the initial state
+    u, _ = wave.reconstruct(ubnd, m=m0)
+    assert np.allclose(u.data[(slice(None),) + interior],
+                       u0.data[(slice(0, 3),) + interior], atol=1e-3*abs(u0.data).max())
+
+    # The gradient is only computed in the interior of the domain
+    gradient, _ = wave.gradient(residual, ubnd, m=m0)
+    assert np.all(gradient.data[:nbpml] == 0) and np.all(gradient.data[-nbpml:] == 0)
+    error = linalg.norm(gradient.data[interior] - reference.data[interior])
+    error /= linalg.norm(reference.data[interior])
+    info('Relative error of the boundary-saved gradient: %f' % error)
+    assert error < 1e-5
+
+
+@skipif_yask
+@pytest.mark.parametrize('bits, subsampling, tolerance', [
+    (16, None, 1e-4), (8, None, 1e-2), (8, 2, 1e-2)])
+@pytest.mark.parametrize('shape', [(70, 80)])
+def test_gradient_compressed(shape, bits, subsampling, tolerance):
+    """
+    This test ensures that the FWI gradient computed from a forward wavefield
+    saved in compressed form matches the one computed from the entire forward
+    wavefield, and that the decompressed wavefield honours the error bound.
+    """
+    wave = setup(shape=shape, spacing=(15., 15.), time_order=2, space_order=4,
+                 nbpml=12)
+    m0 = smooth10(wave.model.m.data, wave.model.shape_domain)
+
+    rec, _, _ = wave.forward()
+    rec0, u0, _ = wave.forward(m=m0, save=True)
+    residual = Receiver(name='rec', grid=wave.model.grid,
+                        data=rec0.data - rec.data,
+                        coordinates=rec0.coordinates.data)
+    reference, _ = wave.gradient(residual, u0, m=m0)
+
+    rec1, usave, _ = wave.forward(m=m0, save=True, subsampling=subsampling,
+                                  compression=bits)
+    assert np.allclose(rec1.data, rec0.data)
+    assert usave.bits == bits and usave.ratio > 32./bits * .9
+
+    # Every saved time step is within the error bound, barring the domain edges
+    # not updated by the stencil
+    saved = u0.data[::subsampling or 1][:usave.data.shape[0]]
+    error = abs(usave.decompressed - saved)[:, 2:-2, 2:-2]
+    assert error.max() <= usave.error * (1 + 1e-5)
+
+    gradient, _ = wave.gradient(residual, usave, m=m0)
+    error = linalg.norm(gradient.data - reference.data)/linalg.norm(reference.data)
+    info('Relative error of the compressed gradient: %f' % error)
+    assert error < tolerance
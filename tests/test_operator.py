@@ -1,17 +1,23 @@
 from __future__ import absolute_import
 
+import json
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from conftest import EVAL, dims, time, x, y, z, skipif_yask
 
 import numpy as np
 import pytest
 
+import devito.memory
+import devito.operator
 from devito import (clear_cache, Grid, Eq, Operator, Constant, Function,
                     TimeFunction, SparseFunction, Dimension, configuration)
 from devito.foreign import Operator as OperatorForeign
 from devito.dle import retrieve_iteration_tree
-from devito.ir.iet import IsPerfectIteration
+from devito.ir.iet import CGenBatch, IsPerfectIteration
+from devito.profiling import BuildProfile, track_pass
+from devito.exceptions import InvalidOperator
 
 
 def dimify(dimensions):
@@ -57,6 +63,177 @@ class TestAPI(object):
         assert op.parameters[5].is_PtrArgument
         assert 'a_dense[i] = 2.0F*constant + a_dense[i]' in str(op.ccode)
 
+    def test_build_profile(self, tmpdir):
+        """
+        Tests that the time spent in each phase of the construction of an
+        Operator, as well as in each DSE and DLE pass, is tracked and emitted.
+        """
+        filename = str(tmpdir.join('build.json'))
+        configuration['build_profile'] = filename
+        try:
+            grid = Grid(shape=(4, 4, 4))
+            u = TimeFunction(name='u', grid=grid, space_order=2)
+            op = Operator(Eq(u.forward, u.laplace), dse='advanced', dle='advanced')
+            op.apply(time=2)
+        finally:
+            configuration['build_profile'] = None
+
+        profile = op.build_profile
+        for i in ['clusterize', 'dse', 'dle', 'codegen', 'jit_compile']:
+            assert i in profile.phases
+        assert any(i.startswith('dse.') for i in profile)
+        assert any(i.startswith('dle.') for i in profile)
+        assert all(v.time >= 0. and v.memory >= 0. for v in profile.values())
+
+        with open(filename) as f:
+            lines = f.readlines()
+        assert len(lines) == 1
+        data = json.loads(lines[0])
+        assert data['name'] == op.name
+        assert list(data['phases']) == list(profile)
+
+        # Memory is only traced if the profile is emitted
+        op = Operator(Eq(u.forward, u.laplace))
+        assert all(v.memory is None for v in op.build_profile.values())
+
+    def test_build_profile_memory(self, tmpdir):
+        """
+        Tests that the memory of each phase, and pass, of a build profile is the
+        peak allocated within it, rather than throughout the process lifetime.
+        """
+        configuration['build_profile'] = str(tmpdir.join('build.json'))
+        try:
+            profile = BuildProfile('test')
+            with profile.phase('a'):
+                a = np.ones(10**6)
+                with track_pass('a.b'):
+                    b = np.ones(2*10**6)
+                    del b
+                del a
+            with profile.phase('c'):
+                pass
+        finally:
+            configuration['build_profile'] = None
+        assert 15. < profile['a.b'].memory < 16.
+        assert 22.5 < profile['a'].memory < 23.5
+        assert profile['c'].memory < 1.
+
+    def test_apply_batch(self):
+        """
+        Tests that a batch of argument sets run through the JIT-compiled batch
+        driver gives the same results as the corresponding sequence of applies,
+        with the shared wavefields zeroed in between any two invocations.
+        """
+        grid = Grid(shape=(6, 6))
+        u = TimeFunction(name='u', grid=grid)
+        sources = [Function(name='a', grid=grid) for _ in range(3)]
+        outputs = [Function(name='s', grid=grid) for _ in range(3)]
+        for i, a in enumerate(sources):
+            a.data[:] = i + 1.
+        op = Operator([Eq(u.forward, u + sources[0]),
+                       Eq(outputs[0], outputs[0] + u.forward)])
+
+        expected = []
+        for a, s in zip(sources, outputs):
+            u.data[:] = 0.
+            op.apply(a=a, s=s, time=3)
+            expected.append(s.data.copy())
+            s.data[:] = 0.
+        expected.append(u.data.copy())
+
+        u.data[:] = 0.
+        summaries = op.apply_batch([dict(a=a, s=s, time=3)
+                                    for a, s in zip(sources, outputs)])
+        assert len(summaries) == 3
+        assert all(i['main'].time > 0 for i in summaries)
+        for s, v in zip(outputs, expected):
+            assert np.all(s.data == v)
+        assert np.all(u.data == expected[3])
+
+        # The driver invokes the kernel used by apply, rather than a copy of it
+        assert op.name + '_batch' in str(CGenBatch().visit(op))
+        assert str(op.body[0].ccode) not in str(CGenBatch().visit(op))
+
+        # Out-of-core data can't be staged by the driver
+        v = TimeFunction(name='v', grid=grid, save=True, time_dim=4, out_of_core=True)
+        with pytest.raises(InvalidOperator):
+            Operator(Eq(v.forward, v + 1.)).apply_batch([dict(time=2)])
+
+    def test_apply_async(self):
+        """
+        Tests that kernels launched in the background, in submission order,
+        give the same results as the corresponding sequence of applies.
+        """
+        grid = Grid(shape=(6, 6))
+        u = TimeFunction(name='u', grid=grid)
+        v = TimeFunction(name='v', grid=grid)
+        c = Constant(name='c', value=1.)
+        op = Operator(Eq(u.forward, u + c))
+
+        futures = [op.apply_async(time=4), op.apply_async(u=v, time=4, c=2.),
+                   op.apply_async(u=v, time=2, c=3.)]
+        summaries = [i.result() for i in futures]
+        assert all(i['main'].time > 0 for i in summaries)
+        assert np.all(u.data[0] == 4.)
+        assert np.all(v.data[0] == 14.)
+
+    def test_callback(self):
+        """
+        Tests that a callback registered at Operator construction is invoked
+        every N timesteps, with the time index, from within the time loop.
+        """
+        grid = Grid(shape=(6, 6))
+        u = TimeFunction(name='u', grid=grid)
+        assert 'callback' not in str(Operator(Eq(u.forward, u + 1)).ccode)
+
+        snapshots = []
+
+        def callback(time):
+            snapshots.append((time, u.data[(time + 1) % 2].copy()))
+        op = Operator(Eq(u.forward, u + 1), callback=callback, callback_period=3)
+        op.apply(time=10)
+        assert [i for i, _ in snapshots] == [2, 5, 8]
+        assert all(np.all(v == i + 1) for i, v in snapshots)
+
+        with pytest.raises(InvalidOperator):
+            Operator(Eq(u.forward, u + 1), callback=callback, callback_period=0)
+
+    def test_batched_wavefields(self):
+        """
+        Tests that the wavefields of multiple shots, interleaved along the
+        batch dimension and computed by a single Operator, match the ones
+        computed by independent Operators, one per shot.
+        """
+        grid = Grid(shape=(11, 11))
+        m = Function(name='m', grid=grid)
+        m.data[:] = 1. + np.linspace(0, 1, 11)
+        coordinates = [[.2, .3], [.4, .5], [.61, .55]]
+
+        def run(nbatch, points):
+            u = TimeFunction(name='u', grid=grid, space_order=2, nbatch=nbatch)
+            src = SparseFunction(name='src', grid=grid, npoint=1, nt=6, nbatch=nbatch)
+            rec = SparseFunction(name='rec', grid=grid, npoint=1, nt=6, nbatch=nbatch)
+            src.coordinates.data[:] = np.array(points).reshape(src.coordinates.shape)
+            src.data[:] = 1.
+            rec.coordinates.data[:] = src.coordinates.data[:] + .1
+            eqs = [Eq(u.forward, u + .1*u.laplace/m)]
+            eqs += src.inject(field=u.forward, expr=src)
+            eqs += rec.interpolate(expr=u)
+            op = Operator(eqs, dle='advanced')
+            op.apply(time=5)
+            return op, u.data.copy(), rec.data.copy()
+
+        op, u, rec = run(len(coordinates), [coordinates])
+        # The batch loops are innermost, hence vectorized across the shots
+        trees = [i for i in retrieve_iteration_tree(op) if i[-1].dim.is_Batch]
+        assert len(trees) > 0
+        assert all(i[-1].is_Vectorizable for i in trees)
+        assert u.shape == (2, 11, 11, len(coordinates))
+        for i, points in enumerate(coordinates):
+            _, u1, rec1 = run(None, [points])
+            assert np.allclose(u[..., i], u1)
+            assert np.allclose(rec[..., i], rec1)
+
 
 @skipif_yask
 class TestArithmetic(object):
@@ -213,6 +390,171 @@ class TestAllocation(object):
         assert(np.allclose(m2.data, 0))
         assert(np.array_equal(m.data, m2.data))
 
+    def test_first_touch_batch(self):
+        """
+        Test that the data allocated by an Operator is first-touched in a
+        single pass, through the support library.
+        """
+        grid = Grid(shape=(8, 9, 10))
+        u = TimeFunction(name='u', grid=grid, save=True, time_dim=4,
+                         first_touch=True)
+        f = Function(name='f', grid=grid, first_touch=True)
+        op = Operator(Eq(u.forward, u + f + 1.))
+
+        touched = []
+        first_touch = devito.memory._first_touch
+
+        def track(functions):
+            touched.append([i.name for i in functions])
+            first_touch(functions)
+
+        devito.memory._first_touch = track
+        try:
+            op.apply()
+        finally:
+            devito.memory._first_touch = first_touch
+        assert touched == [['f', 'u']]
+        assert np.all(f.data == 0.)
+        assert np.all(u.data[1] == 1.) and np.all(u.data[3] == 3.)
+
+    def test_pool_allocator(self):
+        """
+        Test that the pool allocator reuses the memory of the Functions freed,
+        and returns it to the system beyond the configured capacity.
+        """
+        clear_cache()
+        allocator = devito.memory.get_allocator('pool')
+        allocator.release()
+        live = allocator.stats.live
+        previous = configuration['allocator']
+        configuration['allocator'] = 'pool'
+        try:
+            grid = Grid(shape=(50, 60))
+            addresses = set()
+            for i in range(3):
+                f = Function(name='f', grid=grid)
+                f.data[:] = i
+                size = allocator.block_size(f._data_buffer.nbytes)
+                addresses.add(f.data.ctypes.data)
+                assert allocator.stats.live == live + size
+                del f
+                clear_cache()
+                assert devito.memory.allocator_stats()[:2] == (live, size)
+            assert len(addresses) == 1
+            g = Function(name='g', grid=grid)
+            assert np.all(g.data == 0.)
+
+            configuration['allocator_pool_size'] = 0
+            del g
+            clear_cache()
+            assert allocator.stats.pooled == 0
+            assert allocator.stats.peak >= live + size
+        finally:
+            configuration['allocator'] = previous
+            configuration['allocator_pool_size'] = None
+            allocator.release()
+
+    def test_allocation_policy(self):
+        """
+        Test that the allocation policy of each Function is honoured, and
+        reported in the performance summary.
+        """
+        grid = Grid(shape=(60, 70))
+        u = TimeFunction(name='u', grid=grid, hugepages=True, numa='interleave')
+        f = Function(name='f', grid=grid, numa='local')
+        g = Function(name='g', grid=grid, hugepages=False, numa=None)
+        assert u.data.ctypes.data % (2*1024**2) == 0
+        assert np.all(u.data == 0.) and np.all(f.data == 0.)
+
+        summary = Operator(Eq(u.forward, u + f + g + 1.)).apply(time=2)
+        assert np.all(u.data[0] == 2.)
+        numa = 'interleave' if devito.memory.get_libnuma() else None
+        assert summary.allocation['u'] == (True, numa)
+        assert summary.allocation['g'] == (False, None)
+
+        with pytest.raises(ValueError):
+            Function(name='h', grid=grid, numa='remote')
+
+    @pytest.mark.parametrize('shape', [(10, 11), (9, 10, 13)])
+    def test_padding(self, shape):
+        """
+        Test that padded Functions give the same results as unpadded ones,
+        with each row of their data starting at an aligned address.
+        """
+        grid = Grid(shape=shape)
+        staggered = (0,)*(len(shape) - 1) + (1,)
+        results = []
+        for padding in [False, True]:
+            u = TimeFunction(name='u', grid=grid, space_order=2, padding=padding)
+            m = Function(name='m', grid=grid, staggered=staggered, padding=padding)
+            assert u.data.shape == u.shape and m.data.shape == m.shape
+            u.data[0] = np.arange(shape[-1])
+            m.data[:] = 1. + np.arange(shape[-1] - 1)
+
+            op = Operator(Eq(u.forward, u.laplace + m), dle='advanced')
+            op.apply(time=3)
+            results.append(u.data.copy())
+        assert np.allclose(results[0], results[1])
+
+        assert all(u.data[(0,) + i].ctypes.data % 64 == 0
+                   for i in np.ndindex(*shape[:-1]))
+        assert 'aligned(' in str(op.ccode)
+
+        # The stride of the rows is a runtime argument, so unpadded data may be used
+        data = np.zeros(u.shape, dtype=np.float32)
+        data[0] = np.arange(shape[-1])
+        op.apply(u=data, time=3)
+        assert np.allclose(data, results[0])
+
+    def test_adopt(self, tmpdir):
+        """
+        Test that aligned, contiguous arrays and memmaps are adopted as the data
+        of a Function without copying, while any other array is copied.
+        """
+        grid = Grid(shape=(12, 16))
+        f = Function(name='f', grid=grid)
+        g = Function(name='g', grid=grid)
+        op = Operator(Eq(f, g + 1.))
+
+        # An aligned array, written by the Operator in place
+        buffer = np.zeros(np.prod(grid.shape) + 16, dtype=np.float32)
+        offset = (-buffer.ctypes.data % 64) // buffer.itemsize
+        array = buffer[offset:offset + np.prod(grid.shape)].reshape(grid.shape)
+        assert f.adopt(array) is True
+        assert f.data.ctypes.data == array.ctypes.data
+        op.apply()
+        assert np.all(array == 1.)
+
+        # A memmap, read by the Operator
+        mapped = np.memmap(str(tmpdir.join('g')), dtype=np.float32, mode='w+',
+                           shape=grid.shape)
+        mapped[:] = 2.
+        assert g.adopt(mapped) is True
+        op.apply()
+        assert np.all(array == 3.)
+
+        # Misaligned, non-contiguous, read-only or mistyped arrays are copied
+        buffer = np.ones(np.prod(grid.shape) + 16, dtype=np.float32)
+        offset = (-buffer.ctypes.data % 64) // buffer.itemsize + 1
+        others = [buffer[offset:offset + np.prod(grid.shape)].reshape(grid.shape),
+                  np.ones(grid.shape[::-1], dtype=np.float32).T,
+                  np.ones(grid.shape, dtype=np.float64)]
+        readonly = array.copy()
+        readonly.flags.writeable = False
+        for other in others + [readonly]:
+            assert g.adopt(other) is False
+            assert g.data.ctypes.data != other.ctypes.data
+            assert np.all(g.data == other)
+        with pytest.raises(ValueError):
+            g.adopt(others[0], copy=False)
+        with pytest.raises(ValueError):
+            g.adopt(np.zeros((12, 15), dtype=np.float32))
+
+        # Copying never writes through to the previously adopted array
+        assert f.adopt(others[1]) is False
+        op.apply()
+        assert np.all(array == 3.) and np.all(f.data == g.data + 1.)
+
     @pytest.mark.parametrize('staggered', [
         (0, 0), (0, 1), (1, 0), (1, 1),
         (0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1),
@@ -286,6 +628,67 @@ class TestArguments(object):
         assert(np.allclose(a1.data, np.zeros(shape) + 6))
         assert(np.allclose(a2.data, np.zeros(shape) + 7))
 
+    def test_argument_plan(self, monkeypatch):
+        """Test that repeated invocations with arguments of the same shape
+        reuse the argument plan built upon the first one"""
+        grid = Grid(shape=(4, 4))
+        p = TimeFunction(name='p', grid=grid)
+        q = TimeFunction(name='q', grid=grid)
+        c = Constant(name='c', value=1.)
+        op = Operator(Eq(p.forward, p + c))
+        op(p=p, time=2, c=2.)
+        assert np.all(p.data[0] == 4.)
+
+        arguments = devito.operator.Operator.arguments
+
+        def fail(*args, **kwargs):
+            raise AssertionError("Arguments weren't retrieved from the plan")
+        monkeypatch.setattr(devito.operator.Operator, 'arguments', fail)
+
+        # Swapped data objects and Constant values
+        op(p=p, time=2, c=2.)
+        op(p=q, time=2, c=3.)
+        assert np.all(p.data[0] == 8.)
+        assert np.all(q.data[0] == 6.)
+        assert len(op._plans) == 1
+
+        # Different loop bounds require a new plan
+        monkeypatch.setattr(devito.operator.Operator, 'arguments', arguments)
+        op(p=q, time=4)
+        assert np.all(q.data[0] == 10.)
+        assert len(op._plans) == 2
+
+    def test_concurrent_arguments(self):
+        """Test that Operators sharing a Grid may process their arguments, and
+        run, concurrently from multiple threads"""
+        grid = Grid(shape=(4, 4))
+        functions = [TimeFunction(name='f%d' % i, grid=grid) for i in range(4)]
+        ops = [Operator(Eq(f.forward, f + 1.)) for f in functions]
+
+        def arguments(i):
+            op = ops[i % len(ops)]
+            arguments, _ = op.arguments(time=i)
+            return arguments['time_e'], arguments['x_e']
+
+        expected = [arguments(i) for i in range(1, 65)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            values = list(executor.map(arguments, range(1, 65)))
+        assert values == expected
+
+        def apply(i):
+            ops[i].apply(time=2 + 2*i)
+            return functions[i].data[(2 + 2*i) % 2].copy()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(apply, range(len(ops))))
+        for i, v in enumerate(results):
+            assert np.all(v == 2 + 2*i)
+
+        # An Operator being compiled (or tuned) doesn't hold back the others
+        with ops[0]._compilation_lock:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                assert np.all(executor.submit(apply, 1).result(timeout=60) == 8.)
+
     def test_override_symbol(self):
         """Test call-time symbols overrides with other symbols"""
         i, j, k, l = dimify('i j k l')
@@ -1,8 +1,9 @@
 import numpy as np
+import pytest
 from sympy import solve
 from conftest import skipif_yask
 
-from devito import Grid, Eq, Operator, TimeFunction, Forward
+from devito import Grid, Eq, Operator, Function, TimeFunction, Forward, Backward
 
 
 def initial(dx=0.01, dy=0.01):
@@ -45,3 +46,61 @@ def run_simulation(save=False, dx=0.01, dy=0.01, a=0.5, timesteps=100):
 @skipif_yask
 def test_save():
     assert(np.array_equal(run_simulation(True), run_simulation()))
+
+
+@skipif_yask
+def test_subsampled_save():
+    """Test that a time-subsampled TimeFunction stores every k-th timestep of
+    a fully saved one, and is read back at the same cadence."""
+    grid = Grid(shape=(11, 11))
+    u = TimeFunction(name='u', grid=grid, time_order=1, space_order=2,
+                     save=True, time_dim=10)
+    usave = TimeFunction(name='usave', grid=grid, time_order=1, space_order=2,
+                         save=True, time_dim=10, subsampling=3)
+    # The timestep 9 is computed by the last iteration, but never saved
+    assert usave.shape == (3, 11, 11)
+    u.data[0, 5, 5] = 1.
+
+    op = Operator([Eq(u.forward, u + .1*u.laplace), Eq(usave, u)])
+    summary = op.apply()
+    assert np.all(usave.data == u.data[:9:3])
+    # The guarded section is evaluated at one third of the timesteps
+    assert len(summary) == 2
+
+    # Read back at the matching cadence, backwards in time
+    grad = Function(name='grad', grid=grid)
+    op = Operator(Eq(grad, grad + usave), time_axis=Backward)
+    op.apply()
+    assert np.allclose(grad.data, usave.data.sum(axis=0))
+
+
+@skipif_yask
+@pytest.mark.parametrize('subsampling', [None, 3])
+def test_out_of_core_save(tmpdir, subsampling):
+    """Test that an out-of-core TimeFunction, staged in and out of RAM in slabs,
+    stores and reads back the same timesteps as one in RAM."""
+    grid = Grid(shape=(32, 32))
+    saved = []
+    for out_of_core in [None, str(tmpdir)]:
+        u = TimeFunction(name='u', grid=grid, time_order=2, space_order=2)
+        usave = TimeFunction(name='usave', grid=grid, time_order=2, space_order=2,
+                             save=True, time_dim=30, subsampling=subsampling,
+                             out_of_core=out_of_core, slab_size=4)
+        u.data[:, 15:17, 15:17] = 1.
+
+        op = Operator([Eq(u.forward, 2*u - u.backward + 1e-4*u.laplace),
+                       Eq(usave, u)])
+        summary = op.apply(time=28)
+
+        grad = Function(name='grad', grid=grid)
+        op = Operator(Eq(grad, grad + usave), time_axis=Backward)
+        summary_grad = op.apply(time=28)
+        saved.append((usave.data.copy(), grad.data.copy()))
+
+    # The data lives in a file, and the I/O is reported in the summaries
+    assert len(tmpdir.listdir()) == 1
+    for i in [summary, summary_grad]:
+        assert i.io.nbytes >= 2*usave.data.nbytes
+        assert i.io.bandwidth > 0
+    assert np.all(saved[0][0] == saved[1][0])
+    assert np.all(saved[0][1] == saved[1][1])
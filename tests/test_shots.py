@@ -0,0 +1,81 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+from conftest import skipif_yask
+
+from examples.seismic.acoustic.acoustic_example import smooth10, acoustic_setup as setup
+from examples.seismic import Model, Receiver
+from examples.seismic.shots import SharedArray, ShotRunner, share, _init_worker
+
+
+def test_shared_array():
+    """Test that a SharedArray is pickled by name, mapping the same memory."""
+    import pickle
+    a = SharedArray((4, 5))
+    b = pickle.loads(pickle.dumps(a))
+    assert b.name == a.name and b.shape == (4, 5)
+    b.array[1, 2] = 3.
+    assert a.array[1, 2] == 3.
+
+
+def test_share_model_update():
+    """Test that velocity updates write through to the shared square slowness,
+    as well as to any view of it."""
+    shape = (20, 20)
+    model = Model(origin=(0., 0.), spacing=(10., 10.), shape=shape, nbpml=4,
+                  vp=np.full(shape, 1.5, dtype=np.float32))
+    shared = share(model.m)
+    view = model.m.data
+    model.vp = np.full(shape, 2., dtype=np.float32)
+    assert np.allclose(shared.array, .25)
+    assert np.allclose(view, .25)
+
+
+@skipif_yask
+@pytest.mark.parametrize('shape', [(60, 70)])
+def test_shot_runner(shape):
+    """Test that shots run on a pool of worker processes, with the model in
+    shared memory, produce the same gathers and gradient as sequential runs."""
+    solver = setup(shape=shape, spacing=(15., 15.), tn=300., space_order=4,
+                   nbpml=10)
+    model = solver.model
+    sources = np.array([[x, 30.] for x in np.linspace(100., 800., 3)])
+
+    runner = ShotRunner(solver, nworkers=2)
+    try:
+        gathers = runner.forward(sources)
+
+        # Workers exiting are replaced by the pool, and the replacements take
+        # part in the subsequent runs as any other worker
+        runner.close()
+        context = multiprocessing.get_context('fork')
+        runner._pool = context.Pool(runner.nworkers, initializer=_init_worker,
+                                    initargs=(solver,), maxtasksperchild=1)
+
+        # Model updates in the parent process are seen by the workers
+        true_m = model.m.data.copy()
+        model.m.data[:] = smooth10(true_m, model.shape_domain)
+        fval, gradient = runner.gradient(sources, gathers)
+    finally:
+        runner.close()
+
+    # Sequential reference, with a single Operator instance
+    reference_fval = 0.
+    grad = None
+    for i, coordinates in enumerate(sources):
+        solver.source.coordinates.data[:] = coordinates
+        model.m.data[:] = true_m
+        rec, _, _ = solver.forward()
+        assert np.allclose(rec.data, gathers[i], atol=1e-6)
+
+        model.m.data[:] = smooth10(true_m, model.shape_domain)
+        rec0, u0, _ = solver.forward(save=True)
+        residual = Receiver(name='rec', grid=model.grid, data=rec0.data - rec.data,
+                            coordinates=rec0.coordinates.data)
+        reference_fval += .5*np.linalg.norm(residual.data)**2
+        grad, _ = solver.gradient(residual, u0, grad=grad)
+    reference = grad.data
+
+    assert np.isclose(fval, reference_fval, rtol=1e-5)
+    assert np.allclose(gradient, reference, rtol=1e-4, atol=1e-6*abs(reference).max())